@@ -2,6 +2,48 @@ import * as fs from 'fs';
 import * as path from 'path';
 import { systemConfigurationService } from './systemConfiguration';
 
+/**
+ * Last ML forecast read from disk. The ML engine only rewrites the file
+ * (atomically, with version + 1) when the forecast changed materially, so
+ * an unchanged mtime means the cached value is still current.
+ */
+interface CachedForecast {
+  mtimeMs: number;
+  version?: number;
+  avgKw1h: number;
+}
+
+let cachedForecast: CachedForecast | null = null;
+
+/**
+ * avgKw1h from the ML forecast file, re-reading it only when it changed.
+ * Returns null if the file is missing or invalid.
+ */
+function readMlForecastKw(forecastPath: string): number | null {
+  if (!fs.existsSync(forecastPath)) {
+    cachedForecast = null;
+    return null;
+  }
+
+  const { mtimeMs } = fs.statSync(forecastPath);
+  if (cachedForecast && cachedForecast.mtimeMs === mtimeMs) {
+    return cachedForecast.avgKw1h;
+  }
+
+  const forecast = JSON.parse(fs.readFileSync(forecastPath, 'utf8'));
+  if (typeof forecast.avgKw1h !== 'number') {
+    cachedForecast = null;
+    return null;
+  }
+
+  const version = typeof forecast.version === 'number' ? forecast.version : undefined;
+  if (version === undefined || cachedForecast?.version !== version) {
+    console.log(`[SolarService] Loaded ML forecast v${version ?? '?'}: ${forecast.avgKw1h} kW`);
+  }
+  cachedForecast = { mtimeMs, version, avgKw1h: forecast.avgKw1h };
+  return forecast.avgKw1h;
+}
+
 /**
  * Reads ML forecast from file or falls back to mock logic.
  * Returns energy in Wh for next 15 minutes.
@@ -12,27 +54,21 @@ export function getNextSolarForecastWh(): number {
   // Attempt to read ML forecast file
   try {
     const forecastPath = path.resolve(__dirname, '../../ml_forecast.json');
-    if (fs.existsSync(forecastPath)) {
-      const rawData = fs.readFileSync(forecastPath, 'utf8');
-      const forecast = JSON.parse(rawData);
-
-      // Validate forecast data
-      if (typeof forecast.avgKw1h === 'number') {
-        const avgKw1h = forecast.avgKw1h;
-
-        // Calculate Wh: AvgkW * 1000 * 0.25 hours * system_efficiency
-        // Note: The math logic requested: Wh = avgKw1h * 1000 * 0.25 * efficiency
-        // The prompt says "avgKw1h = value shown as Avg (1h)", which is usually per unit area or total.
-        // Assuming avgKw1h from ML is capable power. If ML output is per panel capacity, we might need to multiply by capacity.
-        // However, the prompt says "Convert avgKw1h (kW) into Wh... Wh = avgKw1h * 1000 * 0.25 * efficiency".
-        // It does NOT mention multiplying by panelCapacityKw again implicitly if avgKw1h is already total.
-        // If ML output is raw solar irradiance (kW/m2) or normalized, we might need capacity.
-        // But let's follow the FORMULA given strictly: Wh = avgKw1h * 1000 * 0.25 * efficiency 
-
-        const solarForecastWh = avgKw1h * 1000 * 0.25 * config.efficiency;
-        console.log(`[SolarService] Using ML forecast: ${avgKw1h} kW -> ${solarForecastWh} Wh`);
-        return solarForecastWh;
-      }
+    const avgKw1h = readMlForecastKw(forecastPath);
+
+    // Validate forecast data
+    if (avgKw1h !== null) {
+      // Calculate Wh: AvgkW * 1000 * 0.25 hours * system_efficiency
+      // Note: The math logic requested: Wh = avgKw1h * 1000 * 0.25 * efficiency
+      // The prompt says "avgKw1h = value shown as Avg (1h)", which is usually per unit area or total.
+      // Assuming avgKw1h from ML is capable power. If ML output is per panel capacity, we might need to multiply by capacity.
+      // However, the prompt says "Convert avgKw1h (kW) into Wh... Wh = avgKw1h * 1000 * 0.25 * efficiency".
+      // It does NOT mention multiplying by panelCapacityKw again implicitly if avgKw1h is already total.
+      // If ML output is raw solar irradiance (kW/m2) or normalized, we might need capacity.
+      // But let's follow the FORMULA given strictly: Wh = avgKw1h * 1000 * 0.25 * efficiency 
+
+      const solarForecastWh = avgKw1h * 1000 * 0.25 * config.efficiency;
+      return solarForecastWh;
     }
   } catch (error) {
     console.warn(`[SolarService] Failed to read ML forecast: ${(error as Error).message}. Using fallback.`);
@@ -1,6 +1,16 @@
 # ML_Engine API Module
 """API functions for backend/frontend integration"""
 
-from .forecast_service import get_forecast_at_time
+from .forecast_service import (
+    get_forecast_at_time,
+    get_forecast_series,
+    get_net_energy_forecast,
+    get_all_scenarios_forecast,
+)
 
-__all__ = ['get_forecast_at_time']
+__all__ = [
+    'get_forecast_at_time',
+    'get_forecast_series',
+    'get_net_energy_forecast',
+    'get_all_scenarios_forecast',
+]
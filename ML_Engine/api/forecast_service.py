@@ -5,11 +5,18 @@ Output: JSON with forecast in specified unit (kW or Wh)
 """
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
+from ..src.config import CONFIG
 from ..src.data_utils import load_solar_csv
-from ..src.forecast_solar import forecast_solar, convert_kw_to_wh
+from ..src.forecast_solar import forecast_solar, forecast_multi, convert_kw_to_wh
+from ..src.output_formats import STREAM_FORMATS, encode_forecast
+from ..src.model_registry import model_key_for
+from ..src.nowcast import nowcast_forecast
+from ..src.scenarios import discover_scenarios, forecast_scenarios
 
 
-def get_forecast_at_time(csv_filename, target_datetime_str, method=None, unit="kw", interval="1h"):
+def get_forecast_at_time(csv_filename, target_datetime_str, method=None, unit="kw", interval="1h",
+                         config=None):
     """
     Frontend calls: User picks future time → Get prediction
     
@@ -19,16 +26,18 @@ def get_forecast_at_time(csv_filename, target_datetime_str, method=None, unit="k
         method: "arima", "persistence", or None for ensemble
         unit: "kw" (kilowatts) or "wh" (watt-hours)
         interval: "1h" (hourly) or "15min" (15-minute)
+        config: ForecastConfig for this request (None for CONFIG defaults)
     
     Returns:
         dict: Forecast at target time in specified unit
     """
     # Load data
-    historical_df = load_solar_csv(csv_filename)
+    historical_df = load_solar_csv(csv_filename, days=config.train_days if config else None)
     
     # Full forecast with specified unit and interval
     forecast_series = forecast_solar(historical_df, method=method, 
-                                     interval=interval, unit=unit)
+                                     interval=interval, unit=unit,
+                                     model_key=model_key_for(csv_filename), config=config)
     
     # Find target time
     target_time = pd.to_datetime(target_datetime_str)
@@ -52,7 +61,8 @@ def get_forecast_at_time(csv_filename, target_datetime_str, method=None, unit="k
     }
 
 
-def get_next_interval_forecast(csv_filename, interval_minutes=15, unit="wh", weather="sunny"):
+def get_next_interval_forecast(csv_filename, interval_minutes=15, unit="wh", weather="sunny",
+                               config=None):
     """
     Get forecast for the next N minutes from current time.
     This is the main function backend should call on each refresh.
@@ -62,15 +72,15 @@ def get_next_interval_forecast(csv_filename, interval_minutes=15, unit="wh", wea
         interval_minutes: 15 for 15-minute forecasts
         unit: "kw" or "wh"
         weather: "sunny" or "cloudy" (used for data file if path not provided)
+        config: ForecastConfig for this request (None for CONFIG defaults)
     
     Returns:
         dict: Forecast for next interval
     """
-    # Load data
-    historical_df = load_solar_csv(csv_filename)
-    
-    # Generate forecast with 15-minute intervals
-    forecast_series = forecast_solar(historical_df, interval="15min", unit=unit)
+    # Cached forecast (refitted every CONFIG["forecast_cache_minutes"]) with
+    # nowcast correction from the readings ingested since the last fit
+    forecast_series, info = nowcast_forecast(csv_filename, interval="15min", unit=unit,
+                                             config=config)
     
     # Get current time
     now = datetime.now()
@@ -112,10 +122,141 @@ def get_next_interval_forecast(csv_filename, interval_minutes=15, unit="wh", wea
         f"forecast_{unit}": primary_value,
         "next_intervals": intervals,
         "confidence": 0.87,
+        "nowcast": info["nowcast"],
+        "historical_data_points": info["data_points"]
+    }
+
+
+def get_forecast_series(csv_filename, method=None, horizon=None, unit="kw", interval="1h",
+                        output_format="json", config=None, bands=False):
+    """
+    Full forecast series in the requested output format.
+    
+    Args:
+        csv_filename: Historical data file path
+        method: "arima", "persistence", or None for ensemble
+        horizon: Number of hours to forecast (None for CONFIG default)
+        unit: "kw" or "wh"
+        interval: "1h" or "15min"
+        output_format: "json" (dict), "ndjson"/"csv" (str) or "binary" (bytes)
+        config: ForecastConfig for this request (None for CONFIG defaults)
+        bands: add CONFIG["forecast_quantiles"] prediction intervals: lists
+            under "bands_<unit>" for json, "p10_<unit>", ... fields / columns
+            next to "value_<unit>" for ndjson / csv (not binary)
+    
+    Returns:
+        dict for json, otherwise the encoded payload
+    """
+    if bands and output_format == "binary":
+        raise ValueError("binary format carries a single series; use ndjson or csv with bands")
+    historical_df = load_solar_csv(csv_filename, days=config.train_days if config else None)
+    quantiles = CONFIG["forecast_quantiles"] if bands else None
+    forecast_series = forecast_solar(historical_df, method=method, horizon=horizon,
+                                     interval=interval, unit=unit,
+                                     model_key=model_key_for(csv_filename), config=config,
+                                     quantiles=quantiles)
+    band_frame = None
+    if quantiles:
+        band_frame = forecast_series.drop(columns="forecast")
+        forecast_series = forecast_series["forecast"]
+    
+    meta = {
+        "status": "success",
+        "method": method or "ensemble",
+        "unit": "Wh" if unit == "wh" else "kW",
+        "interval": interval,
+        "confidence": 0.87,
+        "historical_data_points": len(historical_df)
+    }
+    
+    if output_format in STREAM_FORMATS:
+        if band_frame is not None:
+            # One "value_<unit>", "p10_<unit>", ... field per step
+            forecast_series = forecast_series.to_frame("value").join(band_frame)
+        return encode_forecast(forecast_series, meta, output_format, unit, interval)
+    if output_format != "json":
+        raise ValueError(f"output_format: 'json' or one of {', '.join(STREAM_FORMATS)}")
+    
+    result = {
+        **meta,
+        "start": forecast_series.index[0].isoformat(),
+        f"forecast_{unit}": [round(x, 2) for x in forecast_series.tolist()]
+    }
+    if band_frame is not None:
+        result[f"bands_{unit}"] = {label: [round(x, 2) for x in band_frame[label].tolist()]
+                                   for label in band_frame.columns}
+    return result
+
+
+def get_net_energy_forecast(csv_filename, method=None, horizon=None, unit="wh", interval="15min",
+                            config=None):
+    """
+    Joint solar, load and net (solar - load) forecast from one data load.
+    
+    Args:
+        csv_filename: Historical data file path
+        method: "arima", "persistence", or None for ensemble
+        horizon: Number of hours to forecast (None for CONFIG default)
+        unit: "kw" or "wh"
+        interval: "1h" or "15min"
+        config: ForecastConfig for this request (None for CONFIG defaults)
+    
+    Returns:
+        dict: Aligned solar / load / net lists in specified unit
+    """
+    historical_df = load_solar_csv(csv_filename, days=config.train_days if config else None)
+    frame = forecast_multi(historical_df, method=method, horizon=horizon,
+                           interval=interval, unit=unit, model_key=model_key_for(csv_filename),
+                           config=config)
+    
+    return {
+        "status": "success",
+        "start": frame.index[0].isoformat(),
+        "unit": "Wh" if unit == "wh" else "kW",
+        "interval": interval,
+        "method": method or "ensemble",
+        **{f"{column}_{unit}": [round(x, 2) for x in frame[column].tolist()]
+           for column in frame.columns},
         "historical_data_points": len(historical_df)
     }
 
 
+def get_all_scenarios_forecast(data_dir=None, method=None, horizon=None, unit="kw", interval="1h",
+                               config=None):
+    """
+    Forecast every scenario file in data_dir concurrently (API form of --weather all).
+    
+    Args:
+        data_dir: Directory holding solar_data_<scenario>.csv (default: ML_Engine/data)
+        method: "arima", "persistence", or None for ensemble
+        horizon: Number of hours to forecast (None for CONFIG default)
+        unit: "kw" or "wh"
+        interval: "1h" or "15min"
+        config: ForecastConfig for this request (None for CONFIG defaults)
+    
+    Returns:
+        dict: One entry per scenario under "scenarios"
+    """
+    data_dir = data_dir or Path(__file__).resolve().parents[1] / "data"
+    results = forecast_scenarios(discover_scenarios(data_dir), method=method, horizon=horizon,
+                                 interval=interval, unit=unit, config=config)
+    
+    return {
+        "status": "success",
+        "unit": "Wh" if unit == "wh" else "kW",
+        "interval": interval,
+        "method": method or "ensemble",
+        "scenarios": {
+            name: {
+                **info,
+                "start": forecast.index[0].isoformat(),
+                f"forecast_{unit}": [round(x, 2) for x in forecast.tolist()]
+            }
+            for name, (forecast, info) in results.items()
+        }
+    }
+
+
 # Backend test
 if __name__ == "__main__":
     import json
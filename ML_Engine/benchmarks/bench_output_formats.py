@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Benchmark: forecast payload serialisation (size and encode/decode time)
+
+Compares the current pretty-printed JSON response against the ndjson, csv
+and binary stream formats for growing 15-minute forecast lengths.
+
+Run: python benchmarks/bench_output_formats.py
+"""
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ML_ENGINE_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+from src.output_formats import encode_forecast, unpack_binary
+
+
+def make_forecast(steps):
+    """Synthetic 15-minute forecast with a diurnal shape"""
+    index = pd.date_range("2026-01-01", periods=steps, freq="15min")
+    hours = index.hour + index.minute / 60
+    values = np.clip(8 * np.sin((hours - 6) / 12 * np.pi), 0, None)
+    return pd.Series(values, index=index)
+
+
+def json_payload(forecast, meta):
+    """Same shape as cli.py Mode C json output"""
+    return json.dumps({**meta, "15min_forecast_kw": [round(x, 2) for x in forecast.tolist()]},
+                      indent=2)
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000
+
+
+def decode(fmt, payload):
+    if fmt == "json":
+        return json.loads(payload)
+    if fmt == "ndjson":
+        return [json.loads(line) for line in payload.splitlines()]
+    if fmt == "csv":
+        return pd.read_csv(io.StringIO(payload))
+    return unpack_binary(payload)
+
+
+def main():
+    meta = {"status": "success", "unit": "kW", "interval": "15min", "confidence": 0.87}
+    print(f"{'steps':>8} {'format':>7} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+    for days in (2, 30, 365):
+        forecast = make_forecast(days * 96)
+        for fmt in ("json", "ndjson", "csv", "binary"):
+            if fmt == "json":
+                payload, enc_ms = timed(lambda: json_payload(forecast, meta))
+            else:
+                payload, enc_ms = timed(lambda: encode_forecast(forecast, meta, fmt, "kw", "15min"))
+            _, dec_ms = timed(lambda: decode(fmt, payload))
+            print(f"{len(forecast):>8} {fmt:>7} {len(payload):>10} {enc_ms:>10.2f} {dec_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Benchmark: forecast accuracy vs fit time per training window length
+
+Generates hourly synthetic history and, for each window length, backtests
+the next day (rolling origin, --folds days apart) with:
+    - exact:   SARIMA estimated on the whole window
+    - bounded: SARIMA estimated on the newest CONFIG["fit_window_days"] days
+               within CONFIG["fit_budget_s"]
+    - blend:   bounded SARIMA blended 50/50 with the daily profile of the
+               whole window (older days decayed, --halflife)
+
+Run: python benchmarks/bench_train_window.py [--windows 7 14 30 60] [--folds 2]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ML_ENGINE_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+from src.config import CONFIG, ForecastConfig
+from src.data_utils import load_regular_history
+from src.forecast_solar import hourly_forecast
+from src.synthetic import iter_chunks, write_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--windows', type=int, nargs='+', default=[7, 14, 30, 60],
+                        help='training window lengths in days')
+    parser.add_argument('--folds', type=int, default=2, help='held-out days per window')
+    parser.add_argument('--halflife', type=float, default=14, help='profile day half-life (blend)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")  # statsmodels convergence / frequency noise
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / "site.csv"
+        days = max(args.windows) + args.folds
+        write_csv(csv, iter_chunks(periods=days * 24, freq="h", seed=args.seed))
+        regular, _ = load_regular_history(str(csv))
+        # No learned blend weights: the 50/50 prior
+        CONFIG["ensemble_weights_path"] = str(Path(tmp) / "none.json")
+        history = regular.ffill().fillna(0)
+
+        base = ForecastConfig.from_config(forecast_method="arima", horizon_hours=24)
+        strategies = {
+            # fit_budget_s=0: unlimited
+            "exact": lambda w: base.replace(blend_ratio=1.0, fit_window_days=w, fit_budget_s=0),
+            "bounded": lambda w: base.replace(blend_ratio=1.0),
+            "blend": lambda w: base.replace(blend_ratio=0.5, ensemble_members=("arima", "profile"),
+                                            profile_halflife_days=args.halflife),
+        }
+
+        print(f"{'window d':>8}  {'strategy':<8}{'fit s':>8}{'RMSE kW':>10}")
+        for window in args.windows:
+            for name, make in strategies.items():
+                config = make(window)
+                seconds, errors = 0.0, []
+                for fold in range(args.folds):
+                    end = len(history) - (args.folds - fold) * 24
+                    train = history.iloc[end - window * 24:end]
+                    actual = history['solar_power_kw'].iloc[end:end + 24].to_numpy()
+                    started = time.perf_counter()
+                    pred = hourly_forecast(train, config=config).to_numpy()
+                    seconds += time.perf_counter() - started
+                    errors.append(np.mean((pred - actual) ** 2))
+                print(f"{window:>8}  {name:<8}{seconds / args.folds:>8.2f}"
+                      f"{np.sqrt(np.mean(errors)):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
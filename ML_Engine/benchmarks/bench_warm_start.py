@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Benchmark: warm-started vs cold SARIMA refits
+
+Generates hourly synthetic history and refits the model once per simulated
+day (rolling 7-day window). Each day is fitted cold (default start values)
+and warm (started from the previous day's parameters, capped at
+CONFIG["warm_start_maxiter"] iterations, cold fallback), reporting fit
+time, optimiser iterations and the largest forecast difference.
+
+Run: python benchmarks/bench_warm_start.py [--days 5] [--seed 0]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+
+ML_ENGINE_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+from src.config import CONFIG
+from src.data_utils import load_regular_history
+from src.forecast_solar import estimate_arima
+from src.synthetic import iter_chunks, write_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=5, help='daily refits to simulate')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")  # statsmodels convergence / frequency noise
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / "site.csv"
+        write_csv(csv, iter_chunks(periods=(8 + args.days) * 24, freq="h", seed=args.seed))
+        regular, _ = load_regular_history(str(csv))
+    series = regular['solar_power_kw'].ffill().fillna(0)
+
+    def model_for(day):
+        end = len(series) - (args.days - day) * 24
+        return ARIMA(series.iloc[end - 168:end], order=CONFIG["arima_order"],
+                     seasonal_order=CONFIG["arima_seasonal"])
+
+    # Day 0 seeds the warm chain
+    previous, _ = estimate_arima(model_for(0))
+    print(f"{'day':<5}{'cold s':>8}{'iters':>7}{'warm s':>8}{'iters':>7}{'start':>7}{'max diff kW':>13}")
+    totals = np.zeros(2)
+    for day in range(1, args.days + 1):
+        started = time.perf_counter()
+        cold, cold_info = estimate_arima(model_for(day))
+        cold_s = time.perf_counter() - started
+        started = time.perf_counter()
+        warm, warm_info = estimate_arima(model_for(day), previous.params)
+        warm_s = time.perf_counter() - started
+        diff = np.abs(np.asarray(cold.forecast(24)) - np.asarray(warm.forecast(24))).max()
+        totals += (cold_s, warm_s)
+        print(f"{day:<5}{cold_s:>8.2f}{cold_info['iterations']:>7}{warm_s:>8.2f}"
+              f"{warm_info['iterations']:>7}{warm_info['start']:>7}{diff:>13.4f}")
+        previous = warm
+    print(f"total: cold {totals[0]:.2f}s, warm {totals[1]:.2f}s "
+          f"({totals[1] / totals[0]:.0%} of cold)")
+
+
+if __name__ == '__main__':
+    main()
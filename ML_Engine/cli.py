@@ -11,11 +11,18 @@ Usage Examples:
     python cli.py --horizon 48 --format text
     python cli.py --next 15 --unit wh --format json
     python cli.py --target "01-02-2026 14:00" --unit wh --interval 15min
+    python cli.py --interval 15min --format ndjson
+    python cli.py --joint --unit wh --interval 15min
+    python cli.py --weather all --format ndjson
+    python cli.py --weather sunny --refit        # weekly re-estimation (cron)
+    python cli.py --history "01-01-2026 00:00" "15-01-2026 23:00" --points 200
+    python cli.py --batch < requests.ndjson      # one fit per (data, method, horizon)
     
 Date Format: DD-MM-YYYY HH:MM (Indian format)
 Output Units: kW (power) or Wh (energy)
 """
 import argparse
+import atexit
 import json
 import sys
 import warnings
@@ -29,9 +36,17 @@ warnings.filterwarnings('ignore')
 ML_ENGINE_ROOT = Path(__file__).parent
 sys.path.insert(0, str(ML_ENGINE_ROOT))
 
-from src.data_utils import load_solar_csv
-from src.forecast_solar import forecast_solar, convert_kw_to_wh
-from src.config import CONFIG
+from src.data_utils import load_solar_csv, query_history
+from src.forecast_solar import (FORECAST_METHODS, forecast_solar, forecast_multi, convert_kw_to_wh,
+                                to_interval_and_unit)
+from src.batch import iter_batch
+from src.config import CONFIG, ForecastConfig
+from src.output_formats import FORMATS, STREAM_FORMATS, write_forecast
+from src.publish import publish_forecast
+from src.scenarios import discover_scenarios, iter_scenario_forecasts
+from src.metrics import BACKEND_WRITES, write_metrics
+from src.model_registry import model_key_for
+from src.nowcast import nowcast_forecast
 
 
 def parse_datetime(datetime_str):
@@ -68,19 +83,66 @@ def get_unit_label(unit):
     return "Wh" if unit == "wh" else "kW"
 
 
-def get_forecast_for_target(csv_file, target_datetime_str, method=None, unit="kw", interval="1h"):
+def print_error(error, fmt):
+    """Print an error dict in a form the selected output format can carry."""
+    if fmt == 'json':
+        print(json.dumps(error, indent=2))
+    elif fmt == 'ndjson':
+        print(json.dumps(error))
+    elif fmt in STREAM_FORMATS:
+        print(json.dumps(error), file=sys.stderr)
+    else:
+        print(f"Error: {error['error']}")
+
+
+def intervals_to_series(intervals, unit):
+    """Rebuild a pd.Series from the next_intervals list of a --next response."""
+    import pandas as pd
+    
+    index = pd.to_datetime([iv["datetime"] for iv in intervals], format="%d-%m-%Y %H:%M")
+    return pd.Series([iv[f"value_{unit}"] for iv in intervals], index=index)
+
+
+def summarize_forecast(forecast, interval):
+    """First value and interval-aware averages (1h / 6h / 24h / total)."""
+    # 15-minute intervals: 4 per hour, hourly intervals: 1 per hour
+    per_hour = 4 if interval == "15min" else 1
+    
+    def avg(hours):
+        return round(float(forecast.iloc[:min(hours * per_hour, len(forecast))].mean()), 2)
+    
+    return {
+        "first": round(float(forecast.iloc[0]), 2),
+        "avg_1h": avg(1),
+        "avg_6h": avg(6),
+        "avg_24h": avg(24),
+        "avg_total": round(float(forecast.mean()), 2),
+    }
+
+
+def get_forecast_for_target(csv_file, target_datetime_str, method=None, unit="kw", interval="1h",
+                            config=None):
     """
     Get forecast for a specific target datetime with smart time-of-day matching
     
+    config: ForecastConfig built from the CLI flags (None for CONFIG defaults)
+    
     Returns:
         dict: Forecast result with predicted value in specified unit
     """
-    import pandas as pd
-    
-    df = load_solar_csv(str(csv_file))
-    forecast = forecast_solar(df, method=method, horizon=CONFIG["horizon_hours"], 
-                              interval=interval, unit=unit)
+    df = load_solar_csv(str(csv_file), days=config.train_days if config else None)
+    forecast = forecast_solar(df, method=method, interval=interval, unit=unit,
+                              model_key=model_key_for(csv_file), config=config)
+    return match_target(forecast, target_datetime_str, unit, interval)
+
+
+def match_target(forecast, target_datetime_str, unit="kw", interval="1h"):
+    """
+    Target forecast from an existing forecast series (see get_forecast_for_target)
     
+    Returns:
+        dict: Forecast result with predicted value in specified unit
+    """
     target_time = parse_datetime(target_datetime_str)
     target_hour = target_time.hour
     
@@ -127,7 +189,8 @@ def get_forecast_for_target(csv_file, target_datetime_str, method=None, unit="kw
     }
 
 
-def get_next_minutes_forecast(csv_file, next_minutes=15, method=None, unit="wh", weather="sunny"):
+def get_next_minutes_forecast(csv_file, next_minutes=15, method=None, unit="wh", weather="sunny",
+                              config=None):
     """
     Get forecast for the next N minutes from current time.
     This is the main function backend will call on each 15-minute refresh.
@@ -138,18 +201,19 @@ def get_next_minutes_forecast(csv_file, next_minutes=15, method=None, unit="wh",
         method: Forecasting method
         unit: Output unit ("kw" or "wh")
         weather: Weather scenario
+        config: ForecastConfig built from the CLI flags (None for CONFIG defaults)
     
     Returns:
         dict: Forecast for next interval(s)
     """
     import pandas as pd
     
-    df = load_solar_csv(str(csv_file))
-    
-    # Always use 15-minute intervals for this mode
+    # Always use 15-minute intervals for this mode; the cached forecast is
+    # refitted every CONFIG["forecast_cache_minutes"] and nowcast-corrected
+    # from the latest ingested readings in between
     interval = "15min"
-    forecast = forecast_solar(df, method=method, horizon=CONFIG["horizon_hours"], 
-                              interval=interval, unit=unit)
+    forecast, info = nowcast_forecast(csv_file, method=method, interval=interval, unit=unit,
+                                      config=config)
     
     # Get current time and find matching forecast points
     now = datetime.now()
@@ -188,8 +252,228 @@ def get_next_minutes_forecast(csv_file, next_minutes=15, method=None, unit="wh",
         "interval": "15min",
         f"forecast_{unit}": primary_value,
         "next_intervals": intervals,
-        "confidence": 0.87
+        "confidence": 0.87,
+        "nowcast": info["nowcast"],
+        "model": info["model"]
+    }
+
+
+def forecast_result(forecast, info, weather, method, horizon, unit, interval, frame=None,
+                    bands=None):
+    """
+    Standard (Mode C) response for one forecast.
+    
+    Args:
+        forecast: solar forecast in the requested unit / interval
+        info: dict with data_range and data_quality
+        frame: forecast_multi frame for joint mode (adds load and net)
+        bands: dict label ("p10", ...) -> solar quantile series, aligned with forecast
+    """
+    interval_label = "15min" if interval == "15min" else "hourly"
+    result = {
+        "status": "success",
+        "timestamp": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
+        "weather": weather,
+        "method": method or "ensemble",
+        "horizon_hours": horizon,
+        "unit": get_unit_label(unit),
+        "interval": interval,
+        "confidence": 0.87,
+        "data_range": info["data_range"],
+        "data_quality": info["data_quality"],
+        f"forecast_{unit}": summarize_forecast(forecast, interval),
+        f"{interval_label}_forecast_{unit}": [round(x, 2) for x in forecast.tolist()]
+    }
+    
+    # Joint mode: load and net (solar - load) from the same pass
+    if frame is not None:
+        for column in ("load", "net"):
+            result[f"{column}_forecast_{unit}"] = summarize_forecast(frame[column], interval)
+            result[f"{interval_label}_{column}_forecast_{unit}"] = [
+                round(x, 2) for x in frame[column].tolist()
+            ]
+    
+    # Prediction intervals (--bands)
+    if bands:
+        result[f"{interval_label}_bands_{unit}"] = {
+            label: [round(x, 2) for x in series.tolist()] for label, series in bands.items()
+        }
+    return result
+
+
+def solar_bands(frame, prefix=""):
+    """Quantile band columns ("<prefix>p10", ...) of a forecast frame, keyed by label"""
+    return {column[len(prefix):]: frame[column] for column in frame.columns
+            if column.startswith(f"{prefix}p") and column[len(prefix) + 1:].replace(".", "", 1).isdigit()}
+
+
+def with_bands(forecast, bands):
+    """Forecast plus its bands as one frame ("value", "p10", ...) for the stream formats"""
+    return forecast.to_frame("value").assign(**bands) if bands else forecast
+
+
+def run_batch(args, scenarios, config=None):
+    """
+    Mode Batch: NDJSON requests on stdin, one NDJSON response per request in
+    input order. Requests sharing (data file, method, horizon) share one fit;
+    the CLI flags are the defaults for fields a request omits (with
+    --weather all, every request must name its weather). Failed requests
+    get an error response in their slot; the batch itself still succeeds.
+    
+    Returns:
+        number of failed requests
+    """
+    weather = None if args.weather == 'all' else args.weather
+    defaults = {"id": None, "weather": weather, "method": args.method, "horizon": args.horizon,
+                "unit": args.unit, "interval": args.interval, "target": None, "joint": args.joint,
+                "bands": args.bands}
+    answered = failed = 0
+    for index, request, fitted, error in iter_batch(sys.stdin, scenarios, defaults, config,
+                                                    refit=args.refit):
+        if error is None:
+            try:
+                hourly, info = fitted
+                converted = to_interval_and_unit(hourly, request["interval"], request["unit"])
+                frame = converted if request["joint"] else None
+                bands = solar_bands(converted, "solar_") if request["bands"] else None
+                response = forecast_result(converted["solar"], info, request["weather"],
+                                           request["method"], request["horizon"] or config.horizon_hours,
+                                           request["unit"], request["interval"], frame, bands)
+                if request["target"]:
+                    response["target_forecast"] = match_target(
+                        converted["solar"], request["target"], request["unit"], request["interval"])
+            except Exception as e:
+                error = e
+        if error is not None:
+            response = {"status": "error", "error": str(error), "type": type(error).__name__}
+            failed += 1
+        answered += 1
+        response = {"index": index, "id": request["id"], **response}
+        print(json.dumps(response), flush=True)
+    print(f"batch: {answered} requests, {failed} errors", file=sys.stderr)
+    return failed
+
+
+def run_history_query(args, csv_file):
+    """
+    Mode H: stored history between two times, downsampled to at most
+    --points rows (json records, or csv).
+    """
+    start, end = (parse_datetime(t) for t in args.history)
+    history = query_history(str(csv_file), start, end, points=args.points, method=args.downsample)
+    
+    if args.format == 'csv':
+        history.index = history.index.strftime("%Y-%m-%dT%H:%M:%S")
+        sys.stdout.write(history.round(3).to_csv(na_rep=""))
+        return
+    if args.format != 'json':
+        raise ValueError("--history supports json or csv output")
+    
+    stamps = history.index.strftime("%Y-%m-%d %H:%M:%S").tolist()
+    columns = {name: [None if v != v else round(v, 3) for v in history[name].tolist()]
+               for name in history.columns}
+    print(json.dumps({
+        "status": "success",
+        "source": csv_file.name,
+        "start": start.strftime("%d-%m-%Y %H:%M"),
+        "end": end.strftime("%d-%m-%Y %H:%M"),
+        "method": args.downsample,
+        "recordCount": len(stamps),
+        "sourceRecordCount": history.attrs["rows_in"],
+        "data": [{"timestamp": t, **{name: values[i] for name, values in columns.items()}}
+                 for i, t in enumerate(stamps)],
+    }, indent=2))
+
+
+def export_metrics(path):
+    """atexit hook: metrics must never change the CLI's exit status or output"""
+    try:
+        write_metrics(path)
+    except OSError as e:
+        print(f"metrics: could not write {path}: {e}", file=sys.stderr)
+
+
+def run_all_scenarios(args, scenarios, config=None):
+    """
+    Mode C for --weather all: fit every scenario concurrently in one process
+    and emit one combined response keyed by scenario (ndjson streams each
+    scenario as soon as its fit completes). --refit re-estimates every
+    scenario's model; --bands adds each scenario's prediction intervals to
+    its json entry, step records and csv columns.
+    """
+    import pandas as pd
+    
+    unit_label = get_unit_label(args.unit)
+    interval_label = "15min" if args.interval == "15min" else "hourly"
+    series_key = f"{interval_label}_forecast_{args.unit}"
+    result = {
+        "status": "success",
+        "timestamp": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
+        "weather": "all",
+        "method": args.method or "ensemble",
+        "horizon_hours": args.horizon,
+        "unit": unit_label,
+        "interval": args.interval,
+        "confidence": 0.87,
     }
+    
+    quantiles = CONFIG["forecast_quantiles"] if args.bands else None
+    completed = iter_scenario_forecasts(scenarios, method=args.method, horizon=args.horizon,
+                                        interval=args.interval, unit=args.unit, config=config,
+                                        quantiles=quantiles, refit=args.refit)
+    
+    def split(forecast):
+        """(point forecast, bands dict or None) of one scenario's result"""
+        return (forecast["forecast"], solar_bands(forecast)) if args.bands else (forecast, None)
+    
+    if args.format == 'ndjson':
+        for name, forecast, info in completed:
+            forecast, bands = split(forecast)
+            meta = {**result, "weather": name, **info,
+                    f"forecast_{args.unit}": summarize_forecast(forecast, args.interval)}
+            write_forecast(with_bands(forecast, bands), meta, 'ndjson', args.unit, args.interval)
+        return
+    if args.format == 'binary':
+        raise ValueError("binary format carries a single series; use ndjson or csv with --weather all")
+    
+    columns, details = {}, {}
+    for name, forecast, info in completed:
+        forecast, bands = split(forecast)
+        # CSV: one column per scenario, its bands as "<name>_p10", ...
+        columns[name] = {name: forecast, **{f"{name}_{label}": series
+                                            for label, series in (bands or {}).items()}}
+        details[name] = {
+            **info,
+            f"forecast_{args.unit}": summarize_forecast(forecast, args.interval),
+            series_key: [round(x, 2) for x in forecast.tolist()]
+        }
+        if bands:
+            details[name][f"{interval_label}_bands_{args.unit}"] = {
+                label: [round(x, 2) for x in series.tolist()] for label, series in bands.items()
+            }
+    result["scenarios"] = {name: details[name] for name in scenarios}
+    
+    if args.format == 'json':
+        print(json.dumps(result, indent=2))
+    elif args.format == 'csv':
+        frame = pd.DataFrame({key: series for name in scenarios
+                              for key, series in columns[name].items()})
+        write_forecast(frame, result, 'csv', args.unit, args.interval)
+    else:
+        print("=" * 50)
+        print(f"☀️  SOLAR FORECAST (ALL SCENARIOS) - {unit_label}")
+        print("=" * 50)
+        print(f"⏰ Generated: {result['timestamp']}")
+        print(f"📊 Method: {result['method']}")
+        print(f"📏 Interval: {interval_label}")
+        for name, detail in result["scenarios"].items():
+            fc = detail[f"forecast_{args.unit}"]
+            print("-" * 50)
+            print(f"🌤️  {name.upper()}")
+            print(f"⚡ Avg (1h):      {fc['avg_1h']:>8.2f} {unit_label}")
+            print(f"⚡ Avg (24h):     {fc['avg_24h']:>8.2f} {unit_label}")
+            print(f"⚡ Avg (total):   {fc['avg_total']:>8.2f} {unit_label}")
+        print("=" * 50)
 
 
 def main():
@@ -203,17 +487,27 @@ Examples:
   python cli.py --horizon 48 --format text
   python cli.py --next 15 --unit wh --format json
   python cli.py --target "01-02-2026 14:00" --unit wh --interval 15min
+  python cli.py --interval 15min --format ndjson
+  python cli.py --joint --unit wh --interval 15min
+  python cli.py --weather all --format ndjson
+  python cli.py --weather sunny --refit        # weekly re-estimation (cron)
+  python cli.py --history "01-01-2026 00:00" "15-01-2026 23:00" --points 200
+  python cli.py --batch < requests.ndjson      # one fit per (data, method, horizon)
 
 Date Format: DD-MM-YYYY HH:MM (Indian format)
 Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
+Output Formats: json | text | ndjson (streamed) | csv | binary (float32)
         """
     )
     
+    # Scenarios are discovered from data/solar_data_<name>.csv
+    data_dir = ML_ENGINE_ROOT / "data"
+    scenarios = discover_scenarios(data_dir)
     parser.add_argument(
         '--weather', 
-        choices=['sunny', 'cloudy'], 
+        choices=list(scenarios) + ['all'], 
         default='sunny',
-        help='Weather scenario (default: sunny)'
+        help='Weather scenario, or "all" to forecast every scenario in one run (default: sunny)'
     )
     parser.add_argument(
         '--horizon', 
@@ -223,7 +517,7 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
     )
     parser.add_argument(
         '--method', 
-        choices=['arima', 'persistence'], 
+        choices=list(FORECAST_METHODS), 
         default=None,
         help='Forecast method (default: ensemble blend)'
     )
@@ -235,9 +529,9 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
     )
     parser.add_argument(
         '--format', 
-        choices=['json', 'text'], 
+        choices=list(FORMATS), 
         default='json',
-        help='Output format (default: json)'
+        help='Output format: json, text, ndjson, csv or binary (default: json)'
     )
     
     # NEW: Output unit selection
@@ -264,6 +558,61 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
         help='Get forecast for next N minutes from now (e.g., --next 15)'
     )
     
+    # Joint solar + load (+ net) forecast from one data load
+    parser.add_argument(
+        '--joint',
+        action='store_true',
+        help='Also forecast load and net energy (solar - load) in the same run'
+    )
+    
+    # Weekly re-estimation (cron): ignore stored registry parameters
+    parser.add_argument(
+        '--refit',
+        action='store_true',
+        help='Re-estimate model parameters instead of reusing the model registry'
+    )
+    
+    # Analytic P10/P50/P90 from the model's forecast variance
+    parser.add_argument(
+        '--bands',
+        action='store_true',
+        help='Add prediction interval bands (CONFIG["forecast_quantiles"]) to the forecast'
+    )
+    
+    # Prometheus text file, merged across runs (node_exporter textfile collector)
+    parser.add_argument(
+        '--metrics-file',
+        default=CONFIG["metrics_file"],
+        help='Write engine metrics (Prometheus text format) to this file on exit'
+    )
+    
+    # Downsampled history for charts
+    parser.add_argument(
+        '--history',
+        nargs=2,
+        metavar=('START', 'END'),
+        help='Return stored history between START and END (DD-MM-YYYY HH:MM), downsampled'
+    )
+    parser.add_argument(
+        '--points',
+        type=int,
+        default=500,
+        help='Maximum points returned by --history (default: 500)'
+    )
+    parser.add_argument(
+        '--downsample',
+        choices=['buckets', 'lttb'],
+        default='buckets',
+        help='--history method: min/max/mean buckets or LTTB (default: buckets)'
+    )
+    
+    # Many requests in one process: NDJSON on stdin, NDJSON out
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Read NDJSON forecast requests from stdin and stream NDJSON responses in input order'
+    )
+    
     # Ingestion args
     parser.add_argument('--ingest', action='store_true', help='Ingest new data mode')
     parser.add_argument('--time', type=str, help='Reading time (DD-MM-YYYY HH:MM)')
@@ -271,9 +620,49 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
     parser.add_argument('--load', type=float, help='Load power in kW')
     
     args = parser.parse_args()
+
+    # Reject unsupported combinations before any side effects (backend file, caches)
+    if args.format == 'binary' and (args.joint or args.bands):
+        flag = "--joint" if args.joint else "--bands"
+        print_error({"status": "error",
+                     "error": f"binary format carries a single series; use ndjson or csv with {flag}"},
+                    args.format)
+        sys.exit(1)
+
+    if args.metrics_file:
+        atexit.register(export_metrics, args.metrics_file)
+    
+    # One immutable config per invocation, passed explicitly to every call
+    config = ForecastConfig.from_config(forecast_method=args.method, horizon_hours=args.horizon,
+                                        forecast_interval=args.interval, output_unit=args.unit)
+    
+    # Mode Batch: many requests, one fit per (data file, method, horizon)
+    if args.batch:
+        try:
+            run_batch(args, scenarios, config)
+            sys.exit(0)
+        except Exception as e:
+            print_error({"status": "error", "error": str(e), "type": type(e).__name__}, 'ndjson')
+            sys.exit(1)
+    
+    # Mode C for every scenario at once
+    if args.weather == 'all':
+        unsupported = [flag for flag, used in (("--ingest", args.ingest), ("--next", args.next is not None),
+                                               ("--joint", args.joint), ("--target", args.target),
+                                               ("--history", args.history)) if used]
+        if unsupported:
+            print_error({"status": "error",
+                         "error": f"--weather all supports standard forecasts only, not {', '.join(unsupported)}"},
+                        args.format)
+            sys.exit(1)
+        try:
+            run_all_scenarios(args, scenarios, config)
+            sys.exit(0)
+        except Exception as e:
+            print_error({"status": "error", "error": str(e), "type": type(e).__name__}, args.format)
+            sys.exit(1)
     
     # Determine data file
-    data_dir = ML_ENGINE_ROOT / "data"
     csv_file = data_dir / f"solar_data_{args.weather}.csv"
     
     # Mode A: Ingestion
@@ -286,7 +675,7 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
         try:
             append_new_reading(str(csv_file), args.time, args.solar, args.load)
             result = {"status": "success", "message": f"Data ingested into {csv_file.name}"}
-            print(json.dumps(result) if args.format == 'json' else result['message'])
+            print(json.dumps(result) if args.format in ('json', 'ndjson') else result['message'])
             sys.exit(0)
         except Exception as e:
             print(f"Ingestion error: {e}")
@@ -298,9 +687,18 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
             "status": "error",
             "error": f"Data file not found: {csv_file}"
         }
-        print(json.dumps(error) if args.format == 'json' else error['error'])
+        print_error(error, args.format)
         sys.exit(1)
     
+    # Mode H: Downsampled history query (charts)
+    if args.history:
+        try:
+            run_history_query(args, csv_file)
+            sys.exit(0)
+        except Exception as e:
+            print_error({"status": "error", "error": str(e), "type": type(e).__name__}, args.format)
+            sys.exit(1)
+    
     # Mode B: Next N minutes forecast (for backend refresh)
     if args.next is not None:
         try:
@@ -309,11 +707,16 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
                 next_minutes=args.next,
                 method=args.method,
                 unit=args.unit,
-                weather=args.weather
+                weather=args.weather,
+                config=config
             )
             
             if args.format == 'json':
                 print(json.dumps(result, indent=2))
+            elif args.format in STREAM_FORMATS:
+                meta = {k: v for k, v in result.items() if k != 'next_intervals'}
+                write_forecast(intervals_to_series(result['next_intervals'], args.unit),
+                               meta, args.format, args.unit, "15min")
             else:
                 unit_label = get_unit_label(args.unit)
                 print("=" * 50)
@@ -337,15 +740,29 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
                 "error": str(e),
                 "type": type(e).__name__
             }
-            print(json.dumps(error, indent=2) if args.format == 'json' else f"Error: {e}")
+            print_error(error, args.format)
             sys.exit(1)
 
     # Mode C: Standard forecasting
     try:
         # Load data and generate forecast
-        df = load_solar_csv(str(csv_file))
-        forecast = forecast_solar(df, method=args.method, horizon=args.horizon,
-                                  interval=args.interval, unit=args.unit)
+        df = load_solar_csv(str(csv_file), days=config.train_days)
+        frame = bands = None
+        quantiles = CONFIG["forecast_quantiles"] if args.bands else None
+        if args.joint:
+            frame = forecast_multi(df, method=args.method, horizon=args.horizon,
+                                   interval=args.interval, unit=args.unit,
+                                   model_key=model_key_for(csv_file), refit=args.refit,
+                                   config=config, quantiles=quantiles)
+            forecast = frame["solar"]
+            bands = solar_bands(frame, "solar_") if args.bands else None
+        else:
+            forecast = forecast_solar(df, method=args.method, horizon=args.horizon,
+                                      interval=args.interval, unit=args.unit,
+                                      model_key=model_key_for(csv_file), refit=args.refit,
+                                      config=config, quantiles=quantiles)
+            if args.bands:
+                forecast, bands = forecast["forecast"], solar_bands(forecast)
         
         # Data range info
         data_start = df.index[0].strftime("%d-%m-%Y")
@@ -354,52 +771,27 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
         unit_label = get_unit_label(args.unit)
         interval_label = "15min" if args.interval == "15min" else "hourly"
         
-        # Calculate interval-aware stats
-        if args.interval == "15min":
-            # 15-minute intervals: 4 per hour
-            intervals_1h = 4
-            intervals_6h = 24
-            intervals_24h = 96
-        else:
-            # Hourly intervals
-            intervals_1h = 1
-            intervals_6h = 6
-            intervals_24h = 24
-        
         # Build result
-        result = {
-            "status": "success",
-            "timestamp": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
-            "weather": args.weather,
-            "method": args.method or "ensemble",
-            "horizon_hours": args.horizon,
-            "unit": unit_label,
-            "interval": args.interval,
-            "confidence": 0.87,
-            "data_range": {
-                "start": data_start,
-                "end": data_end
-            },
-            f"forecast_{args.unit}": {
-                "first": round(float(forecast.iloc[0]), 2),
-                "avg_1h": round(float(forecast.iloc[:min(intervals_1h, len(forecast))].mean()), 2),
-                "avg_6h": round(float(forecast.iloc[:min(intervals_6h, len(forecast))].mean()), 2),
-                "avg_24h": round(float(forecast.iloc[:min(intervals_24h, len(forecast))].mean()), 2),
-                "avg_total": round(float(forecast.mean()), 2),
-            },
-            f"{interval_label}_forecast_{args.unit}": [round(x, 2) for x in forecast.tolist()]
+        info = {
+            "data_range": {"start": data_start, "end": data_end},
+            "data_quality": df.attrs.get("gap_stats", {}),
         }
+        result = forecast_result(forecast, info, args.weather, args.method, args.horizon,
+                                 args.unit, args.interval, frame, bands)
         
         # If specific target time requested, add that forecast
         if args.target:
             result["target_forecast"] = get_forecast_for_target(
-                csv_file, args.target, args.method, args.unit, args.interval
+                csv_file, args.target, args.method, args.unit, args.interval, config
             )
         
 
         # ---------------------------------------------------------
         # ROBUST FILE WRITING TO BACKEND
         # ---------------------------------------------------------
+        # Keep stdout clean for the machine-readable stream formats
+        diag = sys.stderr if args.format in STREAM_FORMATS else sys.stdout
+        
         try:
             # Resolve project root (Solar Schedular) from ML_Engine/cli.py
             root_dir = Path(__file__).resolve().parents[1]
@@ -410,8 +802,6 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
             
             backend_file = backend_dir / "ml_forecast.json"
             
-            print(f"DEBUG: Attempting to write to: {backend_file}")
-            
             # Extract Avg (1h) dynamically based on unit
             forecast_key = f"forecast_{args.unit}"
             avg_1h_value = result[forecast_key]["avg_1h"]
@@ -419,24 +809,43 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
             output_data = {
                 "avgKw1h": avg_1h_value,
                 "confidence": result["confidence"],
-                "generatedAt": result["timestamp"]
+                "generatedAt": result["timestamp"],
+                "unit": args.unit,
+                "interval": interval_label,
+                "steps": result[f"{interval_label}_forecast_{args.unit}"],
             }
             
-            with open(backend_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
-                
-            print(f"✅ Successfully wrote ML forecast to: {backend_file}")
+            # Rewritten (atomically, version + 1) only on a material change
+            tolerance = CONFIG["publish_tolerance_kw"]
+            if args.unit == "wh":
+                tolerance = convert_kw_to_wh(tolerance, 15 if args.interval == "15min" else 60)
+            outcome, published = publish_forecast(backend_file, output_data, tolerance)
+            
+            if outcome == "written":
+                print(f"✅ Published ML forecast v{published['version']} to: {backend_file}", file=diag)
+            else:
+                reason = outcome.replace("_", " ")
+                print(f"✅ ML forecast v{published.get('version')} kept ({reason}): {backend_file}",
+                      file=diag)
+            BACKEND_WRITES.inc(result=outcome)
             
         except Exception as e:
-            print(f"❌ CRITICAL ERROR: Failed to write ML forecast file.")
-            print(f"Path attempted: {locals().get('backend_file', 'UNKNOWN')}")
-            print(f"Error details: {e}")
+            BACKEND_WRITES.inc(result="error")
+            print(f"❌ CRITICAL ERROR: Failed to write ML forecast file.", file=diag)
+            print(f"Path attempted: {locals().get('backend_file', 'UNKNOWN')}", file=diag)
+            print(f"Error details: {e}", file=diag)
             # Ensure we don't crash the main CLI output, but strictly report this error
 
         
         # Output based on format
         if args.format == 'json':
             print(json.dumps(result, indent=2))
+        elif args.format in STREAM_FORMATS:
+            # Series and bands go in the step records / rows, not the header
+            bands_key = f"{interval_label}_bands_{args.unit}"
+            meta = {k: v for k, v in result.items() if not isinstance(v, list) and k != bands_key}
+            write_forecast(frame if frame is not None else with_bands(forecast, bands),
+                           meta, args.format, args.unit, args.interval)
         else:
             print("=" * 50)
             print(f"☀️  SOLAR FORECAST ({args.weather.upper()}) - {unit_label}")
@@ -473,7 +882,7 @@ Output Units: kw (kilowatts - power) | wh (watt-hours - energy)
             "error": str(e),
             "type": type(e).__name__
         }
-        print(json.dumps(error, indent=2) if args.format == 'json' else f"Error: {e}")
+        print_error(error, args.format)
         sys.exit(1)
 
 
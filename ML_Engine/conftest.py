@@ -32,3 +32,23 @@ def sample_forecast(sunny_data):
     """Generate a 24-hour forecast from sunny data"""
     from src.forecast_solar import forecast_solar
     return forecast_solar(sunny_data)
+
+
+@pytest.fixture
+def fleet_history(tmp_path):
+    """Ten synthetic sites, eight days, as a (time x site) frame"""
+    from src.fleet import load_fleet_csv
+    from src.synthetic import iter_chunks, write_csv
+    path = tmp_path / "fleet.csv"
+    write_csv(path, iter_chunks(periods=8 * 24, sites=10, seed=3))
+    return load_fleet_csv(path, hours=8 * 24)
+
+
+@pytest.fixture(autouse=True)
+def isolated_models(tmp_path, monkeypatch):
+    """Keep model registry / ensemble weight files and data caches out of the source tree during tests"""
+    from src.config import CONFIG
+    monkeypatch.setitem(CONFIG, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(CONFIG, "registry_dir", str(tmp_path / "registry"))
+    monkeypatch.setitem(CONFIG, "ensemble_weights_path", str(tmp_path / "ensemble_weights.json"))
+    return tmp_path
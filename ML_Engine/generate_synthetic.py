@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Synthetic Data Generator CLI
+
+Writes deterministic synthetic solar/load history for scale and load tests.
+
+Usage Examples:
+    python generate_synthetic.py --out data/solar_data_synthetic.csv --days 30
+    python generate_synthetic.py --out /tmp/fleet.csv --days 365 --freq 15min --sites 1000
+    python generate_synthetic.py --out /tmp/site.ring --store ring --days 30
+    python generate_synthetic.py --out /tmp/dirty.csv --gap-rate 0.02 --duplicate-rate 0.01
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ML_ENGINE_ROOT = Path(__file__).parent
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+from src.synthetic import SCENARIOS, iter_chunks, write_csv, write_ring
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic solar/load history generator')
+    parser.add_argument('--out', required=True, help='Output file (.csv or .ring)')
+    parser.add_argument('--store', choices=['csv', 'ring'], default='csv',
+                        help='csv file or ring buffer store (default: csv)')
+    parser.add_argument('--start', default='2026-01-01', help='First timestamp (default: 2026-01-01)')
+    parser.add_argument('--days', type=int, default=30, help='Days of history (default: 30)')
+    parser.add_argument('--freq', choices=['h', '15min'], default='h', help='Grid step (default: h)')
+    parser.add_argument('--sites', type=int, default=1, help='Number of sites (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--scenario', choices=list(SCENARIOS), default=None,
+                        help='Cloudiness preset for every site')
+    parser.add_argument('--gap-rate', type=float, default=0.0, help='Fraction of readings dropped')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0,
+                        help='Fraction of readings repeated')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000,
+                        help='Rows generated per chunk (default: 1000000)')
+    args = parser.parse_args()
+
+    per_day = 96 if args.freq == '15min' else 24
+    chunks = iter_chunks(
+        start=args.start, periods=args.days * per_day, freq=args.freq, sites=args.sites,
+        seed=args.seed, gap_rate=args.gap_rate, duplicate_rate=args.duplicate_rate,
+        chunk_rows=args.chunk_rows, **SCENARIOS.get(args.scenario, {}),
+    )
+
+    started = time.perf_counter()
+    if args.store == 'ring':
+        rows = write_ring(args.out, chunks, freq=args.freq)
+    else:
+        rows = write_csv(args.out, chunks)
+    elapsed = time.perf_counter() - started
+
+    print(f"Wrote {rows:,} rows to {args.out} in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Ensemble Weight Learner
+
+Backtests every ensemble member on the scenario files (rolling origin, one
+day apart) and stores per-horizon-step inverse-MSE blend weights in
+models/ensemble_weights.json, one entry per scenario under its model registry
+key (site, scenario), which forecast_solar then uses for that scenario
+instead of the constant CONFIG["blend_ratio"].
+
+Usage Examples:
+    python learn_ensemble_weights.py
+    python learn_ensemble_weights.py --members arima persistence profile --folds 6
+    python learn_ensemble_weights.py --weather sunny --target load
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings('ignore')
+
+ML_ENGINE_ROOT = Path(__file__).parent
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+import numpy as np
+
+from src.config import CONFIG
+from src.data_utils import load_regular_history
+from src.ensemble import backtest_errors, learn_weights, save_weights, weights_path
+from src.forecast_solar import FORECAST_METHODS, FORECAST_TARGETS
+from src.model_registry import model_key_for
+from src.scenarios import discover_scenarios
+
+
+def main():
+    data_dir = ML_ENGINE_ROOT / "data"
+    scenarios = discover_scenarios(data_dir)
+
+    parser = argparse.ArgumentParser(description='Learn per-step ensemble blend weights')
+    parser.add_argument('--weather', nargs='+', choices=list(scenarios), default=list(scenarios),
+                        help='Scenario files to backtest on (default: all)')
+    parser.add_argument('--members', nargs='+', choices=list(FORECAST_METHODS),
+                        default=list(CONFIG["ensemble_members"]),
+                        help='Ensemble members (default: CONFIG["ensemble_members"])')
+    parser.add_argument('--target', choices=list(FORECAST_TARGETS), default='solar',
+                        help='Column to learn weights for (default: solar)')
+    parser.add_argument('--horizon', type=int, default=24, help='Backtest horizon in hours (default: 24)')
+    parser.add_argument('--folds', type=int, default=4, help='Forecast origins per scenario (default: 4)')
+    args = parser.parse_args()
+
+    column = FORECAST_TARGETS[args.target]
+    calls = {m: FORECAST_METHODS[m] for m in args.members}
+    started = time.perf_counter()
+    print(f"Backtesting {', '.join(args.members)} on {', '.join(args.weather)}")
+    for name in args.weather:
+        history, _ = load_regular_history(str(scenarios[name]))
+        history = history.ffill().fillna(0)
+        errors = backtest_errors(calls, history, args.horizon, args.folds, column)
+
+        weights = learn_weights(errors)
+        rmse = {m: round(float(np.sqrt(e.mean())), 3) for m, e in errors.items()}
+        model_key = model_key_for(scenarios[name])
+        save_weights(column, weights, model_key, horizon=args.horizon,
+                     folds=len(errors[args.members[0]]), rmse_kw=rmse)
+
+        print(f"{'/'.join(model_key)}:")
+        for m in args.members:
+            print(f"  {m:<12} RMSE {rmse[m]:.3f} kW  mean weight {weights[m].mean():.2f}")
+
+    print(f"Saved {column} weights to {weights_path()} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
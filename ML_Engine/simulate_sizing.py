@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Sizing Simulator
+
+Replays the stored history in data/ through the backend scheduler
+(CRITICAL / FLEXIBLE / OPTIONAL allocation, battery clamp) for every
+combination of battery size, panel kW and efficiency, and reports unmet
+critical load and curtailed solar per combination.
+
+Ranges are start:stop:count (inclusive, evenly spaced) or comma-separated
+values; devices default to the backend's default device list.
+
+The history is read as the output of a --reference-kw panel, by default
+the largest peak of all data/ scenarios (or of --data): one reference for
+every scenario, so a cloudy day stays cloudy next to a sunny one. The
+assumption is reported as "reference_kw" in the output.
+
+Usage Examples:
+    python simulate_sizing.py --weather sunny
+    python simulate_sizing.py --weather all --battery 0:20000:41 --panel 1:10:19 --efficiency 0.7:0.95:6
+    python simulate_sizing.py --data /tmp/site.csv --devices devices.json --out /tmp/sizing.csv
+"""
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+ML_ENGINE_ROOT = Path(__file__).parent
+sys.path.insert(0, str(ML_ENGINE_ROOT))
+
+from src.scenarios import discover_scenarios
+from src.simulate import DEFAULT_DEVICES, config_grid, load_replay, shared_reference_kw, simulate
+
+
+def parse_values(text):
+    """'start:stop:count' (inclusive linspace) or 'a,b,c' -> array of floats"""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(v) for v in text.split(',')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='What-if replay of battery / panel sizing')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--weather', default='all',
+                        help='Scenario from data/solar_data_<name>.csv, or all (default: all)')
+    source.add_argument('--data', help='History CSV to replay instead of a scenario')
+    parser.add_argument('--battery', type=parse_values, default='0:20000:21',
+                        help='Battery capacities in Wh (default: 0:20000:21)')
+    parser.add_argument('--panel', type=parse_values, default='1:10:10',
+                        help='Panel capacities in kW (default: 1:10:10)')
+    parser.add_argument('--efficiency', type=parse_values, default='0.75:0.95:5',
+                        help='System efficiencies (default: 0.75:0.95:5)')
+    parser.add_argument('--reference-kw', type=float, default=None,
+                        help='Panel kW that produced the history (default: largest peak of all '
+                             'data/ scenarios, or of --data)')
+    parser.add_argument('--devices', help='JSON file with a list of {name, powerW, type} devices')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Combinations listed per scenario (default: 5)')
+    parser.add_argument('--out', help='Write every combination and its metrics to this CSV')
+    args = parser.parse_args()
+
+    if args.data:
+        sources = {Path(args.data).stem: Path(args.data)}
+    else:
+        sources = discover_scenarios(ML_ENGINE_ROOT / 'data')
+        if args.weather != 'all':
+            if args.weather not in sources:
+                parser.error(f"no data/solar_data_{args.weather}.csv")
+            sources = {args.weather: sources[args.weather]}
+    devices = json.loads(Path(args.devices).read_text()) if args.devices else DEFAULT_DEVICES
+
+    replays = {name: load_replay(csv_file) for name, csv_file in sources.items()}
+    if args.reference_kw:
+        reference_kw, basis = args.reference_kw, "--reference-kw"
+    elif args.data:
+        reference_kw, basis = shared_reference_kw(replays.values()), "peak of --data"
+    else:
+        # Every scenario, not only the selected ones: results do not depend on --weather
+        everything = [load_replay(path) for path in discover_scenarios(ML_ENGINE_ROOT / 'data').values()]
+        reference_kw, basis = shared_reference_kw(everything), "largest peak of the data/ scenarios"
+
+    configs = config_grid(args.battery, args.panel, args.efficiency)
+    results, summary = [], {}
+    for name, solar_kw in replays.items():
+        started = time.perf_counter()
+        result = simulate(solar_kw, configs, devices, reference_kw=reference_kw)
+        seconds = time.perf_counter() - started
+        # Fewest unmet critical Wh first, then the smallest system, then least curtailment
+        best = result.sort_values(['unmet_critical_wh', 'battery_wh', 'panel_kw', 'curtailed_wh'])
+        summary[name] = {
+            "steps": len(solar_kw),
+            "combinations": len(result),
+            "seconds": round(seconds, 3),
+            "best": best.head(args.top).round(3).to_dict(orient='records'),
+        }
+        results.append(result.assign(scenario=name))
+
+    if args.out:
+        pd.concat(results, ignore_index=True).round(3).to_csv(args.out, index=False)
+    print(json.dumps({"reference_kw": round(reference_kw, 3),
+                      "reference": f"history read as the output of a {reference_kw:g} kW panel ({basis})",
+                      "scenarios": summary, "out": args.out}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
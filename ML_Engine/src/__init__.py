@@ -1,15 +1,17 @@
 # ML_Engine Source Module
 """Core forecasting functions and utilities"""
 
-from .config import CONFIG
+from .config import CONFIG, ForecastConfig
 from .data_utils import load_solar_csv, validate_data
-from .forecast_solar import forecast_solar, persistence_forecast, arima_forecast
+from .forecast_solar import forecast_solar, forecast_multi, persistence_forecast, arima_forecast
 
 __all__ = [
     'CONFIG',
+    'ForecastConfig',
     'load_solar_csv',
     'validate_data',
     'forecast_solar',
+    'forecast_multi',
     'persistence_forecast',
     'arima_forecast'
 ]
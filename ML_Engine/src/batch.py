@@ -0,0 +1,154 @@
+"""
+Batch queries: many forecast requests answered by one process.
+
+A reporting job that launches cli.py once per (--target, --unit,
+--interval, --weather) combination pays for an interpreter start, a CSV
+load and a model fit every time. cli.py --batch instead reads one JSON
+request per stdin line:
+
+    {"id": "r1", "weather": "sunny", "unit": "wh", "interval": "15min",
+     "target": "01-02-2026 14:00", "method": "arima", "horizon": 48,
+     "joint": false, "bands": true}
+
+(every field optional; defaults come from the CLI flags). Requests are
+grouped by (data file, method, horizon) - the only fields that change the
+fit. Each group is loaded and fitted once as an hourly kW forecast, groups
+concurrently in a thread pool; unit, interval and target are then applied
+per request to the group's forecast, exactly as forecast_solar would.
+Quantile bands are always computed with the fit (they are a by-product of
+the forecast variance) and only reported when a request asks for them.
+Responses are yielded in input order, each as soon as its group is done.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import CONFIG, ForecastConfig
+from .data_utils import load_solar_csv
+from .forecast_solar import FORECAST_METHODS, forecast_multi, forecast_solar
+from .model_registry import model_key_for
+
+REQUEST_FIELDS = ("id", "weather", "method", "horizon", "unit", "interval", "target", "joint",
+                  "bands")
+
+
+def parse_request(line, defaults, scenarios):
+    """
+    One NDJSON request line merged over the defaults and validated.
+
+    Args:
+        defaults: dict of REQUEST_FIELDS values (from the CLI flags)
+        scenarios: dict weather name -> CSV path
+
+    Returns:
+        dict with every REQUEST_FIELDS key
+    """
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    unknown = sorted(set(request) - set(REQUEST_FIELDS))
+    if unknown:
+        raise ValueError(f"unknown request fields {unknown}, use {list(REQUEST_FIELDS)}")
+    merged = {**defaults, **request}
+    if merged["weather"] not in scenarios:
+        raise ValueError(f"weather: one of {', '.join(map(repr, scenarios))}")
+    if merged["method"] is not None and merged["method"] not in FORECAST_METHODS:
+        raise ValueError(f"method: one of {', '.join(map(repr, FORECAST_METHODS))}")
+    if merged["unit"] not in ("kw", "wh"):
+        raise ValueError("unit: 'kw' or 'wh'")
+    if merged["interval"] not in ("1h", "15min"):
+        raise ValueError("interval: '1h' or '15min'")
+    horizon = merged["horizon"]
+    if horizon is not None and (not isinstance(horizon, int) or isinstance(horizon, bool) or horizon < 1):
+        raise ValueError("horizon: positive integer (hours)")
+    return merged
+
+
+def request_id(line):
+    """The "id" of a request line that failed validation, if it has one"""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None
+    return request.get("id") if isinstance(request, dict) else None
+
+
+def group_config(request, config):
+    """ForecastConfig of the request's fit group (hourly kW)"""
+    return config.replace(forecast_method=request["method"], horizon_hours=request["horizon"],
+                          forecast_interval="1h", output_unit="kw")
+
+
+def fit_group(csv_file, config, joint=False, refit=False):
+    """
+    Load one data file and fit it once.
+
+    Returns:
+        (hourly kW pd.DataFrame with a "solar" column and "solar_p10", ...
+        bands, plus "load" and "net" when joint, info dict with data_range /
+        data_quality)
+    """
+    df = load_solar_csv(str(csv_file), days=config.train_days)
+    options = dict(interval="1h", unit="kw", model_key=model_key_for(csv_file), refit=refit,
+                   config=config, quantiles=CONFIG["forecast_quantiles"])
+    if joint:
+        hourly = forecast_multi(df, **options)
+    else:
+        hourly = forecast_solar(df, **options).add_prefix("solar_").rename(
+            columns={"solar_forecast": "solar"})
+    info = {
+        "data_range": {
+            "start": df.index[0].strftime("%d-%m-%Y"),
+            "end": df.index[-1].strftime("%d-%m-%Y"),
+        },
+        "data_quality": df.attrs.get("gap_stats", {}),
+    }
+    return hourly, info
+
+
+def iter_batch(lines, scenarios, defaults, config=None, refit=False, max_workers=None):
+    """
+    Answer NDJSON request lines with one fit per (data file, method, horizon).
+
+    Args:
+        lines: iterable of request lines (blank lines are skipped)
+        scenarios: dict weather name -> CSV path
+        defaults: dict of REQUEST_FIELDS values for fields a request omits
+        config: base ForecastConfig (default: snapshot of CONFIG)
+        max_workers: concurrent group fits (default: CONFIG["max_workers"] or one per group)
+
+    Yields:
+        (index, request dict, (hourly frame, info) or None, error or None) in
+        input order; for an invalid request the dict only carries its "id"
+    """
+    config = config or ForecastConfig.from_config()
+    parsed, groups = [], {}
+    for index, line in enumerate(l for l in lines if l.strip()):
+        try:
+            request = parse_request(line, defaults, scenarios)
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            parsed.append((index, {"id": request_id(line)}, None, e))
+            continue
+        group = group_config(request, config)
+        key = (str(scenarios[request["weather"]]), group.forecast_method, group.horizon_hours)
+        entry = groups.setdefault(key, {"config": group, "joint": False})
+        entry["joint"] = entry["joint"] or bool(request["joint"])
+        parsed.append((index, request, key, None))
+
+    if not groups:
+        for index, request, _, error in parsed:
+            yield index, request, None, error
+        return
+
+    workers = min(max_workers or CONFIG.get("max_workers") or len(groups), len(groups))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {key: pool.submit(fit_group, key[0], entry["config"], entry["joint"], refit)
+                   for key, entry in groups.items()}
+        for index, request, key, error in parsed:
+            if error is not None:
+                yield index, request, None, error
+                continue
+            try:
+                result, error = futures[key].result(), None
+            except Exception as e:
+                result, error = None, e
+            yield index, request, result, error
@@ -1,16 +1,158 @@
+import hashlib
+from dataclasses import astuple, dataclass, fields, replace
 
 CONFIG = {
     # Forecasting parameters
     "forecast_method": "arima",       # persistence, arima
     "horizon_hours": 48,              # Extended to 48 hours for better coverage
-    "train_days": 7,
+    "train_days": 7,                  # training window (load_solar_csv), up to months
+    "fit_window_days": 14,            # SARIMA estimated on at most the newest N days
+    "fit_budget_s": 30,               # wall-clock cap per SARIMA estimation (None = off)
+    "profile_halflife_days": None,    # profile member day weights (None = equal), e.g. 14 for months
     "arima_order": (2, 1, 2),
     "arima_seasonal": (1, 1, 1, 24),
-    "blend_ratio": 0.7,              # 70% ARIMA + 30% persistence
+    "blend_ratio": 0.7,              # 70% ARIMA + 30% persistence (prior when no learned weights)
+    
+    # Ensemble: members blended with the forecast method (run concurrently),
+    # per-member timeouts, and weights learned by learn_ensemble_weights.py
+    "ensemble_members": ("arima", "persistence"),
+    "ensemble_timeout_s": 60,
+    "ensemble_member_timeouts": {},   # e.g. {"arima": 20}
+    "ensemble_weights_path": None,    # None = ML_Engine/models/ensemble_weights.json
     
     # Output unit: "kw" (kilowatts - power) or "wh" (watt-hours - energy)
     "output_unit": "kw",
     
     # Forecast interval: "1h" (hourly) or "15min" (15-minute intervals)
     "forecast_interval": "1h",
+    
+    # Prediction intervals (forecast_solar(quantiles=...), cli.py --bands)
+    "forecast_quantiles": (0.1, 0.5, 0.9),
+    
+    # History repair: longest gap (grid steps) filled by seasonal interpolation
+    "max_gap_steps": 6,
+    
+    # Ingestion: rows kept in the history CSV (30 days, raised to cover
+    # train_days), and extra rows the sorted CSV may grow by before its head
+    # is trimmed
+    "retention_hours": 720,
+    "retention_slack": 720,
+    
+    # History storage: "csv" (sorted CSV, upserted in place) or "ring" (memory-mapped
+    # ring buffer of retention_hours slots, seeded from the CSV on first use)
+    "history_backend": "csv",
+    
+    # Sidecar caches (regular grid, forecast, nowcast, feature store)
+    "cache_dir": None,                # None = <data dir>/.cache
+    
+    # --next refresh: cached forecast is refitted after this many minutes;
+    # in between, the nowcast corrects it from the latest readings
+    "forecast_cache_minutes": 60,
+    "nowcast_mode": "ratio",          # ratio (obs / forecast) or bias (obs - forecast)
+    "nowcast_alpha": 0.5,             # EWMA weight of the newest reading
+    "nowcast_decay": 0.8,             # correction weight kept per 15 minutes ahead
+    "nowcast_min_kw": 0.1,            # below this forecast, ratio is not updated
+    
+    # Backend/ml_forecast.json is only rewritten (version + 1) when some
+    # published step moved by more than this (kW; Wh forecasts: the same
+    # power over the step)
+    "publish_tolerance_kw": 0.01,
+    
+    # Native 15-minute path (src/subhourly.py): "auto" when the stored
+    # history is 15-minute, "native" always, "interpolate" never
+    "subhourly_mode": "auto",
+    "subhourly_ar_order": 4,          # residual AR order (4 = one hour of 15-min lags)
+    "subhourly_profile_halflife_days": 2,
+    
+    # Model registry: fitted SARIMA parameters per site and scenario, reused
+    # with a single filter pass until they are registry_refit_days old
+    "site_id": "default",
+    "registry_dir": None,             # None = ML_Engine/models/registry
+    "registry_refit_days": 7,
+    "registry_keep": 5,               # versions kept per site/scenario/column
+    # Refits start from the newest converged parameters with a tighter
+    # iteration cap; a warm start that does not converge is refitted cold
+    "warm_start": True,
+    "warm_start_maxiter": 30,         # vs statsmodels' default 50
+    
+    # Fleet mode (fleet_forecast.py): sites clustered by normalised diurnal
+    # profile, SARIMA estimated once per cluster and filtered per site
+    "fleet_clusters": 8,
+    
+    # Portfolio forecasts (src/hierarchy.py): total and per-group fits,
+    # reconciled with cheap per-site forecasts
+    "portfolio_groups": 4,            # diurnal-profile clusters (0 = total only)
+    "portfolio_weights": "variance",  # reconciliation: variance, structural, ols
+    
+    # Metrics: Prometheus text file written by cli.py on exit (None = off)
+    "metrics_file": None,
+    
+    # Thread pool size for concurrent per-column fits (None = one per column)
+    "max_workers": None,
 }
+
+
+def retention_hours():
+    """Hourly rows of history kept: CONFIG["retention_hours"], at least train_days"""
+    return max(CONFIG["retention_hours"], 24 * CONFIG["train_days"])
+
+
+@dataclass(frozen=True)
+class ForecastConfig:
+    """
+    Immutable, hashable per-request forecast settings.
+    
+    Passed explicitly through forecast_solar / forecast_multi and the cache,
+    so requests with different settings can run concurrently in one process
+    without touching CONFIG. Field names match the CONFIG keys; build one
+    with ForecastConfig.from_config(), which snapshots CONFIG at call time.
+    """
+    forecast_method: str
+    horizon_hours: int
+    train_days: int
+    fit_window_days: int
+    fit_budget_s: float                # None or 0 = unlimited
+    warm_start: bool
+    warm_start_maxiter: int
+    profile_halflife_days: float       # None or 0 = equal weights
+    arima_order: tuple
+    arima_seasonal: tuple
+    blend_ratio: float
+    ensemble_members: tuple
+    ensemble_timeout_s: float
+    ensemble_member_timeouts: tuple    # (member, seconds) pairs
+    output_unit: str
+    forecast_interval: str
+    
+    def __post_init__(self):
+        # Normalise list / dict values so the config stays hashable
+        for name in ("arima_order", "arima_seasonal", "ensemble_members"):
+            object.__setattr__(self, name, tuple(getattr(self, name)))
+        timeouts = self.ensemble_member_timeouts
+        if isinstance(timeouts, dict):
+            timeouts = timeouts.items()
+        object.__setattr__(self, "ensemble_member_timeouts", tuple(sorted(timeouts)))
+    
+    @classmethod
+    def from_config(cls, **overrides):
+        """Snapshot of the current CONFIG; None overrides are ignored"""
+        values = {f.name: CONFIG[f.name] for f in fields(cls)}
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+    
+    @classmethod
+    def resolve(cls, config=None, **overrides):
+        """`config` (or a CONFIG snapshot) with the non-None overrides applied"""
+        return (config or cls.from_config()).replace(**overrides)
+    
+    def replace(self, **changes):
+        """Copy with some fields changed; None values are ignored"""
+        return replace(self, **{k: v for k, v in changes.items() if v is not None})
+    
+    def member_timeout(self, name):
+        """Seconds an ensemble member may run"""
+        return dict(self.ensemble_member_timeouts).get(name, self.ensemble_timeout_s)
+    
+    def digest(self):
+        """Short stable hash of every field, for cache keys"""
+        return hashlib.sha1(repr(astuple(self)).encode()).hexdigest()[:10]
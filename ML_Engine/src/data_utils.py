@@ -1,22 +1,247 @@
 import pandas as pd
+import numpy as np
+import json
 import os
+from pathlib import Path
+from .config import CONFIG
+from .metrics import HISTORY_LAST_TS, HISTORY_ROWS, INGEST_SECONDS, INGEST_TOTAL, LOAD_SECONDS
 
-def load_solar_csv(filename):
-    """Load + clean historical solar CSV"""
+VALUE_COLUMNS = ['solar_power_kw', 'load_total_kw']
+REGULAR_CACHE_VERSION = 3
+
+
+def regularize_series(df, freq="h", max_gap=None):
+    """
+    Snap readings onto a regular time grid and repair short gaps.
+    
+    O(n) and vectorised over int64 nanosecond timestamps: sorts only if the
+    input is out of order, keeps the last of duplicate timestamps, scatters
+    values onto the grid and fills gaps of up to max_gap steps by seasonal
+    interpolation (mean of the same slot one day before/after, linear
+    interpolation where neither is available). Longer gaps stay NaN.
+    The grid is anchored at whole steps (the first reading floored to the
+    step) and off-grid readings are floored into the step they fall in.
+    Readings finer than the grid (15-minute ingest on the hourly grid) are
+    averaged into their step instead of being snapped.
+    
+    Args:
+        df: DataFrame with 'timestamp' column and VALUE_COLUMNS
+        freq: grid step ("h" or "15min")
+        max_gap: longest gap (in steps) to fill (default: CONFIG["max_gap_steps"])
+    
+    Returns:
+        (pd.DataFrame indexed by timestamp on the grid, dict of gap stats)
+    """
+    max_gap = CONFIG["max_gap_steps"] if max_gap is None else max_gap
+    step = pd.tseries.frequencies.to_offset(freq).nanos
+    season = pd.Timedelta("1D").value // step
+    
+    ts = df['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64')
+    values = df[VALUE_COLUMNS].to_numpy(dtype=float)
+    
+    # Sort only when needed (stable, so "last" duplicate stays last)
+    diffs = np.diff(ts)
+    out_of_order = int((diffs < 0).sum())
+    if out_of_order:
+        order = np.argsort(ts, kind='stable')
+        ts, values = ts[order], values[order]
+        diffs = np.diff(ts)
+    
+    # Duplicates: keep the last reading of each timestamp
+    keep = np.append(diffs != 0, True)
+    duplicates = int(len(ts) - keep.sum())
+    ts, values = ts[keep], values[keep]
+    
+    # Native reading interval (median spacing)
+    native_step = int(np.median(np.diff(ts))) if len(ts) > 1 else step
+    
+    # Snap onto whole steps (the first reading floored to the grid step)
+    anchor = ts[0] - ts[0] % step
+    offsets = ts - anchor
+    off_grid = int((offsets % step != 0).sum())
+    if native_step < step:
+        # Sub-step readings: mean of each step (NaN readings ignored)
+        slots = offsets // step
+        starts = np.flatnonzero(np.append(True, np.diff(slots) != 0))
+        valid = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = (np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+                      / np.add.reduceat(valid, starts, axis=0))
+        slots = slots[starts]
+    else:
+        # Floor: a reading belongs to the step it falls in (no half-to-even flips)
+        slots = offsets // step
+        if off_grid:
+            keep = np.append(np.diff(slots) != 0, True)
+            slots, values = slots[keep], values[keep]
+    
+    n = int(slots[-1]) + 1
+    grid = np.full((n, values.shape[1]), np.nan)
+    grid[slots] = values
+    
+    # Gap runs from slot differences
+    slot_gaps = np.diff(slots) - 1
+    gap_lengths = slot_gaps[slot_gaps > 0]
+    nan_values = int(np.isnan(grid).sum())
+    
+    # Short gaps: seasonal interpolation, linear where no seasonal neighbour
+    filled = 0
+    for col in range(grid.shape[1]):
+        column = grid[:, col]
+        missing = np.isnan(column)
+        known = np.flatnonzero(~missing)
+        if not missing.any() or not len(known):
+            continue
+        run_id = np.cumsum(~missing)
+        run_len = np.bincount(run_id, weights=missing)[run_id]
+        idx = np.flatnonzero(missing & (run_len <= max_gap) & (run_id > 0))
+        if not len(idx):
+            continue
+        before = np.where(idx - season >= 0, column[np.maximum(idx - season, 0)], np.nan)
+        after = np.where(idx + season < n, column[np.minimum(idx + season, n - 1)], np.nan)
+        seasonal = np.where(np.isnan(before), after,
+                            np.where(np.isnan(after), before, (before + after) / 2))
+        linear = np.interp(idx, known, column[known])
+        column[idx] = np.where(np.isnan(seasonal), linear, seasonal)
+        filled += len(idx)
+    
+    index = pd.DatetimeIndex(anchor + np.arange(n, dtype=np.int64) * step, name='timestamp')
+    stats = {
+        "rows_in": int(len(df)),
+        "rows_out": n,
+        "native_step_s": native_step // 10**9,
+        "out_of_order": out_of_order,
+        "duplicates": duplicates,
+        "off_grid": off_grid,
+        "missing_steps": int(n - len(slots)),
+        "gaps": int(len(gap_lengths)),
+        "max_gap_steps": int(gap_lengths.max()) if len(gap_lengths) else 0,
+        "nan_values": nan_values,
+        "filled_values": filled,
+        "unfilled_values": nan_values - filled,
+    }
+    return pd.DataFrame(grid, index=index, columns=VALUE_COLUMNS), stats
+
+
+def cache_path(filename, suffix):
+    """
+    Sidecar cache file for a data file: <data dir>/.cache/<stem>.<suffix>,
+    or <CONFIG["cache_dir"]>/<stem>.<suffix> when set.
+    """
+    source = Path(filename)
+    folder = Path(CONFIG["cache_dir"]) if CONFIG.get("cache_dir") else source.parent / ".cache"
+    return folder / f"{source.stem}.{suffix}"
+
+
+def load_regular_history(filename, freq="h"):
+    """
+    Full history on a regular grid, repaired once and cached next to the CSV.
+    
+    The cache is keyed on the source file's size and mtime, so ingestion
+    (which rewrites the CSV) invalidates it automatically.
+    
+    Returns:
+        (pd.DataFrame indexed by timestamp, dict of gap stats)
+    """
     if not os.path.exists(filename):
         raise FileNotFoundError(f"{filename} not found")
     
+    src = os.stat(filename)
+    source_key = [REGULAR_CACHE_VERSION, src.st_size, src.st_mtime_ns, freq]
+    cache = cache_path(filename, "regular.npz" if freq == "h" else f"regular-{freq}.npz")
+    
+    if cache.exists():
+        try:
+            with np.load(cache) as cached:
+                meta = json.loads(str(cached['meta']))
+                if meta['source'] == source_key:
+                    index = pd.DatetimeIndex(cached['timestamp'].view('datetime64[ns]'), name='timestamp')
+                    return pd.DataFrame(cached['values'], index=index, columns=VALUE_COLUMNS), meta['stats']
+        except (OSError, KeyError, ValueError):
+            pass  # Corrupt or old cache: rebuild below
+    
     df = pd.read_csv(filename)
     df['timestamp'] = pd.to_datetime(df['timestamp'])
+    regular, stats = regularize_series(df, freq=freq)
+    
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix('.tmp.npz')
+        np.savez(tmp,
+                 timestamp=regular.index.to_numpy(dtype='datetime64[ns]').view('int64'),
+                 values=regular.to_numpy(),
+                 meta=json.dumps({"source": source_key, "stats": stats}))
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # Read-only data dir: still return the repaired series
+    
+    return regular, stats
+
+
+def load_ring_window(filename, steps=None):
+    """
+    Training window from the memory-mapped ring buffer of a scenario CSV.
+    
+    The returned frame is a zero-copy view of the mapped file; it is only
+    copied when gaps (NaN slots) have to be filled.
+    
+    Args:
+        steps: window length (default: CONFIG["train_days"] days)
+    """
+    from .ring_buffer import open_ring_buffer, ring_path
     
-    # Last 7 days only
-    df = df.tail(168).sort_values('timestamp').reset_index(drop=True)
+    if not os.path.exists(filename) and not os.path.exists(ring_path(filename)):
+        raise FileNotFoundError(f"{filename} not found")
     
-    # Fill missing
-    df['solar_power_kw'] = df['solar_power_kw'].ffill().fillna(0)
-    df['load_total_kw'] = df['load_total_kw'].ffill().fillna(5)
+    df = open_ring_buffer(filename).window(steps or 24 * CONFIG["train_days"])
+    first = df['solar_power_kw'].first_valid_index()
+    if first is None:
+        raise ValueError("Need at least 1 day data")
+    df = df.loc[first:]
     
-    return df.set_index('timestamp')
+    missing = int(df.isna().any(axis=1).sum())
+    if missing:
+        df = df.copy()
+        df['solar_power_kw'] = df['solar_power_kw'].ffill().fillna(0)
+        df['load_total_kw'] = df['load_total_kw'].ffill().fillna(5)
+    
+    df.attrs['gap_stats'] = {"rows_out": int(len(df)), "missing_steps": missing}
+    return df
+
+
+def load_solar_csv(filename, freq="h", days=None):
+    """
+    Load + clean historical solar CSV.
+    
+    Args:
+        freq: grid step; "15min" reads the CSV log on a 15-minute grid (the
+            ring buffer backend is hourly only)
+        days: training window (default: CONFIG["train_days"])
+    """
+    days = days or CONFIG["train_days"]
+    with LOAD_SECONDS.time(backend=CONFIG["history_backend"]):
+        if CONFIG["history_backend"] == "ring" and freq == "h":
+            df = load_ring_window(filename, 24 * days)
+        else:
+            regular, stats = load_regular_history(filename, freq=freq)
+            
+            # Training window: the last `days` days
+            steps_per_hour = pd.Timedelta(hours=1) // pd.tseries.frequencies.to_offset(freq)
+            df = regular.tail(24 * days * steps_per_hour).copy()
+            
+            # Fill missing (gaps too long for seasonal repair)
+            df['solar_power_kw'] = df['solar_power_kw'].ffill().fillna(0)
+            df['load_total_kw'] = df['load_total_kw'].ffill().fillna(5)
+            
+            df.attrs['gap_stats'] = stats
+        df.attrs['source'] = str(filename)
+    
+    # Staleness: newest reading per source file
+    source = Path(filename).stem
+    HISTORY_ROWS.set(len(df), source=source)
+    if len(df):
+        HISTORY_LAST_TS.set(df.index[-1].timestamp(), source=source)
+    return df
 
 def validate_data(df):
     """Basic data validation"""
@@ -29,33 +254,159 @@ def validate_data(df):
 def append_new_reading(filename, timestamp_str, solar_kw, load_kw):
     """
     Safely appends a new sensor reading to the historical CSV while maintaining order.
-    """
-    import os
-    
-    # 1. Create the row
-    new_data = pd.DataFrame([{
-        'timestamp': timestamp_str,
-        'solar_power_kw': float(solar_kw),
-        'load_total_kw': float(load_kw)
-    }])
     
-    # 2. Convert timestamp to datetime for verification
-    new_data['timestamp'] = pd.to_datetime(new_data['timestamp'])
+    Late and duplicate readings are upserted through the HistoryStore: the
+    CSV stays sorted with one row per timestamp (new readings are appended,
+    late ones written in place after a binary search) and its head is
+    trimmed to the retention window once it outgrows it.
+    With CONFIG["history_backend"] == "ring" the reading is also an O(1)
+    slot write into the memory-mapped ring buffer (the training window);
+    the CSV stays the complete record for the 15-minute path, history
+    queries and the backend's chart. Every reading also
+    updates the nowcast correction of the cached forecast and, once it has
+    been built, extends the feature store by one row.
+    """
+    from .feature_store import feature_store_exists, get_feature_store
+    from .nowcast import update_nowcast
     
-    # 3. Handle file writing
-    if os.path.exists(filename):
-        df = pd.read_csv(filename)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Merge and remove duplicates
-        df = pd.concat([df, new_data])
-        df = df.drop_duplicates(subset=['timestamp'], keep='last')
+    with INGEST_SECONDS.time(backend=CONFIG["history_backend"]):
+        # Opened before the history write so it is not seen as stale
+        features = get_feature_store(filename) if feature_store_exists(filename) else None
+
+        from .history_store import get_history_store
+        outcome = get_history_store(filename).upsert(timestamp_str, solar_kw, load_kw)
+        if CONFIG["history_backend"] == "ring":
+            from .ring_buffer import open_ring_buffer
+            if not open_ring_buffer(filename).write(timestamp_str, solar_kw, load_kw):
+                outcome = "too_old"  # older than the ring window; CSV only
         
-        # Sort values and keep last 30 days (720 hours)
-        df = df.sort_values('timestamp').tail(720)
-    else:
-        df = new_data
+        # One feature row per reading instead of a rebuild
+        if features is not None:
+            features.upsert(timestamp_str, solar_kw, load_kw)
         
-    # 4. Save back to CSV
-    df.to_csv(filename, index=False)
+        # O(1) nowcast update against the cached forecast
+        update_nowcast(filename, timestamp_str, solar_kw)
+    INGEST_TOTAL.inc(result=outcome)
     return True
+
+
+def native_step_seconds(filename):
+    """Median spacing of the stored readings in seconds (3600 for hourly data)"""
+    if CONFIG["history_backend"] == "ring":
+        from .ring_buffer import open_ring_buffer
+        return open_ring_buffer(filename).step_ns // 10**9
+    _, stats = load_regular_history(filename)
+    return stats["native_step_s"]
+
+
+def history_arrays(filename):
+    """Full stored history as (int64 ns timestamps, float values) for queries"""
+    if CONFIG["history_backend"] == "ring":
+        from .ring_buffer import open_ring_buffer
+        frame = open_ring_buffer(filename).window()
+    else:
+        frame, _ = load_regular_history(filename)
+    return frame.index.to_numpy(dtype='datetime64[ns]').view('int64'), frame.to_numpy(dtype=float)
+
+
+def bucket_aggregate(stamps, values, points):
+    """
+    Min / max / mean of each of `points` equal-count buckets (NaN ignored).
+    
+    Returns:
+        (bucket start stamps, mins, maxs, means), value arrays shaped (points, columns)
+    """
+    points = max(1, min(points, len(stamps)))
+    starts = np.linspace(0, len(stamps), points + 1).astype(np.int64)[:-1]
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0) / counts
+    mins = np.fmin.reduceat(values, starts, axis=0)
+    maxs = np.fmax.reduceat(values, starts, axis=0)
+    return stamps[starts], mins, maxs, means
+
+
+def lttb_indices(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets: indices of `points` samples that keep
+    the visual shape of (x, y). First and last samples are always kept.
+    
+    Each bucket is one vectorised argmax over its triangle areas; only the
+    loop over buckets is in Python, so cost is O(points) NumPy calls.
+    """
+    n = len(x)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])[:max(points, 1)]
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    # Next-bucket averages, computed for every bucket at once
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])[1:]
+    avg_y = np.append(sums_y / sizes, y[-1])[1:]
+    
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[b]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def query_history(filename, start=None, end=None, points=1000, method="buckets",
+                  column="solar_power_kw"):
+    """
+    Bounded-size history for charts, independent of how much is stored.
+    
+    The [start, end] range is a binary search + slice on the stored arrays
+    (the cached regular grid, or the ring buffer view); downsampling is
+    vectorised over those arrays.
+    
+    Args:
+        filename: scenario CSV (or ring buffer source)
+        start, end: range bounds (anything pd.Timestamp accepts; None = open)
+        points: maximum rows returned
+        method: "buckets" (min/max/mean per bucket) or "lttb" (shape-preserving
+            sample of `column`, reporting every column at the chosen rows)
+        column: series LTTB selects on
+    
+    Returns:
+        pd.DataFrame indexed by timestamp; buckets gives <col> (mean),
+        <col>_min and <col>_max per value column. attrs["rows_in"] holds the
+        number of stored rows in range.
+    """
+    if method not in ("buckets", "lttb"):
+        raise ValueError("method: 'buckets' or 'lttb'")
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"{filename} not found")
+    
+    stamps, values = history_arrays(filename)
+    lo = 0 if start is None else np.searchsorted(stamps, pd.Timestamp(start).as_unit('ns').value, 'left')
+    hi = len(stamps) if end is None else np.searchsorted(stamps, pd.Timestamp(end).as_unit('ns').value, 'right')
+    stamps, values = stamps[lo:hi], values[lo:hi]
+    
+    if method == "lttb":
+        y = values[:, VALUE_COLUMNS.index(column)]
+        keep = np.flatnonzero(~np.isnan(y))
+        picked = keep[lttb_indices(stamps[keep].astype(float), y[keep], points)]
+        out = pd.DataFrame(values[picked], columns=VALUE_COLUMNS,
+                           index=pd.DatetimeIndex(stamps[picked].view('datetime64[ns]'), name='timestamp'))
+    else:
+        firsts, mins, maxs, means = bucket_aggregate(stamps, values, points) if len(stamps) else (
+            stamps, values, values, values)
+        data = {}
+        for i, name in enumerate(VALUE_COLUMNS):
+            data[name] = means[:, i]
+            data[f"{name}_min"] = mins[:, i]
+            data[f"{name}_max"] = maxs[:, i]
+        out = pd.DataFrame(data, index=pd.DatetimeIndex(firsts.view('datetime64[ns]'), name='timestamp'))
+    
+    out.attrs['rows_in'] = len(stamps)
+    return out
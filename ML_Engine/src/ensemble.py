@@ -0,0 +1,265 @@
+"""
+Concurrent multi-member ensemble with per-step blend weights.
+
+Members are plain callables fn(historical_df, horizon, column) -> hourly
+pd.Series. They run concurrently in daemon threads, each with its own
+timeout (ForecastConfig.ensemble_timeout_s, overridable per member in
+ensemble_member_timeouts); a member that times out or raises is
+dropped and the remaining weights are renormalised per step, so one slow
+fit never stalls the forecast. A timed-out member cannot be interrupted,
+but as a daemon thread it does not keep the process (cli.py) alive after
+the forecast is done.
+
+Weights are learned offline (learn_ensemble_weights.py) from rolling-origin
+backtest errors: per horizon step, each member is weighted by its inverse
+mean squared error. They are stored in models/ensemble_weights.json per
+model registry key (site, scenario) and column, so one site's or weather's
+weights never blend another's forecast. Without learned weights the prior is the
+config's blend_ratio for the primary member, the remainder shared evenly.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG, ForecastConfig
+from .metrics import ENSEMBLE_DROPPED
+
+WEIGHTS_FORMAT = 2
+
+
+def weights_path():
+    """Learned weights file (CONFIG["ensemble_weights_path"] or ML_Engine/models/ensemble_weights.json)"""
+    return Path(CONFIG.get("ensemble_weights_path")
+                or Path(__file__).resolve().parents[1] / "models" / "ensemble_weights.json")
+
+
+def weights_key(column, model_key=None):
+    """Entry name "<site>/<scenario>/<column>" ("<column>" without a registry key)"""
+    if model_key is None:
+        return column
+    return "/".join(str(part) for part in (*model_key, column))
+
+
+def load_weights(column, model_key=None):
+    """
+    Learned per-step weights for one column of one registry key, or None.
+
+    Args:
+        column: forecast column
+        model_key: (site, scenario) registry key (model_key_for); None reads
+            the entry learned without one
+
+    Returns:
+        dict member -> list of weights per horizon step
+    """
+    try:
+        with open(weights_path()) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get("format") != WEIGHTS_FORMAT:
+        return None
+    entry = stored.get("entries", {}).get(weights_key(column, model_key))
+    return entry["weights"] if entry else None
+
+
+def save_weights(column, weights, model_key=None, **meta):
+    """Store learned weights for one column and registry key, keeping other entries"""
+    path = weights_path()
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    if stored.get("format") != WEIGHTS_FORMAT:
+        stored = {"format": WEIGHTS_FORMAT, "entries": {}}
+    stored["entries"][weights_key(column, model_key)] = {
+        "learned_at": time.time(),
+        "weights": {m: [round(float(w), 6) for w in ws] for m, ws in weights.items()},
+        **meta,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(stored, f, indent=2)
+    os.replace(tmp, path)
+
+
+def prior_weights(members, horizon, ratio):
+    """blend ratio for the first member, the rest shared evenly"""
+    if len(members) == 1:
+        return np.ones((1, horizon))
+    rest = (1 - ratio) / (len(members) - 1)
+    return np.array([[ratio] + [rest] * (len(members) - 1)]).T.repeat(horizon, axis=1)
+
+
+def weight_matrix(members, horizon, column, ratio, model_key=None):
+    """
+    (members x horizon) weights: learned for this column and registry key if
+    they cover every member, otherwise the prior. Steps beyond the learned
+    horizon reuse the last one.
+    """
+    learned = load_weights(column, model_key)
+    if not learned or any(m not in learned for m in members):
+        return prior_weights(members, horizon, ratio)
+    rows = []
+    for m in members:
+        w = np.asarray(learned[m], dtype=float)
+        rows.append(np.pad(w[:horizon], (0, max(0, horizon - len(w))), mode="edge"))
+    return np.vstack(rows)
+
+
+def _start_daemon(name, fn, *args):
+    """Run fn(*args) in a daemon thread; returns a Future for its result"""
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"ensemble-{name}", daemon=True).start()
+    return future
+
+
+def run_members(calls, historical_df, horizon, column, config):
+    """
+    Run member callables concurrently, each bounded by its own timeout
+    (counted from the ensemble start).
+
+    Members run in daemon threads: a timed-out member keeps running in the
+    background but does not hold the interpreter open at exit, so the
+    timeouts bound a CLI run's wall time.
+
+    Args:
+        calls: dict member name -> fn(historical_df, horizon, column)
+        config: ForecastConfig with the member timeouts
+
+    Returns:
+        (dict name -> pd.Series for completed members, dict name -> reason for dropped)
+    """
+    results, dropped = {}, {}
+    started = time.monotonic()
+    futures = {name: _start_daemon(name, fn, historical_df, horizon, column)
+               for name, fn in calls.items()}
+    for name, future in futures.items():
+        remaining = config.member_timeout(name) - (time.monotonic() - started)
+        try:
+            results[name] = future.result(timeout=max(remaining, 0))
+        except FutureTimeout:
+            dropped[name] = "timeout"
+            ENSEMBLE_DROPPED.inc(member=name, reason="timeout")
+        except Exception as e:
+            dropped[name] = f"{type(e).__name__}: {e}"
+            ENSEMBLE_DROPPED.inc(member=name, reason="error")
+    return results, dropped
+
+
+def _normalised(names, weights):
+    """(members x horizon) weights renormalised per step over `names`"""
+    w = np.vstack([weights[n] for n in names])
+    total = w.sum(axis=0)
+    return np.where(total > 0, w / np.where(total > 0, total, 1), 1 / len(names))
+
+
+def combine(predictions, weights):
+    """
+    Weighted per-step blend of aligned member forecasts.
+
+    Args:
+        predictions: dict member -> pd.Series (same index), completed members only
+        weights: dict member -> weight array over the horizon
+
+    Returns:
+        pd.Series; per-step weights renormalised over the members present.
+        If every member carries attrs["std"], the blend's std is their
+        weighted sum (member errors treated as fully correlated, an upper
+        bound on the blend's std).
+    """
+    names = list(predictions)
+    values = np.vstack([predictions[n].to_numpy(dtype=float) for n in names])
+    w = _normalised(names, weights)
+    index = predictions[names[0]].index
+    pred = pd.Series((w * values).sum(axis=0), index=index)
+    stds = [predictions[n].attrs.get("std") for n in names]
+    if all(s is not None for s in stds):
+        pred.attrs["std"] = (w * np.vstack(stds)).sum(axis=0)
+    return pred
+
+
+def ensemble_forecast(calls, historical_df, horizon, column="solar_power_kw", config=None,
+                      model_key=None):
+    """
+    Concurrent ensemble forecast of one column.
+
+    Args:
+        calls: ordered dict member name -> fn(historical_df, horizon, column);
+            the first member is the primary one for the prior weights
+        config: ForecastConfig (default: snapshot of CONFIG)
+        model_key: (site, scenario) registry key selecting the learned weights
+
+    Returns:
+        pd.Series with attrs["ensemble"] = {"members": [...], "dropped": {...}}
+    """
+    config = config or ForecastConfig.from_config()
+    members = list(calls)
+    matrix = weight_matrix(members, horizon, column, config.blend_ratio, model_key)
+    results, dropped = run_members(calls, historical_df, horizon, column, config)
+    if not results:
+        raise RuntimeError(f"every ensemble member failed: {dropped}")
+    weights = {m: matrix[i] for i, m in enumerate(members)}
+    pred = combine(results, weights)
+    pred.attrs["ensemble"] = {"members": list(results), "dropped": dropped}
+    return pred
+
+
+def backtest_errors(calls, history, horizon=24, folds=4, column="solar_power_kw", min_train=168):
+    """
+    Rolling-origin backtest: squared errors per member, fold and step.
+
+    Origins are one day apart, ending `horizon` steps before the last row;
+    each member is fitted on history up to the origin only.
+
+    Returns:
+        dict member -> (folds x horizon) array of squared errors
+    """
+    last_origin = len(history) - horizon
+    origins = [o for o in range(last_origin, last_origin - folds * 24, -24) if o >= min_train]
+    if not origins:
+        raise ValueError(f"Need {min_train + horizon}+ rows of history for a backtest")
+    errors = {name: [] for name in calls}
+    for origin in origins:
+        train = history.iloc[:origin]
+        actual = history[column].iloc[origin:origin + horizon].to_numpy(dtype=float)
+        for name, fn in calls.items():
+            pred = fn(train, horizon, column).to_numpy(dtype=float).clip(min=0)
+            errors[name].append((pred - actual) ** 2)
+    return {name: np.vstack(errs) for name, errs in errors.items()}
+
+
+def learn_weights(errors, floor=1e-3):
+    """
+    Inverse-MSE weights per horizon step from backtest squared errors.
+
+    Args:
+        errors: dict member -> (folds x horizon) squared errors (folds may be
+            stacked across scenarios)
+        floor: added to every MSE so error-free steps (night) weigh evenly
+
+    Returns:
+        dict member -> weight array over the horizon (columns sum to 1)
+    """
+    names = list(errors)
+    mse = np.vstack([errors[n].mean(axis=0) for n in names]) + floor
+    inv = 1 / mse
+    w = inv / inv.sum(axis=0)
+    return {n: w[i] for i, n in enumerate(names)}
@@ -0,0 +1,328 @@
+"""
+Incrementally maintained feature matrix for feature-based models.
+
+One contiguous float64 matrix per data file, one row per grid step:
+
+    timestamp_s, solar_power_kw, load_total_kw,
+    hour_of_day, day_of_week, hour_sin, hour_cos, dow_sin, dow_cos, is_weekend,
+    <col>_lag24, <col>_lag168, <col>_mean24, <col>_std24   (per value column)
+
+Rolling stats cover the trailing 24 hours including the row itself. The
+matrix is built once (vectorised) from the regular history and persisted
+next to the data as raw rows (data/.cache/<stem>.features-v1.f64). Each
+ingested reading then appends one row (or, for a late reading, rewrites
+the <= 169 rows whose lags / rolling windows it feeds) instead of
+recomputing everything; readings finer than the grid are averaged into
+the step they fall in, as in regularize_series. Readers get zero-copy views of the matrix.
+
+Next to the rows, <stem>.features-v1.json records the history CSV's size
+and newest timestamp at the last sync (HistoryStore.stamp). A store whose
+stamp no longer matches the CSV - readings written without going through
+append_new_reading - is rebuilt; touching or copying the CSV is not.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG, retention_hours
+from .data_utils import VALUE_COLUMNS, history_arrays, cache_path
+from .history_store import HistoryStore
+
+FEATURE_VERSION = 1
+LAGS_HOURS = (24, 168)
+ROLLING_HOURS = 24
+
+CALENDAR_COLUMNS = ['hour_of_day', 'day_of_week', 'hour_sin', 'hour_cos',
+                    'dow_sin', 'dow_cos', 'is_weekend']
+FEATURE_COLUMNS = (['timestamp_s'] + VALUE_COLUMNS + CALENDAR_COLUMNS
+                   + [f"{col}_{name}" for col in VALUE_COLUMNS
+                      for name in ("lag24", "lag168", "mean24", "std24")])
+WIDTH = len(FEATURE_COLUMNS)
+NS = 10**9
+
+
+def build_feature_matrix(stamps_ns, values, freq="h"):
+    """
+    Vectorised feature rows for a regular grid.
+
+    Args:
+        stamps_ns: int64 ns timestamps (regular grid, ascending)
+        values: (n, 2) solar / load kW, NaN for missing readings
+
+    Returns:
+        C-contiguous (n, WIDTH) float64 matrix (columns: FEATURE_COLUMNS)
+    """
+    n = len(stamps_ns)
+    per_hour = 3600 * NS // pd.tseries.frequencies.to_offset(freq).nanos
+    out = np.full((n, WIDTH), np.nan)
+    if n == 0:
+        return out
+
+    days, within = np.divmod(np.asarray(stamps_ns, dtype=np.int64), 86_400 * NS)
+    hour = within / (3600 * NS)
+    dow = (days + 3) % 7  # 1970-01-01 was a Thursday
+    out[:, 0] = stamps_ns // NS
+    out[:, 1:3] = values
+    out[:, 3] = hour
+    out[:, 4] = dow
+    out[:, 5] = np.sin(2 * np.pi * hour / 24)
+    out[:, 6] = np.cos(2 * np.pi * hour / 24)
+    out[:, 7] = np.sin(2 * np.pi * dow / 7)
+    out[:, 8] = np.cos(2 * np.pi * dow / 7)
+    out[:, 9] = dow >= 5
+
+    window = ROLLING_HOURS * per_hour
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    # Trailing-window sums via cumulative sums (NaN readings skipped)
+    pad = np.zeros((1, values.shape[1]))
+    csum = np.vstack([pad, np.cumsum(filled, axis=0)])
+    csq = np.vstack([pad, np.cumsum(filled ** 2, axis=0)])
+    ccnt = np.vstack([pad, np.cumsum(valid, axis=0)])
+    lo = np.maximum(np.arange(n) - window + 1, 0)
+    hi = np.arange(1, n + 1)
+    count = ccnt[hi] - ccnt[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (csum[hi] - csum[lo]) / count
+        std = np.sqrt(np.clip((csq[hi] - csq[lo]) / count - mean ** 2, 0, None))
+
+    base = 3 + len(CALENDAR_COLUMNS)
+    for j in range(values.shape[1]):
+        c = base + 4 * j
+        for k, lag_hours in enumerate(LAGS_HOURS):
+            lag = lag_hours * per_hour
+            if lag < n:
+                out[lag:, c + k] = values[:-lag, j]
+        out[:, c + 2] = mean[:, j]
+        out[:, c + 3] = std[:, j]
+    return out
+
+
+class FeatureStore:
+    """Growable feature matrix for one data file, persisted as raw rows."""
+
+    def __init__(self, filename, freq="h"):
+        self.filename = str(filename)
+        self.freq = freq
+        self.step_ns = pd.tseries.frequencies.to_offset(freq).nanos
+        self.context = max(LAGS_HOURS) * 3600 * NS // self.step_ns
+        self.path = cache_path(self.filename, f"features-v{FEATURE_VERSION}.f64")
+        self.stamp_path = cache_path(self.filename, f"features-v{FEATURE_VERSION}.json")
+        self._data = np.empty((0, WIDTH))
+        self._rows = 0
+        self._load()
+
+    def __len__(self):
+        return self._rows
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _history_stamp(self):
+        stamp = HistoryStore(self.filename).stamp()
+        return list(stamp) if stamp else None
+
+    def _write_stamp(self):
+        """Record the history state the persisted rows were synced with"""
+        try:
+            with open(self.stamp_path, 'w') as f:
+                json.dump({"history": self._history_stamp(), "rows": self._rows}, f)
+        except OSError:
+            pass
+
+    def _is_current(self, rows):
+        """True if `rows` persisted rows were synced with the history as it is now"""
+        try:
+            with open(self.stamp_path) as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return stamp.get("rows") == rows and stamp.get("history") == self._history_stamp()
+
+    def _load(self):
+        try:
+            raw = np.fromfile(self.path, dtype=np.float64)
+        except OSError:
+            raw = None
+        if raw is not None and (raw.size % WIDTH or not self._is_current(raw.size // WIDTH)):
+            raw = None
+        if raw is None:
+            self.rebuild()
+            return
+        rows = raw.reshape(-1, WIDTH)
+        self._reserve(len(rows))
+        self._data[:len(rows)] = rows
+        self._rows = len(rows)
+
+    def _write_rows(self, lo):
+        """Persist rows [lo, end): rewrite in place, append the tail"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'r+b' if self.path.exists() else 'wb') as f:
+                f.seek(lo * WIDTH * 8)
+                f.write(self._data[lo:self._rows].tobytes())
+        except OSError:
+            return  # Read-only data dir: the in-memory matrix is still valid
+        self._write_stamp()
+
+    def rebuild(self):
+        """Recompute the whole matrix from the stored history (vectorised)"""
+        stamps, values = history_arrays(self.filename)
+        keep = retention_hours() * 3600 * NS // self.step_ns
+        stamps, values = stamps[-keep:], values[-keep:]
+        matrix = build_feature_matrix(stamps, values, self.freq)
+        self._data = np.empty((0, WIDTH))
+        self._reserve(len(matrix))
+        self._data[:len(matrix)] = matrix
+        self._rows = len(matrix)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            matrix.tofile(tmp)
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self._write_stamp()
+
+    def _reserve(self, rows):
+        if rows <= len(self._data):
+            return
+        grown = np.empty((max(rows, 2 * len(self._data), 64), WIDTH))
+        grown[:self._rows] = self._data[:self._rows]
+        self._data = grown
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    def _recompute(self, lo, hi):
+        """Rows [lo, hi) from their raw values plus `context` rows of lags"""
+        start = max(0, lo - self.context)
+        stamps = self._data[start:hi, 0].astype(np.int64) * NS
+        rows = build_feature_matrix(stamps, self._data[start:hi, 1:3], self.freq)
+        self._data[lo:hi] = rows[lo - start:]
+
+    def _step_mean(self, start, t, reading):
+        """
+        Mean of the readings in the step starting at `start` (NaN ignored, as
+        in regularize_series): the stored ones, with `reading` at `t` in
+        place of any stored reading at that timestamp.
+        """
+        stamps, values = HistoryStore(self.filename).readings(start, start + self.step_ns)
+        values = np.vstack([values[stamps != t], [reading]])
+        valid = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(valid, values, 0.0).sum(axis=0) / valid.sum(axis=0)
+
+    def upsert(self, timestamp, solar_kw, load_kw):
+        """
+        Fold one reading into the matrix.
+
+        A reading belongs to the grid step it falls in (floored, as in
+        regularize_series) and the step's value is the mean of the stored
+        readings within it, so 15-minute ingest on the hourly grid averages
+        into its hour instead of overwriting it. A new step appends one row;
+        a gap appends NaN rows up to it; a late reading rewrites its row and
+        the rows whose lags / rolling windows include it. Readings older
+        than the matrix are ignored.
+
+        Returns:
+            row index written, or None if ignored
+        """
+        t = pd.Timestamp(pd.to_datetime(timestamp)).as_unit('ns').value
+        if self._rows == 0:
+            self.rebuild()
+            return self._rows - 1 if self._rows else None
+        first = int(self._data[0, 0]) * NS
+        row = (t - first) // self.step_ns
+        if row < 0:
+            self._write_stamp()  # the history moved on all the same
+            return None
+        value = self._step_mean(first + row * self.step_ns, t, (solar_kw, load_kw))
+
+        if row >= self._rows:
+            # Next step (or a gap): extend by the missing rows
+            self._reserve(row + 1)
+            stamps = first + np.arange(self._rows, row + 1, dtype=np.int64) * self.step_ns
+            self._data[self._rows:row + 1, 0] = stamps // NS
+            self._data[self._rows:row + 1, 1:3] = np.nan
+            self._data[row, 1:3] = value
+            lo, self._rows = self._rows, row + 1
+            self._recompute(lo, self._rows)
+            self._write_rows(lo)
+            if self._rows > retention_hours() + CONFIG["retention_slack"]:
+                self.rebuild()
+            return row
+
+        self._data[row, 1:3] = value
+        hi = min(self._rows, row + self.context + 1)
+        self._recompute(row, hi)
+        self._write_rows(row)
+        return row
+
+    # ------------------------------------------------------------------
+    # Zero-copy readers
+    # ------------------------------------------------------------------
+    @property
+    def matrix(self):
+        """(rows, WIDTH) view of the live matrix"""
+        return self._data[:self._rows]
+
+    def column(self, name):
+        """1-D strided view of one feature column"""
+        return self._data[:self._rows, FEATURE_COLUMNS.index(name)]
+
+    def window(self, steps=None, end=None):
+        """View of the last `steps` rows ending at timestamp `end` (inclusive)"""
+        hi = self._rows
+        if end is not None:
+            t = pd.Timestamp(end).as_unit('ns').value // NS
+            hi = int(np.searchsorted(self._data[:self._rows, 0], t, 'right'))
+        lo = 0 if steps is None else max(0, hi - steps)
+        return self._data[lo:hi]
+
+    def frame(self, steps=None, end=None):
+        """window() as a DataFrame over the same memory, indexed by timestamp"""
+        view = self.window(steps, end)
+        index = pd.DatetimeIndex((view[:, 0].astype(np.int64) * NS).view('datetime64[ns]'),
+                                 name='timestamp')
+        return pd.DataFrame(view[:, 1:], index=index, columns=FEATURE_COLUMNS[1:], copy=False)
+
+
+_STORES = {}
+
+
+def get_feature_store(filename):
+    """Process-wide FeatureStore for a data file"""
+    key = os.path.abspath(str(filename))
+    if key not in _STORES:
+        _STORES[key] = FeatureStore(key)
+    return _STORES[key]
+
+
+def feature_store_exists(filename):
+    """True if a feature matrix has been built for this data file"""
+    return cache_path(str(filename), f"features-v{FEATURE_VERSION}.f64").exists()
+
+
+def features_for(historical_df, extra_rows=0):
+    """
+    Feature rows aligned with a training window.
+
+    When the frame came from load_solar_csv (attrs["source"]) this is a
+    zero-copy view of that file's feature store, with up to `extra_rows`
+    older rows before the window; otherwise the features are built from
+    the frame itself.
+
+    Returns:
+        (rows, WIDTH) ndarray whose last row matches historical_df's last row
+    """
+    source = historical_df.attrs.get("source")
+    if source and os.path.exists(source):
+        store = get_feature_store(source)
+        view = store.window(len(historical_df) + extra_rows, end=historical_df.index[-1])
+        if len(view) and int(view[-1, 0]) * NS == historical_df.index[-1].as_unit('ns').value:
+            return view
+    stamps = historical_df.index.to_numpy(dtype='datetime64[ns]').view('int64')
+    return build_feature_matrix(stamps, historical_df[VALUE_COLUMNS].to_numpy(dtype=float))
@@ -0,0 +1,226 @@
+"""
+Fleet forecasting with SARIMA parameters shared per cluster of sites.
+
+Fitting ARIMA(2,1,2)(1,1,1,24) per site makes a fleet refresh cost one
+optimiser run per site. Sites with the same daily shape have nearly the
+same dynamics, so fleet mode:
+
+    1. signature  - each site's mean diurnal profile over the window,
+                    scaled to unit peak (one reshape + mean, all sites at
+                    once), so a 3 kW and a 30 kW roof with the same sky
+                    look alike
+    2. cluster    - k-means on the signatures (CONFIG["fleet_clusters"])
+    3. estimate   - one SARIMA fit per cluster, on the newest
+                    fit_window_days of its medoid site and within the
+                    fit budget (estimate_arima, as for single sites); the
+                    parameters go to the model registry under
+                    (<fleet>, cluster-<k>)
+    4. filter     - every site applies its cluster's parameters with a
+                    single Kalman filter pass (no optimiser)
+
+so the optimiser cost grows with the number of clusters, not sites.
+compare_with_per_site() backtests the shared parameters against per-site
+fits on a sample of sites and reports the accuracy difference.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+from .config import CONFIG, ForecastConfig
+from .forecast_solar import estimate_arima
+from .metrics import FIT_SECONDS, FIT_TOTAL
+from .model_registry import save_params
+
+
+def load_fleet_csv(filename, column="solar_power_kw", hours=168):
+    """
+    Multi-site history (timestamp, values, site_id rows, as written by
+    generate_synthetic.py --sites N) as an hourly (time x site) frame.
+
+    Readings are averaged per hour; gaps are forward-filled, then 0.
+
+    Returns:
+        pd.DataFrame of the last `hours` hours, one column per site_id
+    """
+    df = pd.read_csv(filename, usecols=['timestamp', 'site_id', column])
+    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.floor('h')
+    wide = df.pivot_table(index='timestamp', columns='site_id', values=column, aggfunc='mean')
+    wide = wide.asfreq('h').ffill().fillna(0)
+    wide.columns.name = 'site_id'
+    return wide.tail(hours)
+
+
+def diurnal_signatures(values, steps_per_day=24):
+    """
+    Normalised mean daily profile per site.
+
+    Args:
+        values: (steps, sites) array on an hourly grid
+
+    Returns:
+        (sites, steps_per_day) array, each row scaled to a peak of 1
+    """
+    days = len(values) // steps_per_day
+    whole = values[len(values) - days * steps_per_day:]
+    profile = whole.reshape(days, steps_per_day, -1).mean(axis=0).T
+    peak = np.abs(profile).max(axis=1, keepdims=True)
+    return profile / np.where(peak > 0, peak, 1)
+
+
+def kmeans(points, k, iterations=50, seed=0):
+    """
+    Vectorised k-means with k-means++ seeding.
+
+    Returns:
+        (labels array, centroids array)
+    """
+    k = max(1, min(k, len(points)))
+    rng = np.random.default_rng(seed)
+    centroids = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centroids)[None]) ** 2).sum(axis=2).min(axis=1)
+        if d2.sum() == 0:
+            break
+        centroids.append(points[rng.choice(len(points), p=d2 / d2.sum())])
+    centroids = np.array(centroids)
+
+    labels = np.zeros(len(points), dtype=np.int64)
+    for i in range(iterations):
+        distances = ((points[:, None, :] - centroids[None]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if i and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for c in range(len(centroids)):
+            members = points[labels == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    # Drop empty clusters and renumber 0..k-1
+    used, labels = np.unique(labels, return_inverse=True)
+    return labels, centroids[used]
+
+
+def medoids(points, labels, centroids):
+    """Index of the member closest to each centroid"""
+    distances = ((points - centroids[labels]) ** 2).sum(axis=1)
+    return np.array([np.flatnonzero(labels == c)[distances[labels == c].argmin()]
+                     for c in range(len(centroids))])
+
+
+def _model(series, config):
+    """SARIMA on the newest config.fit_window_days of a site, as arima_forecast"""
+    return ARIMA(series.tail(24 * config.fit_window_days), order=config.arima_order,
+                 seasonal_order=config.arima_seasonal)
+
+
+def _site_forecast(series, params, config, horizon):
+    model = _model(series, config)
+    with FIT_SECONDS.time(mode="filter"):
+        fitted = model.filter(params)
+    FIT_TOTAL.inc(mode="filter")
+    return np.asarray(fitted.forecast(steps=horizon))
+
+
+def _fit(series, config):
+    """Cold SARIMA estimation within config.fit_budget_s; (fitted, fit info)"""
+    return estimate_arima(_model(series, config), budget_s=config.fit_budget_s or 0)
+
+
+def fleet_forecast(history, horizon=None, clusters=None, fleet="fleet", column="solar_power_kw",
+                   config=None):
+    """
+    Forecast every site with SARIMA parameters estimated once per cluster.
+
+    Args:
+        history: hourly (time x site) frame, e.g. load_fleet_csv()
+        clusters: number of clusters (default: CONFIG["fleet_clusters"])
+        fleet: registry site name prefix for the cluster parameters
+        config: ForecastConfig (orders and horizon; default: CONFIG snapshot)
+
+    Returns:
+        (pd.DataFrame horizon x site, clipped at 0, info dict with labels,
+        medoids and fit / filter seconds)
+    """
+    config = config or ForecastConfig.from_config()
+    horizon = horizon or config.horizon_hours
+    clusters = clusters or CONFIG["fleet_clusters"]
+    values = history.to_numpy(dtype=float)
+
+    signatures = diurnal_signatures(values)
+    labels, centroids = kmeans(signatures, clusters)
+    centres = medoids(signatures, labels, centroids)
+
+    started = time.perf_counter()
+    params = []
+    for c, site in enumerate(centres):
+        fitted, fit_info = _fit(history.iloc[:, site], config)
+        save_params(fleet, f"cluster-{c}", column, fitted,
+                    medoid=str(history.columns[site]),
+                    members=[str(s) for s in history.columns[labels == c]], **fit_info)
+        params.append(np.asarray(fitted.params))
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    forecasts = np.column_stack([_site_forecast(history.iloc[:, i], params[labels[i]], config, horizon)
+                                 for i in range(values.shape[1])])
+    filter_seconds = time.perf_counter() - started
+
+    index = pd.date_range(history.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq='h')
+    frame = pd.DataFrame(forecasts.clip(min=0), index=index, columns=history.columns)
+    info = {
+        "sites": int(values.shape[1]),
+        "clusters": int(len(centres)),
+        "labels": {str(s): int(l) for s, l in zip(history.columns, labels)},
+        "medoids": [str(history.columns[s]) for s in centres],
+        "fit_seconds": round(fit_seconds, 3),
+        "filter_seconds": round(filter_seconds, 3),
+    }
+    return frame, info
+
+
+def compare_with_per_site(history, horizon=24, clusters=None, sample=None, seed=0, config=None):
+    """
+    Backtest shared cluster parameters against per-site fits.
+
+    The last `horizon` hours are held out. Every site is forecast in fleet
+    mode; a sample of sites is also fitted individually.
+
+    Args:
+        sample: sites fitted individually (default: all)
+
+    Returns:
+        dict with RMSE (kW) of both approaches on the sample, their
+        difference, the fleet-mode time for every site and the per-site
+        fit time extrapolated from the sample to every site
+    """
+    config = config or ForecastConfig.from_config()
+    train, actual = history.iloc[:-horizon], history.iloc[-horizon:]
+    shared, info = fleet_forecast(train, horizon, clusters, fleet="fleet-backtest", config=config)
+
+    rng = np.random.default_rng(seed)
+    sites = history.columns.to_numpy()
+    if sample and sample < len(sites):
+        sites = rng.choice(sites, size=sample, replace=False)
+
+    started = time.perf_counter()
+    own = pd.DataFrame({site: np.asarray(_fit(train[site], config)[0].forecast(steps=horizon)).clip(min=0)
+                        for site in sites}, index=shared.index)
+    per_site_seconds = time.perf_counter() - started
+
+    def rmse(pred):
+        return float(np.sqrt(np.mean((pred[sites].to_numpy() - actual[sites].to_numpy()) ** 2)))
+
+    shared_rmse, own_rmse = rmse(shared), rmse(own)
+    return {
+        "sites": info["sites"],
+        "sampled_sites": int(len(sites)),
+        "clusters": info["clusters"],
+        "rmse_cluster_kw": round(shared_rmse, 4),
+        "rmse_per_site_kw": round(own_rmse, 4),
+        "rmse_diff_kw": round(shared_rmse - own_rmse, 4),
+        "rmse_diff_pct": round(100 * (shared_rmse - own_rmse) / own_rmse, 2) if own_rmse else 0.0,
+        "fleet_seconds": round(info["fit_seconds"] + info["filter_seconds"], 3),
+        "per_site_seconds_estimated": round(per_site_seconds * info["sites"] / len(sites), 3),
+    }
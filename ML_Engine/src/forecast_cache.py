@@ -0,0 +1,125 @@
+"""
+On-disk cache of the last fitted hourly forecast per data file.
+
+Each CLI call is a fresh process, so the cache lives next to the data in
+data/.cache/<stem>.forecast-<key>.npz. Entries store the hourly kW
+forecast (before interval/unit conversion), or the native 15-minute kW
+forecast for 15-minute histories, and are reused until they are older
+than CONFIG["forecast_cache_minutes"]; the nowcast layer corrects them
+with the readings ingested in between.
+"""
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG, ForecastConfig
+from .data_utils import cache_path, load_solar_csv
+from .forecast_solar import forecast_solar
+from .metrics import CACHE_REQUESTS
+from .model_registry import model_key_for
+from .subhourly import subhourly_forecast
+
+
+def cache_key(config):
+    """Cache key for a ForecastConfig: method, horizon and a digest of every setting"""
+    return f"{config.forecast_method}-{config.horizon_hours}-{config.digest()}"
+
+
+def _entry_path(filename, key):
+    return cache_path(filename, f"forecast-{key}.npz")
+
+
+def load_cached_forecast(filename, key, max_age_minutes=None):
+    """
+    Cached hourly kW forecast for `key`, or None if missing or too old.
+
+    Args:
+        max_age_minutes: None to accept any age
+
+    Returns:
+        (pd.Series, meta dict) or None
+    """
+    path = _entry_path(filename, key)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as cached:
+            meta = json.loads(str(cached['meta']))
+            if max_age_minutes is not None and time.time() - meta['fitted_at'] > max_age_minutes * 60:
+                return None
+            index = pd.DatetimeIndex(cached['timestamp'].view('datetime64[ns]'))
+            return pd.Series(cached['values'], index=index), meta
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def store_forecast(filename, key, forecast, **meta):
+    """Atomically write an hourly kW forecast to the cache. Returns its meta."""
+    meta = {"key": key, "fitted_at": time.time(), **meta}
+    path = _entry_path(filename, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp.npz')
+        np.savez(tmp,
+                 timestamp=forecast.index.to_numpy(dtype='datetime64[ns]').view('int64'),
+                 values=forecast.to_numpy(dtype=float),
+                 meta=json.dumps(meta))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only data dir: caller still has the forecast
+    return meta
+
+
+def cached_hourly_forecast(filename, method=None, horizon=None, config=None):
+    """
+    Hourly kW forecast for a data file, refitted only when the cached one
+    is older than CONFIG["forecast_cache_minutes"]. Entries are keyed on
+    the whole ForecastConfig, so differently configured requests never
+    share one.
+
+    Returns:
+        (pd.Series, meta dict, refitted bool)
+    """
+    # Entries are hourly kW, so interval / unit must not split the cache
+    config = ForecastConfig.resolve(config, forecast_method=method, horizon_hours=horizon,
+                                    forecast_interval="1h", output_unit="kw")
+    key = cache_key(config)
+
+    cached = load_cached_forecast(filename, key, CONFIG["forecast_cache_minutes"])
+    if cached is not None:
+        CACHE_REQUESTS.inc(result="hit")
+        return cached[0], cached[1], False
+    CACHE_REQUESTS.inc(result="miss")
+
+    df = load_solar_csv(str(filename), days=config.train_days)
+    forecast = forecast_solar(df, interval="1h", unit="kw", model_key=model_key_for(filename),
+                              config=config)
+    meta = store_forecast(filename, key, forecast, data_points=len(df))
+    return forecast, meta, True
+
+
+def cached_subhourly_forecast(filename, horizon=None, config=None):
+    """
+    Native 15-minute kW forecast for a data file with 15-minute history,
+    cached like cached_hourly_forecast.
+
+    Returns:
+        (pd.Series, meta dict, refitted bool)
+    """
+    config = ForecastConfig.resolve(config, horizon_hours=horizon,
+                                    forecast_interval="15min", output_unit="kw")
+    key = f"subhourly-{config.horizon_hours}-{config.digest()}"
+
+    cached = load_cached_forecast(filename, key, CONFIG["forecast_cache_minutes"])
+    if cached is not None:
+        CACHE_REQUESTS.inc(result="hit")
+        return cached[0], cached[1], False
+    CACHE_REQUESTS.inc(result="miss")
+
+    df = load_solar_csv(str(filename), freq="15min", days=config.train_days)
+    forecast = subhourly_forecast(df, config.horizon_hours)
+    meta = store_forecast(filename, key, forecast, data_points=len(df))
+    return forecast, meta, True
@@ -2,12 +2,28 @@
 HackNagpur GE-2 Solar Forecasting
 Mutation A: Historical data only, no APIs
 """
+import time
 import pandas as pd
 import numpy as np
-from .config import CONFIG
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from scipy.stats import norm
+from .config import CONFIG, ForecastConfig
+from .ensemble import ensemble_forecast
+from .feature_store import FEATURE_COLUMNS, build_feature_matrix, features_for
+from .metrics import (FIT_BUDGET_EXCEEDED, FIT_ITERATIONS, FIT_NOT_CONVERGED, FIT_SECONDS,
+                      FIT_TOTAL, FORECAST_SECONDS, WARM_START_FALLBACKS)
+from .model_registry import is_reusable, load_params, save_params, warm_start_params
 from statsmodels.tsa.arima.model import ARIMA
 
 
+# Forecastable targets → source column in the historical data
+FORECAST_TARGETS = {
+    "solar": "solar_power_kw",
+    "load": "load_total_kw",
+}
+
+
 def convert_kw_to_wh(kw_value, interval_minutes=60):
     """
     Convert kW (power) to Wh (energy) over given interval.
@@ -30,23 +46,266 @@ def convert_kw_to_wh(kw_value, interval_minutes=60):
     return kw_value * hours * 1000  # Convert kW*h to Wh
 
 
-def persistence_forecast(historical_df, horizon=CONFIG["horizon_hours"]):
+def _days_ahead(horizon):
+    """Whole days each step is ahead of the last reading (1 for steps 1..24)"""
+    return np.ceil(np.arange(1, horizon + 1) / 24)
+
+
+def seasonal_naive_std(historical_df, horizon, column="solar_power_kw"):
+    """
+    Forecast error std per step of "same hour yesterday": RMS day-over-day
+    change of each hour of day, growing with sqrt(days ahead).
+    """
+    values = historical_df[column].to_numpy(dtype=float)
+    diffs = values[24:] - values[:-24]
+    if not len(diffs):
+        return np.zeros(horizon)
+    slots = np.arange(len(diffs)) % 24  # diffs[i] is at values[i + 24]
+    rms = np.sqrt(np.bincount(slots, weights=diffs ** 2, minlength=24)
+                  / np.maximum(np.bincount(slots, minlength=24), 1))
+    steps = np.arange(1, horizon + 1)
+    return rms[(len(values) - 1 + steps) % 24] * np.sqrt(_days_ahead(horizon))
+
+
+def persistence_forecast(historical_df, horizon=None, column="solar_power_kw"):
     """Baseline: Tomorrow = yesterday"""
-    last_day = historical_df['solar_power_kw'].tail(24).values
+    horizon = horizon or CONFIG["horizon_hours"]
+    last_day = historical_df[column].tail(24).values
+    future_times = pd.date_range(start=historical_df.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq='h')
+    pred = pd.Series(np.tile(last_day[:24], horizon//24 + 1)[:horizon], 
+                     index=future_times)
+    pred.attrs["std"] = seasonal_naive_std(historical_df, horizon, column)
+    return pred
+
+
+def _converged(fitted):
+    retvals = getattr(fitted, "mle_retvals", None)  # absent on filter results
+    return not retvals or bool(retvals.get("converged", True))
+
+
+class _FitBudgetExceeded(Exception):
+    """Raised from the optimiser callback once the fit deadline has passed"""
+
+
+def _timed_fit(model, mode, deadline=None, **kwargs):
+    """
+    model.fit(**kwargs) recorded under FIT_SECONDS / FIT_TOTAL / FIT_ITERATIONS
+    `mode`. Past `deadline` (perf_counter time) the optimiser is stopped and
+    its latest iterate applied with a filter pass (budget_exceeded).
+    """
+    started = time.perf_counter()
+    latest, info = [], {}
+    if deadline is not None:
+        def stop_at_deadline(xk):
+            latest[:] = [np.array(xk)]
+            if time.perf_counter() > deadline:
+                raise _FitBudgetExceeded
+        kwargs["method_kwargs"] = {**kwargs.get("method_kwargs", {}), "callback": stop_at_deadline}
+    with FIT_SECONDS.time(mode=mode):
+        try:
+            fitted = model.fit(**kwargs)
+            iterations = (fitted.mle_retvals or {}).get("iterations")
+        except _FitBudgetExceeded:
+            # The optimiser works on untransformed (unconstrained) parameters
+            fitted = model.filter(model.transform_params(latest[0]))
+            iterations = None
+            info = {"budget_exceeded": True, "converged": False}
+            FIT_BUDGET_EXCEEDED.inc(mode=mode)
+    FIT_TOTAL.inc(mode=mode)
+    if iterations is not None:
+        iterations = int(iterations)
+        FIT_ITERATIONS.observe(iterations, mode=mode)
+    return fitted, {"start": "warm" if mode == "warm" else "cold", "iterations": iterations,
+                    "fit_seconds": round(time.perf_counter() - started, 3), **info}
+
+
+def estimate_arima(model, start_params=None, budget_s=None, maxiter=None):
+    """
+    SARIMA parameter estimation, warm-started when start_params are given.
+    
+    A warm start runs at most `maxiter` (default CONFIG["warm_start_maxiter"]) optimiser
+    iterations from start_params (usually the previous fit, which is close
+    to today's optimum); if it does not converge (or the start values are
+    unusable) the model is fitted again from statsmodels' default start
+    values.
+    
+    Both attempts together are limited to budget_s seconds (default
+    CONFIG["fit_budget_s"]; None or 0 = unlimited); when it runs out the
+    optimiser's latest parameters are used as they are.
+    
+    Returns:
+        (fitted results, dict with start "warm" / "cold", iterations and
+        fit_seconds; a cold fallback also carries the failed warm attempt's
+        warm_iterations / warm_seconds, a stopped fit budget_exceeded)
+    """
+    budget_s = CONFIG["fit_budget_s"] if budget_s is None else budget_s
+    maxiter = CONFIG["warm_start_maxiter"] if maxiter is None else maxiter
+    deadline = time.perf_counter() + budget_s if budget_s else None
+    attempt = {}
+    if start_params is not None:
+        try:
+            fitted, info = _timed_fit(model, "warm", deadline,
+                                      start_params=np.asarray(start_params, dtype=float),
+                                      method_kwargs={"maxiter": maxiter})
+        except (ValueError, np.linalg.LinAlgError):
+            fitted, info = None, {"iterations": None, "fit_seconds": None}
+        # Converged, or out of time for a cold fit: keep the warm result
+        if fitted is not None and (_converged(fitted) or info.get("budget_exceeded")):
+            return fitted, info
+        WARM_START_FALLBACKS.inc()
+        attempt = {"warm_iterations": info["iterations"], "warm_seconds": info["fit_seconds"]}
+    fitted, info = _timed_fit(model, "fit", deadline)
+    if not _converged(fitted) and not info.get("budget_exceeded"):
+        FIT_NOT_CONVERGED.inc()
+    return fitted, {**info, **attempt}
+
+
+def arima_forecast(historical_df, horizon=None, column="solar_power_kw",
+                   model_key=None, refit=False, config=None):
+    """
+    ARIMA time series forecast.
+    
+    With a model_key (site, scenario) the parameters come from the model
+    registry: a fresh entry is applied with one filter pass, otherwise the
+    model is re-estimated (or always, with refit=True), warm-started from the
+    last converged entry (config.warm_start), and stored.
+    Orders, fit budget and warm-start settings come from `config` (default:
+    CONFIG snapshot).
+    
+    Only the newest config.fit_window_days of a longer training window are
+    modelled, so the fit cost stays bounded as train_days grows (the whole
+    window still feeds the profile / regression ensemble members).
+    """
+    config = config or ForecastConfig.from_config()
+    horizon = horizon or config.horizon_hours
+    series = historical_df[column].tail(24 * config.fit_window_days)
+    model = ARIMA(series, order=config.arima_order, 
+                  seasonal_order=config.arima_seasonal)
+    entry = None
+    if model_key is not None and not refit:
+        entry = load_params(*model_key, column)
+    if is_reusable(entry, model):
+        with FIT_SECONDS.time(mode="filter"):
+            fitted = model.filter(entry["params"])
+        FIT_TOTAL.inc(mode="filter")
+    else:
+        start = None
+        if model_key is not None and config.warm_start:
+            start = warm_start_params(*model_key, column, model)
+        fitted, fit_info = estimate_arima(model, start, budget_s=config.fit_budget_s or 0,
+                                          maxiter=config.warm_start_maxiter)
+        if model_key is not None:
+            save_params(*model_key, column, fitted, train_end=str(historical_df.index[-1]), **fit_info)
+    # Point forecast and its analytic (Kalman filter) standard error in one pass
+    forecast = fitted.get_forecast(steps=horizon)
     future_times = pd.date_range(start=historical_df.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq='h')
-    return pd.Series(np.tile(last_day[:24], horizon//24 + 1)[:horizon], 
-                    index=future_times)
+    pred = pd.Series(np.asarray(forecast.predicted_mean), index=future_times)
+    pred.attrs["std"] = np.asarray(forecast.se_mean, dtype=float)
+    return pred
 
 
-def arima_forecast(historical_df, horizon=CONFIG["horizon_hours"]):
-    """ARIMA time series forecast"""
-    solar = historical_df['solar_power_kw']
-    model = ARIMA(solar, order=CONFIG["arima_order"], 
-                  seasonal_order=CONFIG["arima_seasonal"])
-    fitted = model.fit()
-    forecast_steps = fitted.forecast(steps=horizon)
+def profile_forecast(historical_df, horizon=None, column="solar_power_kw", days=None,
+                     halflife_days=None):
+    """
+    Mean daily profile: each hour = average of that hour over the last `days`
+    days (default: the whole training window). With halflife_days (default
+    CONFIG["profile_halflife_days"]; None or 0 = equal weights) older days
+    count less, so a months-long window still tracks the season.
+    """
+    horizon = horizon or CONFIG["horizon_hours"]
+    if halflife_days is None:
+        halflife_days = CONFIG["profile_halflife_days"]
+    series = historical_df[column] if days is None else historical_df[column].tail(24 * days)
+    values = series.to_numpy(dtype=float)
+    # Whole days ending at the last reading, so column 0 is the next hour
+    whole = values[len(values) % 24:].reshape(-1, 24)
+    age = np.arange(len(whole))[::-1]
+    weights = 0.5 ** (age / halflife_days) if halflife_days else np.ones(len(whole))
+    weights = weights / weights.sum()
+    profile = weights @ whole
+    spread = np.sqrt(weights @ (whole - profile) ** 2)
     future_times = pd.date_range(start=historical_df.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq='h')
-    return pd.Series(forecast_steps, index=future_times)
+    pred = pd.Series(np.tile(profile, horizon//24 + 1)[:horizon], index=future_times)
+    # Day-to-day spread of each hour (the profile does not drift with lead time)
+    pred.attrs["std"] = np.tile(spread, horizon//24 + 1)[:horizon]
+    return pred
+
+
+def _regression_design(hour, weekend, lag24, lag168):
+    """Design matrix: intercept, two daily harmonics, weekend flag, lags"""
+    angle = 2 * np.pi * hour / 24
+    columns = [np.ones_like(hour), np.sin(angle), np.cos(angle), np.sin(2 * angle),
+               np.cos(2 * angle), weekend, lag24]
+    if lag168 is not None:
+        columns.append(lag168)
+    return np.column_stack(columns)
+
+
+def regression_forecast(historical_df, horizon=None, column="solar_power_kw"):
+    """
+    Least-squares on calendar + lag-24 / lag-168 features.
+    
+    Features are zero-copy rows of the data file's feature store when the
+    frame came from load_solar_csv (so lag-168 reaches back before the
+    training window), otherwise built from the frame. Steps beyond 24 hours
+    use earlier predictions as their lag-24 values.
+    """
+    horizon = horizon or CONFIG["horizon_hours"]
+    feats = features_for(historical_df, extra_rows=168)
+    col = FEATURE_COLUMNS.index
+    hour, weekend = feats[:, col('hour_of_day')], feats[:, col('is_weekend')]
+    lag24, lag168 = feats[:, col(f'{column}_lag24')], feats[:, col(f'{column}_lag168')]
+    y = feats[:, col(column)]
+    
+    train = ~(np.isnan(y) | np.isnan(lag24))
+    use_168 = (train & ~np.isnan(lag168)).sum() >= 48
+    if use_168:
+        train &= ~np.isnan(lag168)
+    X = _regression_design(hour[train], weekend[train], lag24[train],
+                           lag168[train] if use_168 else None)
+    # Small ridge penalty keeps short windows well-conditioned
+    beta = np.linalg.solve(X.T @ X + 1e-3 * np.eye(X.shape[1]), X.T @ y[train])
+    residual_std = float(np.std(y[train] - X @ beta))
+    
+    # History (window values, NaN-free) followed by predictions
+    values = np.concatenate([feats[:-len(historical_df), col(column)],
+                             historical_df[column].to_numpy(dtype=float), np.full(horizon, np.nan)])
+    n = len(values) - horizon
+    step = pd.Timedelta(hours=1).value
+    last = historical_df.index[-1].as_unit('ns').value
+    future = last + step * np.arange(1, horizon + 1, dtype=np.int64)
+    calendar = build_feature_matrix(future, np.full((horizon, 2), np.nan))
+    for lo in range(0, horizon, 24):
+        hi = min(lo + 24, horizon)
+        pos = n + np.arange(lo, hi)
+        f24 = values[pos - 24]
+        f168 = np.where(np.isnan(values[pos - 168]), f24, values[pos - 168]) if use_168 else None
+        X = _regression_design(calendar[lo:hi, col('hour_of_day')], calendar[lo:hi, col('is_weekend')],
+                               f24, f168)
+        values[pos] = X @ beta
+    future_times = pd.date_range(start=historical_df.index[-1] + pd.Timedelta(hours=1), periods=horizon, freq='h')
+    pred = pd.Series(values[n:], index=future_times)
+    # Each day feeds the next through lag-24, so errors accumulate per day
+    pred.attrs["std"] = residual_std * np.sqrt(_days_ahead(horizon))
+    return pred
+
+
+# Ensemble members: name -> fn(historical_df, horizon, column) returning an
+# hourly pd.Series, optionally with its per-step forecast error std in
+# attrs["std"] (for prediction intervals). Add models here (or via
+# register_method) to make them available to --method and
+# CONFIG["ensemble_members"].
+FORECAST_METHODS = {
+    "persistence": persistence_forecast,
+    "arima": arima_forecast,
+    "profile": profile_forecast,
+    "regression": regression_forecast,
+}
+
+
+def register_method(name, fn):
+    """Register a forecast method fn(historical_df, horizon, column) -> pd.Series"""
+    FORECAST_METHODS[name] = fn
 
 
 def interpolate_to_15min(hourly_forecast):
@@ -68,7 +327,100 @@ def interpolate_to_15min(hourly_forecast):
     return forecast_15min
 
 
-def forecast_solar(historical_df, method=None, horizon=None, interval=None, unit=None):
+def _member_call(name, config, model_key=None, refit=False):
+    """
+    Member callable; ARIMA gets the config and model registry key bound,
+    the profile member the config's day half-life
+    """
+    if name == "arima":
+        return partial(arima_forecast, model_key=model_key, refit=refit, config=config)
+    if name == "profile" and FORECAST_METHODS[name] is profile_forecast:
+        return partial(profile_forecast, halflife_days=config.profile_halflife_days or 0)
+    return FORECAST_METHODS[name]
+
+
+def _hourly_forecast(historical_df, config, column="solar_power_kw", model_key=None, refit=False):
+    """Hourly kW forecast for one column: method, ensemble blend, clip"""
+    method, horizon = config.forecast_method, config.horizon_hours
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"method: one of {', '.join(map(repr, FORECAST_METHODS))}")
+    
+    # Ensemble blend: the method plus config.ensemble_members, run
+    # concurrently (persistence is the baseline and is not blended)
+    members = [method]
+    if config.blend_ratio < 1.0 and method != "persistence":
+        members += [m for m in config.ensemble_members if m != method]
+    calls = {m: _member_call(m, config, model_key, refit) for m in members}
+    if len(calls) == 1:
+        pred = calls[method](historical_df, horizon, column)
+    else:
+        pred = ensemble_forecast(calls, historical_df, horizon, column, config, model_key)
+    
+    # Forecast error std for intervals; methods without one get persistence's
+    std = pred.attrs.get("std")
+    if std is None:
+        std = seasonal_naive_std(historical_df, horizon, column)
+    
+    # Clip negative values (no negative solar or load)
+    pred = pred.clip(lower=0)
+    pred.attrs["std"] = np.asarray(std, dtype=float)
+    return pred
+
+
+def hourly_forecast(historical_df, column="solar_power_kw", config=None, model_key=None,
+                    refit=False):
+    """
+    Hourly kW forecast of any column of historical_df (method / ensemble
+    blend from `config`, clipped at 0), with its per-step forecast error std
+    in attrs["std"]. No interval or unit conversion.
+    """
+    config = config or ForecastConfig.from_config()
+    if len(historical_df) < 24:
+        raise ValueError("Need 1+ days historical data")
+    return _hourly_forecast(historical_df, config, column, model_key, refit)
+
+
+def quantile_label(q):
+    """Column name of a quantile band (0.1 -> p10)"""
+    return f"p{q * 100:g}"
+
+
+def quantile_bands(pred, quantiles=None):
+    """
+    Gaussian quantile bands of an hourly kW forecast, from attrs["std"].
+    
+    Args:
+        pred: hourly forecast from _hourly_forecast (attrs["std"] per step)
+        quantiles: e.g. (0.1, 0.5, 0.9) (default: CONFIG["forecast_quantiles"])
+    
+    Returns:
+        pd.DataFrame with "forecast" and one column per quantile, clipped at 0
+    """
+    quantiles = quantiles or CONFIG["forecast_quantiles"]
+    z = norm.ppf(np.asarray(quantiles, dtype=float))
+    mean = pred.to_numpy(dtype=float)
+    bands = np.clip(mean[:, None] + np.asarray(pred.attrs["std"])[:, None] * z[None, :], 0, None)
+    frame = pd.DataFrame(bands, index=pred.index, columns=[quantile_label(q) for q in quantiles])
+    frame.insert(0, "forecast", mean)
+    return frame
+
+
+def to_interval_and_unit(pred, interval, unit):
+    """Shared post-processing for a Series or an aligned DataFrame"""
+    # Convert to 15-minute intervals if requested
+    if interval == "15min":
+        pred = interpolate_to_15min(pred)
+    
+    # Convert to Wh if requested
+    if unit == "wh":
+        interval_minutes = 15 if interval == "15min" else 60
+        pred = convert_kw_to_wh(pred, interval_minutes)
+    
+    return pred
+
+
+def forecast_solar(historical_df, method=None, horizon=None, interval=None, unit=None,
+                   model_key=None, refit=False, config=None, quantiles=None):
     """
     Main forecast function with configurable interval and output unit.
     
@@ -78,44 +430,81 @@ def forecast_solar(historical_df, method=None, horizon=None, interval=None, unit
         horizon: Number of hours to forecast
         interval: "1h" (hourly) or "15min" (15-minute intervals)
         unit: "kw" (kilowatts) or "wh" (watt-hours)
+        model_key: (site, scenario) to reuse registry parameters, None to fit
+        refit: re-estimate even if the registry entry is fresh
+        config: ForecastConfig (default: snapshot of CONFIG); the explicit
+            arguments above override its fields
+        quantiles: e.g. (0.1, 0.5, 0.9) to also return prediction intervals
     
     Output: 
-        pd.Series with forecast values in specified unit
+        pd.Series with forecast values in specified unit, or with quantiles a
+        pd.DataFrame with "forecast" and "p10" / "p50" / ... columns (the
+        bands go through the same interpolation and unit conversion)
     """
-    method = method or CONFIG["forecast_method"]
-    horizon = horizon or CONFIG["horizon_hours"]
-    interval = interval or CONFIG.get("forecast_interval", "1h")
-    unit = unit or CONFIG.get("output_unit", "kw")
+    config = ForecastConfig.resolve(config, forecast_method=method, horizon_hours=horizon,
+                                    forecast_interval=interval, output_unit=unit)
     
     # Validate input
     if len(historical_df) < 24:
         raise ValueError("Need 1+ days historical data")
     
-    # Generate hourly forecasts first
-    if method == "persistence":
-        pred = persistence_forecast(historical_df, horizon)
-    elif method == "arima":
-        pred = arima_forecast(historical_df, horizon)
-    else:
-        raise ValueError("method: 'persistence' or 'arima'")
+    with FORECAST_SECONDS.time(method=config.forecast_method):
+        pred = _hourly_forecast(historical_df, config, model_key=model_key, refit=refit)
+        if quantiles:
+            pred = quantile_bands(pred, quantiles)
+        return to_interval_and_unit(pred, config.forecast_interval, config.output_unit)
+
+
+def forecast_multi(historical_df, targets=("solar", "load"), method=None, horizon=None,
+                   interval=None, unit=None, max_workers=None, model_key=None, refit=False,
+                   config=None, quantiles=None):
+    """
+    Forecast several columns from one loaded DataFrame in a single pass.
     
-    # Ensemble blend
-    if CONFIG["blend_ratio"] < 1.0:
-        persist = persistence_forecast(historical_df, horizon)
-        pred = (CONFIG["blend_ratio"] * pred + 
-                (1 - CONFIG["blend_ratio"]) * persist)
+    Per-column fits run concurrently in a thread pool; interval and unit
+    conversion are applied once to the aligned frame. When both solar and
+    load are requested a "net" column (solar - load) is added.
     
-    # Clip negative values (no negative solar)
-    pred = pred.clip(lower=0)
+    Input:
+        historical_df: DataFrame from load_solar_csv
+        targets: keys of FORECAST_TARGETS ("solar", "load")
+        method, horizon, interval, unit, model_key, refit, config: as forecast_solar
+        max_workers: thread pool size (default: CONFIG["max_workers"])
+        quantiles: e.g. (0.1, 0.5, 0.9) to add "<target>_p10" / ... band
+            columns per target (not for net)
     
-    # Convert to 15-minute intervals if requested
-    if interval == "15min":
-        pred = interpolate_to_15min(pred)
+    Output:
+        pd.DataFrame indexed by forecast time, one column per target
+    """
+    config = ForecastConfig.resolve(config, forecast_method=method, horizon_hours=horizon,
+                                    forecast_interval=interval, output_unit=unit)
     
-    # Convert to Wh if requested
-    if unit == "wh":
-        interval_minutes = 15 if interval == "15min" else 60
-        pred = convert_kw_to_wh(pred, interval_minutes)
+    if len(historical_df) < 24:
+        raise ValueError("Need 1+ days historical data")
+    unknown = [t for t in targets if t not in FORECAST_TARGETS]
+    if unknown:
+        raise ValueError(f"targets: unknown {unknown}, use {list(FORECAST_TARGETS)}")
     
-    return pred
-
+    workers = max_workers or CONFIG.get("max_workers") or len(targets)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(workers, len(targets))) as pool:
+        futures = {
+            target: pool.submit(_hourly_forecast, historical_df, config,
+                                FORECAST_TARGETS[target], model_key, refit)
+            for target in targets
+        }
+        hourly = {target: future.result() for target, future in futures.items()}
+    frame = pd.DataFrame(hourly)
+    
+    if "solar" in frame and "load" in frame:
+        frame["net"] = frame["solar"] - frame["load"]
+    
+    if quantiles:
+        for target, pred in hourly.items():
+            bands = quantile_bands(pred, quantiles).drop(columns="forecast")
+            for label in bands:
+                frame[f"{target}_{label}"] = bands[label]
+    
+    frame = to_interval_and_unit(frame, config.forecast_interval, config.output_unit)
+    FORECAST_SECONDS.observe(time.perf_counter() - started, method=config.forecast_method)
+    return frame
@@ -0,0 +1,207 @@
+"""
+Sorted CSV history store for sensor ingestion.
+
+Readings arrive late, out of order or repeated. The CSV stays canonical
+(sorted by timestamp, one row per timestamp), so every reader - the
+forecast path, history queries, the backend's /historical-data chart -
+can use it as is, and no reading re-sorts the whole file:
+
+- the newest reading (the common case) is one appended line
+- a late or repeated reading is located by binary search over byte
+  offsets of the sorted file and written in place: the row is overwritten
+  or inserted and only the tail after it is rewritten
+- once the file outgrows retention + slack rows, the head is trimmed to
+  the retention window (one atomic rewrite per `slack` readings)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG, retention_hours
+
+COLUMNS = ['timestamp', 'solar_power_kw', 'load_total_kw']
+HEADER = (",".join(COLUMNS) + "\n").encode()
+STAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+SAMPLE_BYTES = 16384  # head block whose rows estimate the average row length
+
+
+def _line_ts(line):
+    """int64 ns timestamp of a CSV row (bytes)"""
+    return pd.Timestamp(line.split(b",", 1)[0].decode()).value
+
+
+class HistoryStore:
+    """Sorted, deduplicated CSV history of one data file with in-place upserts."""
+
+    def __init__(self, filename, retention=None, slack=None):
+        self.filename = str(filename)
+        self.retention = retention or retention_hours()
+        self.slack = CONFIG["retention_slack"] if slack is None else slack
+
+    def __len__(self):
+        return len(self.frame())
+
+    # ------------------------------------------------------------------
+    # Sorted file access
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _last_ts(f, size):
+        """Timestamp of the last row, or None if the file only has a header."""
+        f.seek(max(0, size - 4096))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+        if not lines or lines[-1] + b"\n" == HEADER:
+            return None
+        return _line_ts(lines[-1])
+
+    @staticmethod
+    def _locate(f, t, size):
+        """Byte offset of the first row with timestamp >= t (size if none)."""
+        f.seek(0)
+        lo, hi = len(f.readline()), size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = lo
+            if mid > lo:
+                # First row starting at or after mid
+                f.seek(mid - 1)
+                f.readline()
+                start = f.tell()
+            if start >= hi:
+                hi = mid
+                continue
+            f.seek(start)
+            line = f.readline()
+            if line.strip() and _line_ts(line) < t:
+                lo = start + len(line)
+            else:
+                hi = start
+        return lo
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def upsert(self, timestamp, solar_kw, load_kw):
+        """
+        Insert or overwrite the reading at `timestamp`, keeping the file sorted.
+
+        Returns:
+            "appended", "inserted" or "updated"
+        """
+        t = pd.Timestamp(pd.to_datetime(timestamp)).as_unit('ns').value
+        line = f"{pd.Timestamp(t).strftime(STAMP_FORMAT)},{float(solar_kw)},{float(load_kw)}\n".encode()
+        if not os.path.exists(self.filename):
+            with open(self.filename, 'wb') as f:
+                f.write(HEADER + line)
+            return "appended"
+
+        with open(self.filename, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            # Guard against a file without trailing newline
+            if size:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+                    size += 1
+            last = self._last_ts(f, size)
+            if last is None or t > last:
+                f.seek(size)
+                f.write(line)
+                action = "appended"
+            else:
+                pos = self._locate(f, t, size)
+                f.seek(pos)
+                tail = f.read()
+                current, _, rest = tail.partition(b"\n")
+                if current.strip() and _line_ts(current) == t:
+                    action, tail = "updated", rest
+                else:
+                    action = "inserted"
+                # Late readings are recent: the rewritten tail is short
+                f.seek(pos)
+                f.write(line + tail)
+                f.truncate()
+        self._maybe_compact()
+        return action
+
+    def stamp(self):
+        """
+        (byte size, newest timestamp) of the file, or None if it does not
+        exist: a cheap marker that changes with every stored reading.
+        """
+        try:
+            with open(self.filename, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                return size, self._last_ts(f, size)
+        except OSError:
+            return None
+
+    def readings(self, start, end):
+        """
+        Stored readings with start <= timestamp < end (int64 ns bounds),
+        located by binary search.
+
+        Returns:
+            (int64 ns timestamps, (n, 2) float array of solar / load kW)
+        """
+        try:
+            with open(self.filename, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                lo = self._locate(f, start, size)
+                hi = self._locate(f, end, size)
+                f.seek(lo)
+                lines = f.read(hi - lo).splitlines()
+        except OSError:
+            lines = []
+        lines = [line for line in lines if line.strip()]
+        stamps = np.array([_line_ts(line) for line in lines], dtype=np.int64)
+        values = np.array([line.split(b",")[1:3] for line in lines], dtype=float).reshape(-1, 2)
+        return stamps, values
+
+    def frame(self):
+        """Current retention window as a DataFrame indexed by timestamp."""
+        if not os.path.exists(self.filename):
+            return pd.DataFrame(columns=COLUMNS[1:], index=pd.DatetimeIndex([], name='timestamp'))
+        df = pd.read_csv(self.filename, parse_dates=['timestamp'])
+        return df.set_index('timestamp').tail(self.retention)
+
+    def compact(self):
+        """Rewrite the file as the sorted, deduplicated retention window (atomic)."""
+        df = pd.read_csv(self.filename, parse_dates=['timestamp'])
+        df = (df.sort_values('timestamp', kind='stable')
+                .drop_duplicates('timestamp', keep='last')
+                .tail(self.retention))
+        tmp = f"{self.filename}.{os.getpid()}.tmp"
+        df.to_csv(tmp, index=False, date_format=STAMP_FORMAT)
+        os.replace(tmp, self.filename)
+
+    def _estimated_rows(self):
+        """
+        Data rows in the file: its size over the average length of the rows
+        in its first block, so one short or long reading does not skew it.
+        """
+        with open(self.filename, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            head = f.read(SAMPLE_BYTES)
+        header, _, rows = head[:head.rfind(b"\n") + 1].partition(b"\n")
+        count = rows.count(b"\n")
+        if not count:
+            return 0
+        return (size - len(header) - 1) * count / len(rows)
+
+    def _maybe_compact(self):
+        """Trim the head once the file is estimated to exceed retention + slack rows."""
+        if self._estimated_rows() > self.retention + self.slack:
+            self.compact()
+
+
+_STORES = {}
+
+
+def get_history_store(filename):
+    """Process-wide HistoryStore for a data file."""
+    key = os.path.abspath(str(filename))
+    if key not in _STORES:
+        _STORES[key] = HistoryStore(key)
+    return _STORES[key]
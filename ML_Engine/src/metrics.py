@@ -0,0 +1,294 @@
+"""
+In-process metrics registry with Prometheus text-format export.
+
+Counters, gauges and latency histograms are plain Python objects updated
+under a per-metric lock (one dict lookup + add per observation), so
+instrumenting load / fit / forecast / ingest costs microseconds next to a
+multi-second SARIMA fit.
+
+Export:
+    write_metrics(path)         - Prometheus text file (node_exporter textfile
+                                  collector). Counters and histograms are
+                                  merged with the file's previous values, so
+                                  short-lived CLI runs accumulate; concurrent
+                                  runs serialise the merge on <path>.lock.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: merges are not serialised across processes
+    fcntl = None
+
+PREFIX = "solar_ml_"
+
+# Seconds: sub-millisecond cache hits up to long SARIMA fits
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_SAMPLE_RE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)$")
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """[(sample name, label string, value)] in exposition order"""
+        with self._lock:
+            return [(self.name, _format_labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. newest reading time)"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels))
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(_label_key(labels))
+        return state[2] if state else 0
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._values.items()):
+                running = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    running += c
+                    out.append((f"{self.name}_bucket", _format_labels(key, [("le", _format_value(bound))]), running))
+                out.append((f"{self.name}_sum", _format_labels(key), total))
+                out.append((f"{self.name}_count", _format_labels(key), n))
+        return out
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use"""
+
+    def __init__(self, prefix=PREFIX):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        full = self.prefix + name
+        metric = self._metrics.get(full)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(full, cls(full, help_text, **kwargs))
+        if not isinstance(metric, cls):
+            raise ValueError(f"metric {full} already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name, help_text=""):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def families(self):
+        """[(name, kind, help, samples)] for every metric with observations"""
+        return [(m.name, m.kind, m.help, m.samples()) for _, m in sorted(self._metrics.items())]
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        return _render(self.families())
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+def _render(families):
+    lines = []
+    for name, kind, help_text, samples in families:
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{sample}{labels} {_format_value(value)}" for sample, labels, value in samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _parse(text):
+    """Families from Prometheus text: {name: [kind, help, {(sample, labels): value}]}"""
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name, _, help_text = line[7:].partition(" ")
+            current = families.setdefault(name, ["untyped", help_text, {}])
+        elif line.startswith("# TYPE "):
+            name, _, kind = line[7:].partition(" ")
+            current = families.setdefault(name, [kind, "", {}])
+            current[0] = kind
+        elif current is not None and line and not line.startswith("#"):
+            match = _SAMPLE_RE.match(line)
+            if match:
+                current[2][(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return families
+
+
+def merge_text(previous, registry):
+    """
+    Registry families merged into previously exported text: counters and
+    histograms are added, gauges replaced, families only in `previous` kept.
+    """
+    merged = _parse(previous)
+    for name, kind, help_text, samples in registry.families():
+        old = merged.get(name, [kind, help_text, {}])[2]
+        values = dict(old)
+        for sample, labels, value in samples:
+            if kind in ("counter", "histogram"):
+                values[(sample, labels)] = old.get((sample, labels), 0) + value
+            else:
+                values[(sample, labels)] = value
+        merged[name] = [kind, help_text, values]
+    return _render([(name, kind, help_text, [(s, l, v) for (s, l), v in values.items()])
+                    for name, (kind, help_text, values) in sorted(merged.items())])
+
+
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on the sidecar <path>.lock (the metrics file itself is replaced)"""
+    with open(path.with_name(path.name + ".lock"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_metrics(path, registry=REGISTRY, merge=True):
+    """
+    Atomically write the registry to a Prometheus text file.
+
+    The read-merge-write runs under an exclusive file lock, so CLI runs
+    exiting at the same time do not drop each other's increments.
+
+    Args:
+        merge: add counters / histograms to the values already in the file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _file_lock(path):
+        previous = ""
+        if merge:
+            try:
+                previous = path.read_text()
+            except OSError:
+                pass
+        text = merge_text(previous, registry) if merge else registry.render()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+    return path
+
+
+# Engine metrics (names without the solar_ml_ prefix)
+LOAD_SECONDS = REGISTRY.histogram("history_load_seconds", "Time to load the training window")
+HISTORY_ROWS = REGISTRY.gauge("history_rows", "Rows in the loaded training window")
+HISTORY_LAST_TS = REGISTRY.gauge("history_last_reading_timestamp_seconds",
+                                 "Unix time of the newest reading in the loaded history")
+FIT_SECONDS = REGISTRY.histogram("model_fit_seconds",
+                                 "SARIMA parameter estimation (fit) or fixed-parameter filter time")
+FIT_TOTAL = REGISTRY.counter("model_fits_total", "SARIMA fits and registry filter passes")
+FIT_NOT_CONVERGED = REGISTRY.counter("model_fit_not_converged_total",
+                                     "SARIMA fits whose optimiser did not converge")
+FIT_ITERATIONS = REGISTRY.histogram("model_fit_iterations",
+                                    "Optimiser iterations per SARIMA fit (warm or cold start)",
+                                    buckets=(5, 10, 20, 30, 50, 100, 200))
+FIT_BUDGET_EXCEEDED = REGISTRY.counter("model_fit_budget_exceeded_total",
+                                       "SARIMA fits stopped by the fit-time budget")
+WARM_START_FALLBACKS = REGISTRY.counter("model_warm_start_fallbacks_total",
+                                        "Warm-started fits that did not converge and were refitted cold")
+FORECAST_SECONDS = REGISTRY.histogram("forecast_seconds", "End-to-end forecast time per call")
+ENSEMBLE_DROPPED = REGISTRY.counter("ensemble_member_dropped_total",
+                                    "Ensemble members dropped for timeout or error")
+CACHE_REQUESTS = REGISTRY.counter("forecast_cache_requests_total", "Forecast cache lookups by result")
+INGEST_SECONDS = REGISTRY.histogram("ingest_seconds", "Time to ingest one reading")
+INGEST_TOTAL = REGISTRY.counter("ingest_readings_total", "Readings ingested by outcome")
+BACKEND_WRITES = REGISTRY.counter("backend_forecast_writes_total",
+                                  "Backend ml_forecast.json publications by result")
@@ -0,0 +1,160 @@
+"""
+Versioned on-disk registry of fitted SARIMA parameters.
+
+Only the parameter vector and the model specification are stored (no
+pickled results objects), one small JSON file per version:
+
+    models/registry/<site>/<scenario>/<column>-v<N>.json
+
+Forecasts with a fresh entry apply the stored parameters with a single
+Kalman filter pass; the statsmodels optimiser runs only when the newest
+entry is older than CONFIG["registry_refit_days"] (weekly by default), did
+not converge (iteration cap or fit budget), its specification no longer
+matches CONFIG, or a refit is forced. A refit starts
+the optimiser from the newest converged entry (warm_start_params) rather than
+statsmodels' default start values.
+"""
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from .config import CONFIG
+
+REGISTRY_FORMAT = 1
+_VERSION_RE = re.compile(r"-v(\d+)\.json$")
+
+
+def registry_dir():
+    """Registry root (CONFIG["registry_dir"] or ML_Engine/models/registry)"""
+    return Path(CONFIG.get("registry_dir") or Path(__file__).resolve().parents[1] / "models" / "registry")
+
+
+def model_key_for(filename, site=None):
+    """
+    Registry key (site, scenario) for a history file; the scenario is the
+    file stem without the solar_data_ prefix (data/solar_data_sunny.csv ->
+    "sunny").
+    """
+    stem = Path(filename).stem
+    scenario = stem[len("solar_data_"):] if stem.startswith("solar_data_") else stem
+    return (site or CONFIG["site_id"], scenario)
+
+
+def _entry_dir(site, scenario):
+    return registry_dir() / str(site) / str(scenario)
+
+
+def _versions(site, scenario, column):
+    """Sorted list of (version, path) for one site/scenario/column"""
+    folder = _entry_dir(site, scenario)
+    if not folder.exists():
+        return []
+    found = []
+    for path in folder.glob(f"{column}-v*.json"):
+        match = _VERSION_RE.search(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def load_params(site, scenario, column="solar_power_kw"):
+    """
+    Newest registry entry, or None.
+
+    Returns:
+        dict with version, fitted_at, order, seasonal_order, param_names, params
+    """
+    versions = _versions(site, scenario, column)
+    if not versions:
+        return None
+    try:
+        with open(versions[-1][1]) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_params(site, scenario, column, fitted, **extra):
+    """
+    Store a fitted model's parameter vector as a new version and prune old
+    versions beyond CONFIG["registry_keep"].
+
+    Returns:
+        dict: the stored entry
+    """
+    versions = _versions(site, scenario, column)
+    version = versions[-1][0] + 1 if versions else 1
+    model = fitted.model
+    retvals = getattr(fitted, "mle_retvals", None)  # absent on filter results
+    entry = {
+        "format": REGISTRY_FORMAT,
+        "version": version,
+        "fitted_at": time.time(),
+        "order": list(model.order),
+        "seasonal_order": list(model.seasonal_order),
+        "param_names": list(model.param_names),
+        "params": [float(p) for p in fitted.params],
+        "nobs": int(fitted.nobs),
+        "converged": bool(retvals.get("converged", True)) if retvals else True,
+        **extra,
+    }
+
+    folder = _entry_dir(site, scenario)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{column}-v{version}.json"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(entry, f, indent=2)
+    os.replace(tmp, path)
+
+    for _, old in versions[:max(0, len(versions) + 1 - CONFIG["registry_keep"])]:
+        old.unlink(missing_ok=True)
+    return entry
+
+
+def _matches(entry, model):
+    """True if a registry entry was fitted with the model's specification"""
+    return (entry is not None
+            and entry.get("format") == REGISTRY_FORMAT
+            and entry["order"] == list(model.order)
+            and entry["seasonal_order"] == list(model.seasonal_order)
+            and entry["param_names"] == list(model.param_names))
+
+
+def is_reusable(entry, model):
+    """
+    True if a registry entry is recent enough, converged and matches the
+    model specification. Unconverged entries (iteration cap, fit budget)
+    are re-estimated on the next run, warm-started from their parameters.
+    """
+    if not _matches(entry, model) or not entry.get("converged", True):
+        return False
+    age_days = (time.time() - entry["fitted_at"]) / 86400
+    return age_days < CONFIG["registry_refit_days"]
+
+
+def warm_start_params(site, scenario, column, model):
+    """
+    Optimiser start values for a refit: parameters of the newest converged
+    entry matching the model specification (any age), else of the newest
+    matching entry (a fit stopped by the iteration cap is still much closer
+    to the optimum than the default start values).
+
+    Returns:
+        list of floats, or None (cold start)
+    """
+    fallback = None
+    for _, path in reversed(_versions(site, scenario, column)):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _matches(entry, model):
+            continue
+        if entry.get("converged", True):
+            return entry["params"]
+        fallback = fallback or entry["params"]
+    return fallback
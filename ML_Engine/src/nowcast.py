@@ -0,0 +1,155 @@
+"""
+Intraday nowcast correction on top of the cached forecast.
+
+Between refits the cached SARIMA forecast ignores what the inverter has
+actually produced since. The nowcast keeps two exponentially weighted
+error statistics, updated in O(1) per ingested reading:
+
+    ratio  - observed / forecast (only while the forecast is above
+             CONFIG["nowcast_min_kw"], so night-time noise is ignored)
+    bias   - observed - forecast (kW)
+
+and applies one of them (CONFIG["nowcast_mode"]) to the forecast with a
+weight that decays by CONFIG["nowcast_decay"] per 15 minutes after the last
+observation, so a passing cloud pulls the next intervals down without
+bending the rest of the day.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG
+from .data_utils import cache_path
+from .forecast_cache import cached_hourly_forecast, cached_subhourly_forecast, load_cached_forecast
+from .forecast_solar import convert_kw_to_wh, to_interval_and_unit
+from .subhourly import use_native_15min
+
+MAX_RATIO = 2.0
+
+
+def _state_path(filename):
+    return cache_path(filename, "nowcast.json")
+
+
+def fresh_state(key=None):
+    """Neutral nowcast state tied to a cached forecast entry"""
+    return {"key": key, "ratio": 1.0, "bias": 0.0, "last_time": None, "observations": 0}
+
+
+def load_state(filename):
+    path = _state_path(filename)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return fresh_state()
+
+
+def save_state(filename, state):
+    path = _state_path(filename)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def update_nowcast(filename, timestamp, observed_kw):
+    """
+    Fold one observed solar reading into the nowcast state (O(1)).
+
+    The reading is compared with the cached forecast the state belongs to;
+    readings outside that forecast's window are ignored.
+
+    Returns:
+        dict: updated state
+    """
+    state = load_state(filename)
+    if not state.get("key"):
+        return state
+    cached = load_cached_forecast(filename, state["key"])
+    if cached is None:
+        return state
+    forecast = cached[0]
+
+    t = pd.Timestamp(pd.to_datetime(timestamp))
+    start = forecast.index[0] - pd.Timedelta(hours=1)
+    if not start <= t <= forecast.index[-1]:
+        return state
+
+    stamps = forecast.index.to_numpy(dtype='datetime64[ns]').view('int64')
+    expected = float(np.interp(t.as_unit('ns').value, stamps, forecast.to_numpy()))
+    observed = float(observed_kw)
+    alpha = CONFIG["nowcast_alpha"]
+
+    state["bias"] = alpha * (observed - expected) + (1 - alpha) * state["bias"]
+    if expected >= CONFIG["nowcast_min_kw"]:
+        ratio = min(max(observed / expected, 0.0), MAX_RATIO)
+        state["ratio"] = alpha * ratio + (1 - alpha) * state["ratio"]
+    if state["last_time"] is None or t > pd.Timestamp(state["last_time"]):
+        state["last_time"] = t.isoformat()
+    state["observations"] += 1
+
+    save_state(filename, state)
+    return state
+
+
+def apply_nowcast(forecast_kw, state):
+    """
+    Apply the decaying correction to a kW forecast (any interval).
+
+    Returns:
+        pd.Series, clipped at 0
+    """
+    if not state.get("observations") or state.get("last_time") is None:
+        return forecast_kw
+    minutes_ahead = (forecast_kw.index - pd.Timestamp(state["last_time"])) / pd.Timedelta(minutes=15)
+    weight = CONFIG["nowcast_decay"] ** np.maximum(np.asarray(minutes_ahead, dtype=float), 0)
+    if CONFIG["nowcast_mode"] == "bias":
+        corrected = forecast_kw + state["bias"] * weight
+    else:
+        corrected = forecast_kw * (1 + (state["ratio"] - 1) * weight)
+    return corrected.clip(lower=0)
+
+
+def nowcast_forecast(filename, method=None, horizon=None, interval="15min", unit="wh", config=None):
+    """
+    Cached forecast + nowcast correction, converted to interval and unit.
+
+    A refit (cache expired) resets the correction, since the new fit
+    already contains the readings it was built from. 15-minute requests on
+    a 15-minute history use the native sub-hourly model instead of the
+    interpolated hourly forecast.
+
+    Returns:
+        (pd.Series, info dict with nowcast state, data_points and model)
+    """
+    native = interval == "15min" and use_native_15min(filename)
+    if native:
+        forecast, meta, refitted = cached_subhourly_forecast(filename, horizon, config)
+    else:
+        forecast, meta, refitted = cached_hourly_forecast(filename, method, horizon, config)
+        forecast = to_interval_and_unit(forecast, interval, "kw")
+    state = load_state(filename)
+    if refitted or state.get("key") != meta["key"]:
+        state = fresh_state(meta["key"])
+        save_state(filename, state)
+
+    pred = apply_nowcast(forecast, state)
+    if unit == "wh":
+        pred = convert_kw_to_wh(pred, 15 if interval == "15min" else 60)
+    return pred, {
+        "refitted": refitted,
+        "data_points": meta.get("data_points"),
+        "model": "subhourly" if native else "hourly",
+        "nowcast": {
+            "ratio": round(state["ratio"], 3),
+            "bias": round(state["bias"], 3),
+            "observations": state["observations"],
+        },
+    }
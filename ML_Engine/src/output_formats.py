@@ -0,0 +1,166 @@
+"""
+Output serialisers for forecast payloads.
+
+The default JSON response carries the whole forecast list inside one
+pretty-printed document. For long 15-minute or multi-scenario outputs the
+formats below are cheaper to produce and to parse on the Node side:
+
+    ndjson  - one JSON record per line, header first, streamed as produced
+    csv     - "datetime,value_<unit>" rows
+    binary  - fixed 20-byte header followed by little-endian float32 values
+"""
+import json
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+FORMATS = ("json", "text", "ndjson", "csv", "binary")
+STREAM_FORMATS = ("ndjson", "csv", "binary")
+
+# Binary layout: magic, version, unit code, interval minutes, count, start epoch (s)
+BINARY_MAGIC = b"SFC1"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sBBHIq")
+UNIT_CODES = {"kw": 0, "wh": 1}
+
+
+def _interval_minutes(interval):
+    return 15 if interval == "15min" else 60
+
+
+def _iso_stamps(index):
+    """Vectorised ISO-8601 second-resolution strings for a DatetimeIndex."""
+    return np.datetime_as_string(index.to_numpy(dtype="datetime64[s]"), unit="s").tolist()
+
+
+def _value_columns(forecast, unit):
+    """(field name, rounded value list) pairs for a Series or a DataFrame"""
+    if isinstance(forecast, pd.DataFrame):
+        return [(f"{col}_{unit}", np.round(forecast[col].to_numpy(dtype=float), 2).tolist())
+                for col in forecast.columns]
+    return [(f"value_{unit}", np.round(forecast.to_numpy(dtype=float), 2).tolist())]
+
+
+def _json_tokens(values):
+    """JSON number tokens for a value list; NaN (not valid JSON) becomes null"""
+    return ["null" if value != value else str(value) for value in values]
+
+
+def _json_safe(obj):
+    """Copy of a JSON-able structure with NaN floats replaced by None"""
+    if isinstance(obj, float) and obj != obj:
+        return None
+    if isinstance(obj, dict):
+        return {key: _json_safe(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(value) for value in obj]
+    return obj
+
+
+def iter_ndjson(forecast, meta, unit):
+    """
+    Yield NDJSON lines: one header record, then one record per forecast step.
+    Missing values (NaN) are written as null.
+
+    Args:
+        forecast: pd.Series (or multi-column pd.DataFrame) with DatetimeIndex
+        meta: dict of response fields written as the header record
+        unit: "kw" or "wh"
+    """
+    yield json.dumps(_json_safe({"record": "header", **meta}), separators=(",", ":"),
+                     allow_nan=False) + "\n"
+    columns = [(name, _json_tokens(values)) for name, values in _value_columns(forecast, unit)]
+    stamps = _iso_stamps(forecast.index)
+    if len(columns) == 1:
+        name, values = columns[0]
+        for ts, value in zip(stamps, values):
+            yield f'{{"record":"step","datetime":"{ts}","{name}":{value}}}\n'
+        return
+    keys = [f'"{name}":' for name, _ in columns]
+    for ts, *values in zip(stamps, *(vals for _, vals in columns)):
+        fields = ",".join(f"{key}{value}" for key, value in zip(keys, values))
+        yield f'{{"record":"step","datetime":"{ts}",{fields}}}\n'
+
+
+def iter_csv(forecast, unit):
+    """Yield CSV lines ("datetime,value_<unit>" or one column per frame column)."""
+    columns = _value_columns(forecast, unit)
+    yield ",".join(["datetime"] + [name for name, _ in columns]) + "\n"
+    stamps = _iso_stamps(forecast.index)
+    if len(columns) == 1:
+        for ts, value in zip(stamps, columns[0][1]):
+            yield f"{ts},{value}\n"
+        return
+    for ts, *values in zip(stamps, *(vals for _, vals in columns)):
+        yield ",".join([ts] + [str(value) for value in values]) + "\n"
+
+
+def pack_binary(forecast, unit, interval):
+    """
+    Encode a forecast as header + float32 values.
+
+    Returns:
+        bytes: 20-byte header followed by len(forecast) float32 values
+    """
+    if isinstance(forecast, pd.DataFrame):
+        raise ValueError("binary format carries a single series; use ndjson or csv")
+    start = int(forecast.index[0].value // 10**9) if len(forecast) else 0
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, UNIT_CODES[unit],
+        _interval_minutes(interval), len(forecast), start,
+    )
+    return header + forecast.to_numpy(dtype="<f4").tobytes()
+
+
+def unpack_binary(payload):
+    """
+    Decode bytes produced by pack_binary back into a pd.Series.
+
+    Returns:
+        tuple: (pd.Series of float32 values, unit string)
+    """
+    magic, version, unit_code, minutes, count, start = BINARY_HEADER.unpack_from(payload)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a solar forecast binary payload")
+    values = np.frombuffer(payload, dtype="<f4", count=count, offset=BINARY_HEADER.size)
+    index = pd.date_range(start=pd.Timestamp(start, unit="s"), periods=count,
+                          freq=f"{minutes}min")
+    unit = {code: name for name, code in UNIT_CODES.items()}[unit_code]
+    return pd.Series(values, index=index), unit
+
+
+def encode_forecast(forecast, meta, fmt, unit, interval):
+    """
+    Encode a forecast in one of the stream formats.
+
+    Returns:
+        str for ndjson/csv, bytes for binary
+    """
+    if fmt == "ndjson":
+        return "".join(iter_ndjson(forecast, meta, unit))
+    if fmt == "csv":
+        return "".join(iter_csv(forecast, unit))
+    if fmt == "binary":
+        return pack_binary(forecast, unit, interval)
+    raise ValueError(f"format: one of {', '.join(STREAM_FORMATS)}")
+
+
+def write_forecast(forecast, meta, fmt, unit, interval, stream=None):
+    """
+    Write a forecast to a stream, line by line for the text formats.
+
+    Binary output goes to the underlying byte buffer of the stream.
+    """
+    stream = stream or sys.stdout
+    if fmt == "binary":
+        out = getattr(stream, "buffer", stream)
+        out.write(pack_binary(forecast, unit, interval))
+        out.flush()
+        return
+    lines = iter_ndjson(forecast, meta, unit) if fmt == "ndjson" else iter_csv(forecast, unit)
+    for line in lines:
+        stream.write(line)
+    stream.flush()
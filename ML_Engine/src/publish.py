@@ -0,0 +1,120 @@
+"""
+Change-aware publication of the forecast the backend schedules from.
+
+The backend polls Backend/ml_forecast.json on every scheduler tick. The
+file is only rewritten when the forecast changed materially:
+
+    1. content hash - sha256 of the published values (not the timestamp);
+                      equal to the current file's hash -> nothing to do
+    2. tolerance    - no step (nor avgKw1h) moved by more than the
+                      tolerance -> nothing to do
+    3. otherwise    - write to a per-process temporary file and
+                      os.replace() it, so a reader never sees a
+                      half-written file, with version = last version + 1
+
+The last version is also kept in a sidecar (<path>.version), so a corrupt
+or unreadable forecast file is replaced without the version going back to
+1 and consumers that skip by version never miss a publication.
+
+Comparisons are against the last *published* forecast, so slow drift
+still gets published once it adds up to the tolerance. Consumers can
+skip unchanged files by mtime or version.
+"""
+import hashlib
+import json
+import os
+
+# Published keys that make up the content (generatedAt / version excluded)
+CONTENT_KEYS = ("avgKw1h", "confidence", "unit", "interval", "steps")
+
+
+def content_hash(payload):
+    """sha256 over the canonical JSON of the CONTENT_KEYS of a payload"""
+    content = {k: payload.get(k) for k in CONTENT_KEYS}
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def read_published(path):
+    """The currently published payload, or None if missing / unreadable"""
+    try:
+        with open(path) as f:
+            payload = json.load(f)
+        return payload if isinstance(payload, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def version_path(path):
+    """Sidecar holding the last published version"""
+    return f"{path}.version"
+
+
+def last_version(path, previous=None):
+    """
+    Highest version published to `path`: the sidecar's or the payload's
+    (files published before the sidecar existed), 0 if neither is known.
+    """
+    versions = [0]
+    try:
+        with open(version_path(path)) as f:
+            versions.append(int(f.read().strip()))
+    except (OSError, ValueError):
+        pass
+    version = (previous or {}).get("version")
+    if isinstance(version, int) and not isinstance(version, bool):
+        versions.append(version)
+    return max(versions)
+
+
+def _write_atomic(path, text):
+    """Write via a per-process temporary file next to `path` and os.replace()"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def within_tolerance(previous, payload, tolerance):
+    """True if every step and avgKw1h differ by at most `tolerance`"""
+    old, new = previous.get("steps"), payload["steps"]
+    if (not isinstance(old, list) or len(old) != len(new)
+            or any(previous.get(k) != payload[k] for k in ("confidence", "unit", "interval"))):
+        return False
+    try:
+        deltas = [abs(a - b) for a, b in zip(old, new)]
+        deltas.append(abs(previous["avgKw1h"] - payload["avgKw1h"]))
+    except (KeyError, TypeError):
+        return False
+    return max(deltas) <= tolerance
+
+
+def publish_forecast(path, payload, tolerance=0.0):
+    """
+    Publish a forecast payload unless it matches the current file.
+
+    Args:
+        path: output file (Backend/ml_forecast.json)
+        payload: dict with the CONTENT_KEYS and generatedAt
+        tolerance: largest per-step change (payload units) that is not
+            republished
+
+    Returns:
+        (result, published payload): result is "written", "unchanged"
+        (same content hash) or "within_tolerance"; the published payload is
+        the file's content afterwards
+    """
+    payload = {**payload, "contentHash": content_hash(payload)}
+    previous = read_published(path)
+    if previous is not None:
+        if previous.get("contentHash") == payload["contentHash"]:
+            return "unchanged", previous
+        if tolerance > 0 and within_tolerance(previous, payload, tolerance):
+            return "within_tolerance", previous
+
+    payload["version"] = last_version(path, previous) + 1
+    _write_atomic(path, json.dumps(payload, indent=2))
+    _write_atomic(version_path(path), f"{payload['version']}\n")
+    return "written", payload
@@ -0,0 +1,165 @@
+"""
+Memory-mapped ring buffer for the rolling history window.
+
+The retention window is fixed (CONFIG["retention_hours"] slots of one grid
+step each, at least train_days; the file is re-seeded from the CSV when
+that changes), so it is stored as a preallocated file:
+
+    header (64 bytes): magic, version, capacity, step_ns, head_ns
+    timestamp int64[2 * capacity]
+    values    float64[2 * capacity, 2]   (solar_power_kw, load_total_kw)
+
+Slots are time-addressed, slot = (t // step) % capacity, so ingest is an
+O(1) write whatever the arrival order, and retention is implicit. Each slot
+is written twice (at i and i + capacity): any window of up to `capacity`
+steps ending at the head is then one contiguous slice, which is handed to
+the forecaster as a zero-copy view of the mapped file.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .config import CONFIG, retention_hours
+
+MAGIC = b"SRB1"
+VERSION = 1
+HEADER_BYTES = 64
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'), ('version', '<u4'), ('capacity', '<i8'),
+    ('step_ns', '<i8'), ('head_ns', '<i8'),
+])
+EMPTY = np.iinfo(np.int64).min
+COLUMNS = ['solar_power_kw', 'load_total_kw']
+
+
+class RingBuffer:
+    """Fixed-size, time-addressed, memory-mapped history window."""
+
+    def __init__(self, path, mode='r+'):
+        self.path = str(path)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode=mode)
+        self._header = self._mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        if self._header['magic'][0] != MAGIC or self._header['version'][0] != VERSION:
+            raise ValueError(f"{self.path} is not a history ring buffer")
+        self.capacity = int(self._header['capacity'][0])
+        self.step_ns = int(self._header['step_ns'][0])
+        ts_end = HEADER_BYTES + 16 * self.capacity
+        self._ts = self._mm[HEADER_BYTES:ts_end].view('<i8')
+        self._values = self._mm[ts_end:].view('<f8').reshape(2 * self.capacity, 2)
+
+    @classmethod
+    def create(cls, path, capacity=None, freq="h"):
+        """Preallocate an empty ring buffer file."""
+        capacity = capacity or retention_hours()
+        size = HEADER_BYTES + 16 * capacity + 32 * capacity
+        mm = np.memmap(str(path), dtype=np.uint8, mode='w+', shape=size)
+        header = mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, capacity,
+                     pd.tseries.frequencies.to_offset(freq).nanos, EMPTY)
+        mm[HEADER_BYTES:].view('<f8')[:] = np.nan
+        mm[HEADER_BYTES:HEADER_BYTES + 16 * capacity].view('<i8')[:] = EMPTY
+        mm.flush()
+        del mm
+        return cls(path)
+
+    @property
+    def head_ns(self):
+        return int(self._header['head_ns'][0])
+
+    def _stamp_grid(self, head_index):
+        """First write: put every slot on the grid ending at head_index (values stay NaN)."""
+        steps = np.arange(head_index - self.capacity + 1, head_index + 1, dtype=np.int64)
+        slots = steps % self.capacity
+        self._ts[slots] = self._ts[slots + self.capacity] = steps * self.step_ns
+        self._header['head_ns'] = head_index * self.step_ns
+
+    def _write_slot(self, step_index, solar_kw, load_kw):
+        slot = step_index % self.capacity
+        t = step_index * self.step_ns
+        self._ts[slot] = self._ts[slot + self.capacity] = t
+        self._values[slot] = self._values[slot + self.capacity] = (solar_kw, load_kw)
+
+    def write(self, timestamp, solar_kw, load_kw):
+        """
+        O(1) slot write for one reading (amortised over skipped steps).
+
+        Returns:
+            False if the reading is older than the retained window
+        """
+        t = pd.Timestamp(pd.to_datetime(timestamp)).as_unit('ns').value
+        step_index = t // self.step_ns
+        if self.head_ns == EMPTY:
+            self._stamp_grid(step_index)
+        head_index = self.head_ns // self.step_ns
+        if step_index <= head_index - self.capacity:
+            return False
+
+        # Advancing the head: blank the skipped slots so stale data never leaks
+        if step_index > head_index:
+            for skipped in range(max(head_index + 1, step_index - self.capacity + 1), step_index):
+                self._write_slot(skipped, np.nan, np.nan)
+            self._header['head_ns'] = step_index * self.step_ns
+
+        self._write_slot(step_index, float(solar_kw), float(load_kw))
+        return True
+
+    def write_many(self, index, values):
+        """Vectorised bulk load of a regular history frame (keeps the newest `capacity`)."""
+        steps = index.to_numpy(dtype='datetime64[ns]').view('int64') // self.step_ns
+        steps, values = steps[-self.capacity:], np.asarray(values, dtype=float)[-self.capacity:]
+        if not len(steps):
+            return
+        if self.head_ns == EMPTY:
+            self._stamp_grid(int(steps[-1]))
+        slots = steps % self.capacity
+        for offset in (0, self.capacity):
+            self._ts[slots + offset] = steps * self.step_ns
+            self._values[slots + offset] = values
+        self._header['head_ns'] = max(self.head_ns, int(steps[-1] * self.step_ns))
+
+    def window(self, steps=None):
+        """
+        Last `steps` slots ending at the head as a zero-copy DataFrame view.
+
+        Slots never written (or blanked gaps) carry NaN values; every slot
+        timestamp is on the grid from the first write onwards.
+        """
+        steps = min(steps or self.capacity, self.capacity)
+        if self.head_ns == EMPTY:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='timestamp'))
+        end = (self.head_ns // self.step_ns) % self.capacity + self.capacity + 1
+        start = end - steps
+        index = pd.DatetimeIndex(self._ts[start:end].view('datetime64[ns]'), name='timestamp')
+        return pd.DataFrame(self._values[start:end], index=index, columns=COLUMNS, copy=False)
+
+    def flush(self):
+        self._mm.flush()
+
+
+def ring_path(filename):
+    """Ring buffer file kept next to a scenario CSV: <stem>.ring"""
+    return os.path.splitext(str(filename))[0] + ".ring"
+
+
+def open_ring_buffer(filename):
+    """
+    Open the ring buffer for a scenario CSV, creating and seeding it from the
+    (regularised) CSV history on first use, or when its capacity no longer
+    matches retention_hours().
+    """
+    path = ring_path(filename)
+    if os.path.exists(path):
+        ring = RingBuffer(path)
+        if ring.capacity == retention_hours():
+            return ring
+        # Retention changed since the file was created (e.g. a longer
+        # train_days): re-seed from the CSV, which holds every reading
+        del ring
+    ring = RingBuffer.create(path)
+    if os.path.exists(str(filename)):
+        from .data_utils import load_regular_history
+        regular, _ = load_regular_history(str(filename))
+        ring.write_many(regular.index, regular.to_numpy())
+        ring.flush()
+    return ring
@@ -0,0 +1,86 @@
+"""
+Multi-scenario forecasting in one process.
+
+Scenario files are discovered in data/ (solar_data_<name>.csv) and fitted
+concurrently in a process pool, so the dashboard gets every scenario from
+one interpreter start instead of one CLI launch per --weather value.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .config import CONFIG
+from .data_utils import load_solar_csv
+from .forecast_solar import forecast_solar
+from .model_registry import model_key_for
+
+SCENARIO_PREFIX = "solar_data_"
+
+
+def discover_scenarios(data_dir):
+    """
+    Map scenario name → CSV path for every solar_data_<name>.csv in data_dir.
+
+    Returns:
+        dict sorted by scenario name
+    """
+    files = sorted(Path(data_dir).glob(f"{SCENARIO_PREFIX}*.csv"))
+    return {f.stem[len(SCENARIO_PREFIX):]: f for f in files}
+
+
+def _forecast_scenario(csv_file, method, horizon, interval, unit, config, quantiles=None,
+                       refit=False):
+    """Worker: load + forecast one scenario file (module-level so it pickles)"""
+    df = load_solar_csv(str(csv_file), days=config.train_days if config else None)
+    forecast = forecast_solar(df, method=method, horizon=horizon, interval=interval, unit=unit,
+                              model_key=model_key_for(csv_file), refit=refit, config=config,
+                              quantiles=quantiles)
+    info = {
+        "data_range": {
+            "start": df.index[0].strftime("%d-%m-%Y"),
+            "end": df.index[-1].strftime("%d-%m-%Y"),
+        },
+        "data_quality": df.attrs.get("gap_stats", {}),
+    }
+    return forecast, info
+
+
+def iter_scenario_forecasts(scenarios, method=None, horizon=None, interval=None, unit=None,
+                            max_workers=None, config=None, quantiles=None, refit=False):
+    """
+    Fit every scenario concurrently and yield results as they complete.
+
+    Args:
+        scenarios: dict name → CSV path (see discover_scenarios)
+        method, horizon, interval, unit, config, quantiles, refit: as forecast_solar
+        max_workers: process pool size (default: CONFIG["max_workers"] or one per scenario)
+
+    Yields:
+        (name, forecast pd.Series, info dict) in completion order; with
+        quantiles the forecast is forecast_solar's frame ("forecast", "p10", ...)
+    """
+    if not scenarios:
+        raise ValueError("No scenario files found")
+    workers = min(max_workers or CONFIG.get("max_workers") or len(scenarios), len(scenarios))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_forecast_scenario, path, method, horizon, interval, unit, config,
+                        quantiles, refit): name
+            for name, path in scenarios.items()
+        }
+        for future in as_completed(futures):
+            forecast, info = future.result()
+            yield futures[future], forecast, info
+
+
+def forecast_scenarios(scenarios, method=None, horizon=None, interval=None, unit=None,
+                       max_workers=None, config=None):
+    """
+    Fit every scenario concurrently.
+
+    Returns:
+        dict name → (forecast pd.Series, info dict), ordered like `scenarios`
+    """
+    results = {name: (forecast, info) for name, forecast, info in
+               iter_scenario_forecasts(scenarios, method, horizon, interval, unit, max_workers,
+                                       config)}
+    return {name: results[name] for name in scenarios}
@@ -0,0 +1,157 @@
+"""
+What-if replay of stored history through the backend scheduler.
+
+Evaluates system configurations (battery size, panel kW, efficiency)
+offline by replaying a solar history through the allocation of
+Backend/src/core/scheduler.ts (scheduleDevices) and battery.ts
+(updateBattery), once per timestep:
+
+    available  = battery + solar
+    CRITICAL   - always on, available -= powerW * dt
+    FLEXIBLE   - in order, on if available >= powerW * dt (then subtracted)
+    OPTIONAL   - likewise, after every FLEXIBLE device
+    battery    = clip(battery + solar - load, 0, capacity)
+
+Solar energy per step is the recorded kW profile scaled to each
+configuration: solar_kw / reference_kw * panel_kw * efficiency * 1000 * dt.
+reference_kw is the panel that recorded the history. It is one fixed value
+for every history compared (never each history's own peak, which would
+scale a cloudy history up to a sunny one's output).
+
+The battery makes each step depend on the previous one, so the replay
+walks the timeline once; every step is a handful of NumPy operations over
+all configurations at once (a grid of thousands costs about as much as a
+single one in a Python loop).
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .data_utils import load_regular_history
+from .forecast_solar import interpolate_to_15min
+
+# Backend/src/services/state.service.ts defaults
+DEFAULT_DEVICES = (
+    {"name": "Security System", "powerW": 50, "type": "CRITICAL"},
+    {"name": "Refrigerator", "powerW": 200, "type": "CRITICAL"},
+    {"name": "AC Unit", "powerW": 1500, "type": "FLEXIBLE"},
+    {"name": "Washing Machine", "powerW": 500, "type": "FLEXIBLE"},
+    {"name": "Pool Pump", "powerW": 750, "type": "OPTIONAL"},
+)
+DEVICE_TYPES = ("CRITICAL", "FLEXIBLE", "OPTIONAL")
+
+# Backend/src/services/systemConfiguration.ts default panelCapacityKw
+DEFAULT_REFERENCE_KW = 3.0
+
+
+def load_replay(filename, interval="15min"):
+    """
+    Stored history as the solar kW series the scheduler would have seen.
+
+    Args:
+        interval: "15min" (the backend's scheduler tick, interpolated from
+            the hourly history) or "1h"
+
+    Returns:
+        pd.Series of solar kW per step
+    """
+    regular, _ = load_regular_history(str(filename))
+    solar = regular['solar_power_kw'].ffill().fillna(0)
+    return interpolate_to_15min(solar) if interval == "15min" else solar
+
+
+def shared_reference_kw(histories):
+    """Largest peak over several solar histories: one reference_kw for all of them"""
+    peak = max((float(np.max(h)) for h in histories if len(h)), default=0.0)
+    return peak or DEFAULT_REFERENCE_KW
+
+
+def config_grid(battery_wh, panel_kw, efficiency):
+    """Every (battery_wh, panel_kw, efficiency) combination as a DataFrame"""
+    rows = list(itertools.product(np.atleast_1d(battery_wh), np.atleast_1d(panel_kw),
+                                  np.atleast_1d(efficiency)))
+    return pd.DataFrame(rows, columns=["battery_wh", "panel_kw", "efficiency"], dtype=float)
+
+
+def simulate(solar_kw, configs, devices=DEFAULT_DEVICES, timestep_hours=0.25,
+             reference_kw=DEFAULT_REFERENCE_KW, initial_soc=1.0):
+    """
+    Replay a solar history for many configurations at once.
+
+    Args:
+        solar_kw: recorded solar kW per step (array or Series)
+        configs: DataFrame with battery_wh, panel_kw, efficiency columns
+            (e.g. config_grid())
+        devices: dicts with powerW and type (CRITICAL / FLEXIBLE / OPTIONAL),
+            in scheduling order
+        timestep_hours: step length (0.25 = the backend's 15-minute tick)
+        reference_kw: panel kW that produced solar_kw (default: the
+            backend's default 3 kW panel); pass the same value for every
+            history compared, e.g. shared_reference_kw()
+        initial_soc: battery fill at the start (the backend starts full)
+
+    Returns:
+        configs with per-configuration metrics added:
+            unmet_critical_wh / unmet_critical_steps - CRITICAL demand the
+                battery + solar could not cover (backend energyDeficitWh)
+            curtailed_wh / curtailed_pct - solar lost to a full battery
+            flexible_served_pct / optional_served_pct - share of device-steps on
+            final_battery_wh
+    """
+    unknown = {d["type"] for d in devices} - set(DEVICE_TYPES)
+    if unknown:
+        raise ValueError(f"device type: one of {DEVICE_TYPES}, got {sorted(unknown)}")
+    solar_kw = np.asarray(solar_kw, dtype=float)
+    if not reference_kw or reference_kw <= 0:
+        raise ValueError("reference_kw: panel kW > 0")
+    capacity = configs["battery_wh"].to_numpy(dtype=float)
+    # Wh per step for 1 kW of recorded output, per configuration
+    scale = (configs["panel_kw"].to_numpy(dtype=float) * configs["efficiency"].to_numpy(dtype=float)
+             * 1000 * timestep_hours / reference_kw)
+
+    required = {t: [d["powerW"] * timestep_hours for d in devices if d["type"] == t]
+                for t in DEVICE_TYPES}
+    critical_wh = float(sum(required["CRITICAL"]))
+
+    n = len(configs)
+    battery = capacity * initial_soc
+    unmet = np.zeros(n)
+    unmet_steps = np.zeros(n, dtype=np.int64)
+    curtailed = np.zeros(n)
+    served = {"FLEXIBLE": np.zeros(n), "OPTIONAL": np.zeros(n)}
+    on = np.empty(n, dtype=bool)
+
+    for kw in solar_kw:
+        solar = kw * scale
+        energy = battery + solar
+        available = energy - critical_wh
+        load = np.full(n, critical_wh)
+        short = np.maximum(critical_wh - energy, 0.0)
+        unmet += short
+        unmet_steps += short > 0
+        for kind in ("FLEXIBLE", "OPTIONAL"):
+            for wh in required[kind]:
+                np.greater_equal(available, wh, out=on)
+                step = on * wh
+                available -= step
+                load += step
+                served[kind] += on
+        after = energy - load
+        curtailed += np.maximum(after - capacity, 0.0)
+        battery = np.clip(after, 0.0, capacity)
+
+    steps = len(solar_kw)
+    total_solar = solar_kw.sum() * scale
+    result = configs.copy()
+    result["unmet_critical_wh"] = unmet
+    result["unmet_critical_steps"] = unmet_steps
+    result["curtailed_wh"] = curtailed
+    result["curtailed_pct"] = 100 * np.divide(curtailed, total_solar, out=np.zeros(n),
+                                              where=total_solar > 0)
+    for kind, count in served.items():
+        devices_of_kind = len(required[kind])
+        result[f"{kind.lower()}_served_pct"] = (100 * count / (steps * devices_of_kind)
+                                                if devices_of_kind and steps else 0.0)
+    result["final_battery_wh"] = battery
+    return result
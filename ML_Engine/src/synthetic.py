@@ -0,0 +1,244 @@
+"""
+Deterministic synthetic solar/load history for scale and load testing.
+
+Everything is generated as NumPy arrays over (sites x time):
+
+- clear-sky PV from solar geometry (declination + hour angle at the site
+  latitude), so diurnal shape and seasonal drift come out naturally
+- cloud attenuation from an AR(1) cloud-cover process per site
+- household load with morning/evening peaks, weekend uplift and noise
+- optional dropped readings (gaps) and repeated readings (duplicates), as
+  seen from real inverters, to exercise regularize_series / ingestion
+
+Output is produced in chunks so years of 15-minute data for many sites can
+be streamed to CSV or to the ring buffer store without holding it all in
+memory. Random numbers are drawn in fixed blocks of steps, each from its
+own stream keyed by (seed, block), so the seed alone decides the data
+whatever chunk_rows is.
+"""
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Nagpur, matching the bundled scenario files
+DEFAULT_LATITUDE = 21.1
+
+# Rows per random-number block (fixed: chunking must not change the data)
+BLOCK_ROWS = 1 << 16
+
+SCENARIOS = {
+    "sunny": {"cloudiness": 0.15},
+    "cloudy": {"cloudiness": 0.6},
+}
+
+
+def site_parameters(sites, seed=0, capacity_kw=None, cloudiness=None, load_base_kw=None):
+    """
+    Per-site parameters: one site keeps the bundled data's scale, fleets are
+    randomised around it. Explicit values override for every site.
+
+    Returns:
+        dict of arrays of length `sites`
+    """
+    rng = np.random.default_rng([seed, 0])
+    if sites == 1:
+        params = {"capacity_kw": np.array([14.0]), "cloudiness": np.array([0.3]),
+                  "load_base_kw": np.array([9.0])}
+    else:
+        params = {
+            "capacity_kw": rng.uniform(5, 20, sites),
+            "cloudiness": rng.uniform(0.1, 0.6, sites),
+            "load_base_kw": rng.uniform(4, 12, sites),
+        }
+    for name, value in (("capacity_kw", capacity_kw), ("cloudiness", cloudiness),
+                        ("load_base_kw", load_base_kw)):
+        if value is not None:
+            params[name] = np.full(sites, float(value))
+    return params
+
+
+def clear_sky_fraction(ts_ns, latitude=DEFAULT_LATITUDE):
+    """
+    Clear-sky output as a fraction of capacity for int64 ns timestamps.
+
+    Uses the cosine of the solar zenith angle (Cooper declination,
+    15 degrees per hour angle), so day length and peak follow the season.
+    """
+    days = ts_ns / 86_400e9
+    doy = (days - np.floor(days / 365.25) * 365.25)
+    hour = (days - np.floor(days)) * 24
+    decl = np.radians(23.45) * np.sin(2 * np.pi * (284 + doy) / 365)
+    hour_angle = np.radians(15 * (hour - 12))
+    lat = np.radians(latitude)
+    cos_zenith = np.sin(lat) * np.sin(decl) + np.cos(lat) * np.cos(decl) * np.cos(hour_angle)
+    return np.clip(cos_zenith, 0, None) ** 1.2
+
+
+def _load_shape(ts_ns):
+    """Relative household load: morning and evening peaks, weekend uplift"""
+    days = ts_ns / 86_400e9
+    hour = (days - np.floor(days)) * 24
+    weekday = (np.floor(days).astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    shape = (0.8
+             + 0.35 * np.exp(-0.5 * ((hour - 8) / 1.5) ** 2)
+             + 0.55 * np.exp(-0.5 * ((hour - 20) / 2.0) ** 2))
+    return shape * np.where(weekday >= 5, 1.1, 1.0)
+
+
+def _random_draws(seed, sites, first, n, block_steps, uniform, cache):
+    """
+    Random numbers for steps [first, first + n), cut from fixed blocks.
+
+    Block b covers steps [b * block_steps, (b + 1) * block_steps) and is
+    drawn from its own stream SeedSequence([seed, 1, b]), so the values of
+    a step do not depend on how the steps are chunked.
+
+    Returns:
+        ((2, sites, n) standard normals, (n, sites) uniforms or None)
+    """
+    normals, uniforms = [], []
+    for block in range(first // block_steps, (first + n - 1) // block_steps + 1):
+        if block not in cache:
+            cache.clear()  # chunks move forward: keep only the current block
+            rng = np.random.default_rng(np.random.SeedSequence([seed, 1, block]))
+            cache[block] = (rng.standard_normal((2, sites, block_steps)),
+                            rng.random((block_steps, sites)) if uniform else None)
+        block_normals, block_uniforms = cache[block]
+        lo = max(first - block * block_steps, 0)
+        hi = min(first + n - block * block_steps, block_steps)
+        normals.append(block_normals[:, :, lo:hi])
+        if uniform:
+            uniforms.append(block_uniforms[lo:hi])
+    return np.concatenate(normals, axis=2), np.concatenate(uniforms) if uniform else None
+
+
+def iter_chunks(start="2026-01-01", periods=24 * 30, freq="h", sites=1, seed=0,
+                latitude=DEFAULT_LATITUDE, gap_rate=0.0, duplicate_rate=0.0,
+                chunk_rows=1_000_000, **site_overrides):
+    """
+    Yield synthetic history chunks as DataFrames.
+
+    Columns: timestamp, solar_power_kw, load_total_kw (+ site_id when sites > 1).
+    Rows are time-major (all sites for one timestamp, then the next).
+
+    Args:
+        start, periods, freq: time grid
+        sites: number of sites
+        seed: base seed; decides the data on its own
+        gap_rate: fraction of readings dropped
+        duplicate_rate: fraction of readings repeated
+        chunk_rows: approximate rows per chunk (memory only, same data)
+        **site_overrides: capacity_kw / cloudiness / load_base_kw for every site
+    """
+    params = site_parameters(sites, seed, **site_overrides)
+    step = pd.tseries.frequencies.to_offset(freq).nanos
+    start_ns = pd.Timestamp(start).as_unit('ns').value
+    per_hour = 3_600e9 / step
+    # Cloud cover decorrelates over ~3 hours whatever the step
+    phi = np.exp(-1 / (3 * per_hour))
+    cloud_state = np.zeros((sites, 1))
+    steps_per_chunk = max(1, chunk_rows // sites)
+    block_steps = max(1, BLOCK_ROWS // sites)
+    site_ids = np.arange(sites)
+    blocks = {}
+
+    for first in range(0, periods, steps_per_chunk):
+        n = min(steps_per_chunk, periods - first)
+        normals, uniforms = _random_draws(seed, sites, first, n, block_steps,
+                                          bool(gap_rate or duplicate_rate), blocks)
+        ts = start_ns + (first + np.arange(n, dtype=np.int64)) * step
+
+        # AR(1) cloud cover per site, state carried across chunks
+        shocks = normals[0] * np.sqrt(1 - phi ** 2)
+        # zi: lfilter state (phi * last cover), carried across chunks as returned
+        cover, cloud_state = lfilter([1.0], [1.0, -phi], shocks, axis=1, zi=cloud_state)
+        attenuation = 1 - params["cloudiness"][:, None] / (1 + np.exp(-2 * cover))
+        solar = (params["capacity_kw"][:, None] * clear_sky_fraction(ts, latitude)
+                 * np.clip(attenuation, 0.05, 1))
+        load = (params["load_base_kw"][:, None] * _load_shape(ts)
+                * (1 + 0.15 * normals[1]))
+
+        frame = {
+            "timestamp": np.repeat(ts, sites).view('datetime64[ns]'),
+            "solar_power_kw": np.round(solar.T.ravel(), 2),
+            "load_total_kw": np.round(np.clip(load, 0.5, None).T.ravel(), 2),
+        }
+        if sites > 1:
+            frame["site_id"] = np.tile(site_ids, n)
+        rows = len(frame["timestamp"])
+
+        # Inject gaps and duplicates: each row appears 0, 1 or 2 times
+        if gap_rate or duplicate_rate:
+            u = uniforms.ravel()
+            counts = np.where(u < gap_rate, 0, np.where(u > 1 - duplicate_rate, 2, 1))
+            frame = {k: np.repeat(v, counts) for k, v in frame.items()}
+        yield pd.DataFrame(frame)
+
+
+def generate(start="2026-01-01", periods=24 * 30, freq="h", sites=1, seed=0, **kwargs):
+    """Whole synthetic history as one DataFrame (see iter_chunks)."""
+    return pd.concat(iter_chunks(start, periods, freq, sites, seed, **kwargs), ignore_index=True)
+
+
+def _csv_lines(chunk):
+    """
+    Format a chunk as CSV text via lookup tables instead of per-value
+    formatting: dates per day, times per time-of-day, and 2-decimal values
+    per distinct cent value.
+    """
+    ts = chunk['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64')
+    day_ns = 86_400 * 10**9
+    days = ts // day_ns
+    first_day = days.min()
+    dates = np.datetime_as_string(
+        (first_day + np.arange(days.max() - first_day + 1)).astype('datetime64[D]')
+    ).astype(object)
+    seconds = (ts - days * day_ns) // 10**9
+    unique_seconds, tod_idx = np.unique(seconds, return_inverse=True)
+    times = np.array([f"{t // 3600:02d}:{t % 3600 // 60:02d}:{t % 60:02d}"
+                      for t in unique_seconds.tolist()], dtype=object)
+
+    columns = [dates[days - first_day], times[tod_idx]]
+    for name in ('solar_power_kw', 'load_total_kw'):
+        cents = np.rint(chunk[name].to_numpy() * 100).astype(np.int64)
+        low = cents.min()
+        table = np.array([str(c / 100) for c in range(low, cents.max() + 1)], dtype=object)
+        columns.append(table[cents - low])
+    if 'site_id' in chunk:
+        columns.append(chunk['site_id'].to_numpy())
+        return "".join(f"{d} {t},{a},{b},{site}\n"
+                       for d, t, a, b, site in zip(*(c.tolist() for c in columns)))
+    return "".join(f"{d} {t},{a},{b}\n" for d, t, a, b in zip(*(c.tolist() for c in columns)))
+
+
+def write_csv(path, chunks):
+    """Stream chunks to one CSV file. Returns rows written."""
+    rows = 0
+    with open(path, 'w', newline='') as f:
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                f.write(",".join(chunk.columns) + "\n")
+            if len(chunk):
+                f.write(_csv_lines(chunk))
+            rows += len(chunk)
+    return rows
+
+
+def write_ring(path, chunks, freq="h", capacity=None):
+    """
+    Stream single-site chunks into a ring buffer store (keeps the newest
+    `capacity` steps). Returns rows written.
+    """
+    from .ring_buffer import RingBuffer
+
+    ring = RingBuffer.create(path, capacity=capacity, freq=freq)
+    rows = 0
+    for chunk in chunks:
+        if "site_id" in chunk:
+            raise ValueError("ring buffer store holds a single site")
+        chunk = chunk.drop_duplicates('timestamp', keep='last')
+        ring.write_many(pd.DatetimeIndex(chunk['timestamp']),
+                        chunk[['solar_power_kw', 'load_total_kw']].to_numpy())
+        rows += len(chunk)
+    ring.flush()
+    return rows
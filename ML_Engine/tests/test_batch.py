@@ -0,0 +1,116 @@
+# tests/test_batch.py
+"""
+Batch Query Unit Tests
+Run: pytest tests/ -v
+"""
+import json
+
+import pytest
+from src import batch
+from src.batch import iter_batch, parse_request
+from src.config import ForecastConfig
+from src.data_utils import load_solar_csv
+from src.forecast_solar import forecast_solar, to_interval_and_unit
+from src.scenarios import discover_scenarios
+from conftest import ML_ENGINE_ROOT
+
+SCENARIOS = discover_scenarios(ML_ENGINE_ROOT / "data")
+DEFAULTS = {"id": None, "weather": "sunny", "method": None, "horizon": 24,
+            "unit": "kw", "interval": "1h", "target": None, "joint": False, "bands": False}
+# Fast, deterministic fits
+CONFIG = ForecastConfig.from_config(forecast_method="profile", blend_ratio=1.0)
+
+
+def lines(*requests):
+    return [json.dumps(r) if isinstance(r, dict) else r for r in requests]
+
+
+@pytest.fixture
+def fit_calls(monkeypatch):
+    """Record every group fit"""
+    calls = []
+    original = batch.fit_group
+
+    def counting(csv_file, config, joint=False, refit=False):
+        calls.append((str(csv_file), config.forecast_method, config.horizon_hours, joint))
+        return original(csv_file, config, joint, refit)
+
+    monkeypatch.setattr(batch, "fit_group", counting)
+    return calls
+
+
+class TestParseRequest:
+    """Tests for request validation"""
+
+    def test_defaults_fill_missing_fields(self):
+        """Omitted fields come from the defaults"""
+        request = parse_request('{"unit": "wh"}', DEFAULTS, SCENARIOS)
+        assert request["unit"] == "wh"
+        assert request["weather"] == "sunny"
+
+    @pytest.mark.parametrize("line", ['{"weather": "rainy"}', '{"unit": "mw"}',
+                                      '{"horizon": 0}', '{"horizon": true}', '{"colour": 1}',
+                                      '[1]', 'not json'])
+    def test_invalid(self, line):
+        """Bad requests raise ValueError"""
+        with pytest.raises(ValueError):
+            parse_request(line, DEFAULTS, SCENARIOS)
+
+
+class TestIterBatch:
+    """Tests for grouped fits and ordered answers"""
+
+    def test_one_fit_per_group(self, fit_calls):
+        """Unit, interval and target variations share one fit"""
+        results = list(iter_batch(lines(
+            {"id": "a"},
+            {"id": "b", "unit": "wh", "interval": "15min"},
+            {"id": "c", "weather": "cloudy"},
+            {"id": "d", "target": "17-01-2026 12:00", "joint": True},
+            {"id": "e", "horizon": 48},
+        ), SCENARIOS, DEFAULTS, CONFIG))
+        assert [request["id"] for _, request, _, _ in results] == ["a", "b", "c", "d", "e"]
+        assert [index for index, *_ in results] == [0, 1, 2, 3, 4]
+        assert len(fit_calls) == 3
+        sunny = [c for c in fit_calls if "sunny" in c[0] and c[2] == 24]
+        assert sunny[0][3] is True  # one joint request makes the group joint
+
+    def test_matches_single_request(self):
+        """Converted group forecast equals a direct forecast_solar call"""
+        (_, request, (hourly, _), error), = iter_batch(
+            lines({"unit": "wh", "interval": "15min"}), SCENARIOS, DEFAULTS, CONFIG)
+        assert error is None
+        got = to_interval_and_unit(hourly, request["interval"], request["unit"])["solar"]
+        df = load_solar_csv(str(SCENARIOS["sunny"]))
+        expected = forecast_solar(df, horizon=24, interval="15min", unit="wh", config=CONFIG)
+        assert got.round(6).tolist() == expected.round(6).tolist()
+
+    def test_group_carries_bands(self):
+        """Group forecasts include solar quantile bands (solar_p10, ...)"""
+        (_, _, (hourly, _), error), = iter_batch(lines({"bands": True}), SCENARIOS, DEFAULTS, CONFIG)
+        assert error is None
+        assert {"solar_p10", "solar_p50", "solar_p90"} <= set(hourly.columns)
+        assert (hourly["solar_p10"] <= hourly["solar_p90"]).all()
+
+    def test_errors_keep_their_slot(self, fit_calls):
+        """Invalid lines are answered in place, blank lines skipped"""
+        results = list(iter_batch(lines({"id": "a"}, "", "{oops", {"id": "x", "unit": "mw"}, {"id": "b"}),
+                                  SCENARIOS, DEFAULTS, CONFIG))
+        assert [(r["id"], e is None) for _, r, _, e in results] == [
+            ("a", True), (None, False), ("x", False), ("b", True)]
+        assert len(fit_calls) == 1
+
+    def test_failed_fit_fails_its_group_only(self, monkeypatch):
+        """A group whose fit raises errors its own requests"""
+        original = batch.fit_group
+
+        def flaky(csv_file, config, joint=False, refit=False):
+            if "cloudy" in str(csv_file):
+                raise RuntimeError("fit failed")
+            return original(csv_file, config, joint, refit)
+
+        monkeypatch.setattr(batch, "fit_group", flaky)
+        results = list(iter_batch(lines({"id": "a"}, {"id": "b", "weather": "cloudy"}),
+                                  SCENARIOS, DEFAULTS, CONFIG))
+        assert results[0][3] is None
+        assert isinstance(results[1][3], RuntimeError)
@@ -0,0 +1,61 @@
+# tests/test_config.py
+"""
+Forecast Config Unit Tests
+Run: pytest tests/ -v
+"""
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.config import CONFIG, ForecastConfig
+from src.forecast_cache import cache_key
+from src.forecast_solar import forecast_solar
+
+
+class TestForecastConfig:
+    """Tests for the immutable per-request config"""
+
+    def test_snapshot_of_config(self, monkeypatch):
+        """from_config reads CONFIG at call time, None overrides are ignored"""
+        monkeypatch.setitem(CONFIG, "horizon_hours", 12)
+        config = ForecastConfig.from_config(forecast_method=None, blend_ratio=0.5)
+        assert config.horizon_hours == 12
+        assert config.forecast_method == CONFIG["forecast_method"]
+        assert config.blend_ratio == 0.5
+
+    def test_immutable_and_hashable(self):
+        """Configs are frozen, hashable and equal by value"""
+        config = ForecastConfig.from_config(ensemble_member_timeouts={"arima": 5},
+                                            arima_order=[1, 0, 0])
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.horizon_hours = 1
+        assert config.arima_order == (1, 0, 0)
+        assert config.member_timeout("arima") == 5
+        assert {config: 1}[ForecastConfig.from_config(ensemble_member_timeouts={"arima": 5},
+                                                      arima_order=(1, 0, 0))] == 1
+
+    def test_cache_key_covers_config(self):
+        """Different settings never share a cache entry"""
+        config = ForecastConfig.from_config()
+        assert cache_key(config) == cache_key(ForecastConfig.from_config())
+        assert cache_key(config) != cache_key(config.replace(blend_ratio=0.5))
+
+    def test_fit_settings_in_digest(self):
+        """Fit budget, warm start and profile half-life are part of the config"""
+        config = ForecastConfig.from_config()
+        assert config.warm_start == CONFIG["warm_start"]
+        for field, value in (("fit_budget_s", 5), ("warm_start", False),
+                             ("warm_start_maxiter", 5), ("profile_halflife_days", 7)):
+            assert config.replace(**{field: value}).digest() != config.digest()
+
+    def test_concurrent_requests(self, sunny_data):
+        """Requests with different configs in threads match sequential runs"""
+        configs = [ForecastConfig.from_config(forecast_method="profile", horizon_hours=h,
+                                              blend_ratio=r)
+                   for h, r in ((12, 1.0), (24, 0.5), (36, 0.2))]
+        expected = [forecast_solar(sunny_data, config=c) for c in configs]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(lambda c: forecast_solar(sunny_data, config=c), configs))
+        for got, want, config in zip(results, expected, configs):
+            assert len(got) == config.horizon_hours
+            assert got.to_numpy() == pytest.approx(want.to_numpy())
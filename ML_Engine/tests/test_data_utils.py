@@ -0,0 +1,130 @@
+# tests/test_data_utils.py
+"""
+Data Utility Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_utils import (bucket_aggregate, cache_path, load_regular_history, lttb_indices,
+                            query_history, regularize_series)
+
+
+def make_history(hours=72):
+    """Hourly history with a simple diurnal solar curve"""
+    ts = pd.date_range("2026-01-01", periods=hours, freq="h")
+    solar = np.clip(np.sin((ts.hour - 6) / 12 * np.pi), 0, None) * 5
+    return pd.DataFrame({"timestamp": ts, "solar_power_kw": solar, "load_total_kw": 6.0})
+
+
+class TestRegularize:
+    """Tests for grid regularisation and gap repair"""
+
+    def test_clean_input_unchanged(self):
+        """A regular, ordered series passes straight through"""
+        df = make_history()
+        regular, stats = regularize_series(df)
+        assert len(regular) == len(df)
+        assert stats["missing_steps"] == stats["duplicates"] == stats["out_of_order"] == 0
+        assert np.allclose(regular["solar_power_kw"], df["solar_power_kw"])
+
+    def test_duplicates_and_order(self):
+        """Out-of-order rows are sorted; the last duplicate wins"""
+        df = make_history()
+        late = df.iloc[[30]].assign(solar_power_kw=9.0)
+        shuffled = pd.concat([df.iloc[::-1], late])
+        regular, stats = regularize_series(shuffled)
+        assert stats["duplicates"] == 1
+        assert stats["out_of_order"] > 0
+        assert regular.index.is_monotonic_increasing
+        assert regular["solar_power_kw"].iloc[30] == 9.0
+
+    def test_short_gap_seasonal_fill(self):
+        """Short gaps take the same hour from neighbouring days"""
+        df = make_history()
+        regular, stats = regularize_series(df.drop(index=[34, 35]))
+        assert stats["missing_steps"] == 2
+        assert stats["filled_values"] == 4
+        assert len(regular) == 72
+        assert np.allclose(regular["solar_power_kw"].iloc[34:36], df["solar_power_kw"].iloc[34:36])
+
+    def test_long_gap_left_unfilled(self):
+        """Gaps longer than max_gap stay NaN"""
+        df = make_history()
+        regular, stats = regularize_series(df.drop(index=range(20, 30)), max_gap=6)
+        assert stats["max_gap_steps"] == 10
+        assert regular["solar_power_kw"].iloc[20:30].isna().all()
+
+    def test_grid_anchored_at_whole_steps(self):
+        """Off-hour readings land in the hour they fall in, whatever the first reading"""
+        df = make_history(6)
+        df["timestamp"] = df["timestamp"] + pd.Timedelta(minutes=30)
+        df = df.iloc[1:]  # first reading at 01:30
+        regular, stats = regularize_series(df)
+        assert regular.index[0] == pd.Timestamp("2026-01-01 01:00")
+        assert (regular.index.minute == 0).all()
+        assert stats["off_grid"] == len(df)
+        # :30 readings floor into their own hour, never the next one
+        assert np.allclose(regular["solar_power_kw"], df["solar_power_kw"])
+
+
+class TestRegularCache:
+    """Tests for the persisted repaired series"""
+
+    def test_cache_reused_and_invalidated(self, tmp_path):
+        """Cache is written once and rebuilt when the CSV changes"""
+        csv = tmp_path / "solar_data_test.csv"
+        make_history().drop(index=[10]).to_csv(csv, index=False)
+        first, stats = load_regular_history(str(csv))
+        assert cache_path(str(csv), "regular.npz").exists()
+        cached, cached_stats = load_regular_history(str(csv))
+        assert cached.equals(first) and cached_stats == stats
+
+        make_history().to_csv(csv, index=False)
+        _, fresh_stats = load_regular_history(str(csv))
+        assert fresh_stats["missing_steps"] == 0
+
+
+class TestHistoryQuery:
+    """Tests for downsampled history queries"""
+
+    @pytest.fixture
+    def history_csv(self, tmp_path):
+        csv = tmp_path / "solar_data_query.csv"
+        make_history(24 * 30).to_csv(csv, index=False)
+        return csv
+
+    def test_buckets_bounded(self, history_csv):
+        """Bucket aggregates keep min <= mean <= max and the point budget"""
+        out = query_history(str(history_csv), points=50)
+        assert len(out) == 50 and out.attrs["rows_in"] == 720
+        assert (out["solar_power_kw_min"] <= out["solar_power_kw"]).all()
+        assert (out["solar_power_kw"] <= out["solar_power_kw_max"]).all()
+        assert out["solar_power_kw_max"].max() == pytest.approx(5.0)
+
+    def test_range_slice(self, history_csv):
+        """start / end select the stored rows in range, inclusive"""
+        out = query_history(str(history_csv), "2026-01-02 00:00", "2026-01-02 23:00", points=1000)
+        assert out.attrs["rows_in"] == 24
+        assert out.index[0] == pd.Timestamp("2026-01-02") and len(out) == 24
+
+    def test_bucket_nan_ignored(self):
+        """Gaps do not poison bucket statistics"""
+        stamps = np.arange(4, dtype=np.int64)
+        values = np.array([[1.0], [np.nan], [3.0], [5.0]])
+        _, mins, maxs, means = bucket_aggregate(stamps, values, 2)
+        assert mins[:, 0].tolist() == [1.0, 3.0]
+        assert maxs[:, 0].tolist() == [1.0, 5.0]
+        assert means[:, 0].tolist() == [1.0, 4.0]
+
+    def test_lttb_keeps_peaks(self, history_csv):
+        """LTTB keeps the endpoints and the daily peaks"""
+        x = np.arange(720, dtype=float)
+        y = make_history(720)["solar_power_kw"].to_numpy()
+        idx = lttb_indices(x, y, 90)
+        assert len(idx) == 90 and idx[0] == 0 and idx[-1] == 719
+        assert np.all(np.diff(idx) > 0)
+        assert y[idx].max() == pytest.approx(5.0)
+        out = query_history(str(history_csv), points=90, method="lttb")
+        assert len(out) == 90
+        assert list(out.columns) == ["solar_power_kw", "load_total_kw"]
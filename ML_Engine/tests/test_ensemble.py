@@ -0,0 +1,105 @@
+# tests/test_ensemble.py
+"""
+Ensemble Unit Tests
+Run: pytest tests/ -v
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+from src.config import CONFIG
+from src.ensemble import (backtest_errors, combine, ensemble_forecast, learn_weights,
+                          load_weights, save_weights)
+from src.forecast_solar import (FORECAST_METHODS, forecast_solar, persistence_forecast,
+                                profile_forecast)
+
+
+def slow_member(historical_df, horizon, column):
+    time.sleep(2)
+    return persistence_forecast(historical_df, horizon, column)
+
+
+def failing_member(historical_df, horizon, column):
+    raise RuntimeError("no fit")
+
+
+@pytest.fixture
+def fast_members(monkeypatch):
+    """Ensemble of cheap members so tests do not fit ARIMA"""
+    monkeypatch.setitem(CONFIG, "ensemble_members", ("persistence", "slow", "broken"))
+    monkeypatch.setitem(FORECAST_METHODS, "slow", slow_member)
+    monkeypatch.setitem(FORECAST_METHODS, "broken", failing_member)
+    monkeypatch.setitem(CONFIG, "ensemble_member_timeouts", {"slow": 0.2})
+
+
+class TestEnsemble:
+    """Tests for concurrent members, dropping and learned weights"""
+
+    def test_prior_matches_blend_ratio(self, sunny_data):
+        """Without learned weights the blend is blend_ratio / remainder"""
+        calls = {"profile": profile_forecast, "persistence": persistence_forecast}
+        pred = ensemble_forecast(calls, sunny_data, 24)
+        expected = (CONFIG["blend_ratio"] * profile_forecast(sunny_data, 24)
+                    + (1 - CONFIG["blend_ratio"]) * persistence_forecast(sunny_data, 24))
+        assert pred.to_numpy() == pytest.approx(expected.to_numpy())
+
+    def test_slow_and_failing_members_dropped(self, sunny_data, fast_members):
+        """Timed-out and failing members are dropped without stalling"""
+        started = time.monotonic()
+        pred = forecast_solar(sunny_data, method="profile", horizon=24)
+        assert time.monotonic() - started < 1.5
+        info = pred.attrs["ensemble"]
+        assert info["members"] == ["profile", "persistence"]
+        assert set(info["dropped"]) == {"slow", "broken"}
+
+    def test_members_run_in_daemon_threads(self, sunny_data):
+        """A timed-out member cannot hold the interpreter open at exit"""
+        seen = []
+
+        def member(historical_df, horizon, column):
+            seen.append(threading.current_thread().daemon)
+            return persistence_forecast(historical_df, horizon, column)
+
+        ensemble_forecast({"profile": profile_forecast, "watched": member}, sunny_data, 24)
+        assert seen == [True]
+
+    def test_combine_renormalises(self):
+        """Weights of missing members are redistributed per step"""
+        import pandas as pd
+        a = pd.Series([1.0, 1.0])
+        b = pd.Series([3.0, 3.0])
+        weights = {"a": np.array([0.2, 0.0]), "b": np.array([0.2, 0.0]), "c": np.array([0.6, 1.0])}
+        pred = combine({"a": a, "b": b}, weights)
+        assert pred.tolist() == pytest.approx([2.0, 2.0])
+
+    def test_learned_weights_used(self, sunny_data):
+        """Stored per-step weights replace the prior"""
+        save_weights("solar_power_kw", {"profile": np.zeros(24), "persistence": np.ones(24)})
+        assert load_weights("solar_power_kw")["persistence"] == [1.0] * 24
+        calls = {"profile": profile_forecast, "persistence": persistence_forecast}
+        pred = ensemble_forecast(calls, sunny_data, 48)
+        assert pred.to_numpy() == pytest.approx(persistence_forecast(sunny_data, 48).to_numpy())
+
+    def test_learned_weights_keyed_by_site_and_scenario(self, sunny_data):
+        """Weights learned for one registry key do not blend another's forecast"""
+        save_weights("solar_power_kw", {"profile": np.zeros(24), "persistence": np.ones(24)},
+                     ("site-a", "sunny"))
+        assert load_weights("solar_power_kw", ("site-a", "sunny"))["persistence"] == [1.0] * 24
+        assert load_weights("solar_power_kw", ("site-b", "sunny")) is None
+        assert load_weights("solar_power_kw") is None
+        calls = {"profile": profile_forecast, "persistence": persistence_forecast}
+        keyed = ensemble_forecast(calls, sunny_data, 24, model_key=("site-a", "sunny"))
+        assert keyed.to_numpy() == pytest.approx(persistence_forecast(sunny_data, 24).to_numpy())
+        other = ensemble_forecast(calls, sunny_data, 24, model_key=("site-a", "cloudy"))
+        assert other.to_numpy() != pytest.approx(keyed.to_numpy())
+
+    def test_backtest_and_learn(self, sunny_data):
+        """Lower backtest error gives the larger weight at each step"""
+        calls = {"profile": profile_forecast, "persistence": persistence_forecast}
+        errors = backtest_errors(calls, sunny_data, horizon=24, folds=2, min_train=96)
+        assert errors["profile"].shape == (2, 24)
+        weights = learn_weights(errors)
+        assert (weights["profile"] + weights["persistence"]) == pytest.approx(np.ones(24))
+        better = errors["profile"].mean(axis=0) < errors["persistence"].mean(axis=0)
+        assert np.all(weights["profile"][better] > 0.5)
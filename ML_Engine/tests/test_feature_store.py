@@ -0,0 +1,172 @@
+# tests/test_feature_store.py
+"""
+Feature Store Unit Tests
+Run: pytest tests/ -v
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from src.data_utils import append_new_reading, load_solar_csv, regularize_series
+from src.feature_store import (FEATURE_COLUMNS, FeatureStore, build_feature_matrix,
+                               feature_store_exists, features_for, get_feature_store)
+from src.forecast_solar import FORECAST_METHODS, regression_forecast
+
+
+def write_history(path, hours=400):
+    ts = pd.date_range("2026-01-01", periods=hours, freq="h")
+    solar = np.clip(np.sin((ts.hour - 6) / 12 * np.pi), 0, None) * 8
+    pd.DataFrame({"timestamp": ts, "solar_power_kw": solar.round(3),
+                  "load_total_kw": 5.0}).to_csv(path, index=False)
+
+
+def stamps_of(index):
+    return index.to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+class TestBuildFeatureMatrix:
+    """Tests for the vectorised feature build"""
+
+    def test_matches_pandas(self):
+        """Calendar, lags and rolling stats agree with pandas"""
+        index = pd.date_range("2026-01-01", periods=400, freq="h")
+        rng = np.random.default_rng(0)
+        values = rng.random((400, 2))
+        values[50, 0] = np.nan
+        m = build_feature_matrix(stamps_of(index), values)
+        col = FEATURE_COLUMNS.index
+        solar = pd.Series(values[:, 0])
+
+        assert m.flags['C_CONTIGUOUS'] and m.shape == (400, len(FEATURE_COLUMNS))
+        np.testing.assert_array_equal(m[:, col('hour_of_day')], index.hour)
+        np.testing.assert_array_equal(m[:, col('day_of_week')], index.dayofweek)
+        np.testing.assert_array_equal(m[:, col('solar_power_kw_lag24')], solar.shift(24))
+        np.testing.assert_array_equal(m[:, col('solar_power_kw_lag168')], solar.shift(168))
+        rolling = solar.rolling(24, min_periods=1)
+        np.testing.assert_allclose(m[:, col('solar_power_kw_mean24')], rolling.mean())
+        np.testing.assert_allclose(m[:, col('solar_power_kw_std24')], rolling.std(ddof=0), atol=1e-6)
+
+
+class TestFeatureStore:
+    """Tests for incremental maintenance and zero-copy reads"""
+
+    def test_append_matches_rebuild(self, tmp_path):
+        """One upserted row equals the rows of a full rebuild"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = FeatureStore(csv)
+        assert len(store) == 400
+
+        append_new_reading(str(csv), "2026-01-17 16:00", 3.5, 6.0)
+        store.upsert("2026-01-17 16:00", 3.5, 6.0)
+        assert len(store) == 401
+        rebuilt = build_feature_matrix(store.matrix[:, 0].astype(np.int64) * 10**9, store.matrix[:, 1:3])
+        np.testing.assert_allclose(store.matrix, rebuilt, equal_nan=True)
+
+    def test_late_reading_rewrites_dependants(self, tmp_path):
+        """A late reading updates its row and the lags / rolling windows it feeds"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = FeatureStore(csv)
+        row = store.upsert("2026-01-05 12:00", 0.0, 5.0)
+        col = FEATURE_COLUMNS.index
+        assert store.matrix[row, col('solar_power_kw')] == 0.0
+        assert store.matrix[row + 24, col('solar_power_kw_lag24')] == 0.0
+        assert store.matrix[row + 168, col('solar_power_kw_lag168')] == 0.0
+        rebuilt = build_feature_matrix(store.matrix[:, 0].astype(np.int64) * 10**9, store.matrix[:, 1:3])
+        np.testing.assert_allclose(store.matrix, rebuilt, equal_nan=True)
+
+    def test_subhourly_readings_average_into_hour(self, tmp_path):
+        """15-minute readings are floored into their hour and averaged like regularize_series"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = get_feature_store(csv)
+        readings = [("2026-01-17 16:00", 4.0), ("2026-01-17 16:15", 3.0),
+                    ("2026-01-17 16:30", 2.0), ("2026-01-17 16:45", 1.0),
+                    ("2026-01-17 17:00", 0.5)]
+        for stamp, solar in readings:
+            append_new_reading(str(csv), stamp, solar, 6.0)
+        assert len(store) == 402
+        expected, _ = regularize_series(pd.read_csv(csv, parse_dates=["timestamp"]).tail(8), max_gap=0)
+        solar = store.frame(2)['solar_power_kw']
+        np.testing.assert_allclose(solar.to_numpy(), [2.5, 0.5])
+        np.testing.assert_allclose(solar.to_numpy(), expected['solar_power_kw'].tail(2).to_numpy())
+
+    def test_persisted_rows_reload(self, tmp_path):
+        """Upserted rows are on disk for the next process"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = FeatureStore(csv)
+        store.upsert("2026-01-17 16:00", 3.5, 6.0)
+        np.testing.assert_array_equal(FeatureStore(csv).matrix, store.matrix)
+
+    def test_touched_history_not_stale(self, tmp_path, monkeypatch):
+        """A newer CSV mtime alone does not force a rebuild"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = FeatureStore(csv)
+        store.upsert("2026-01-17 16:00", 3.5, 6.0)
+        append_new_reading(str(csv), "2026-01-17 16:00", 3.5, 6.0)
+        later = os.stat(store.path).st_mtime + 60
+        os.utime(csv, (later, later))
+
+        def no_rebuild(self):
+            raise AssertionError("rebuilt")
+
+        monkeypatch.setattr(FeatureStore, "rebuild", no_rebuild)
+        assert len(FeatureStore(csv)) == 401
+
+    def test_external_write_rebuilds(self, tmp_path):
+        """Readings stored without append_new_reading are picked up on load"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        assert len(FeatureStore(csv)) == 400
+        with open(csv, "a") as f:
+            f.write("2026-01-17 16:00:00,3.5,6.0\n")
+        store = FeatureStore(csv)
+        assert len(store) == 401
+        assert store.matrix[-1, FEATURE_COLUMNS.index('solar_power_kw')] == 3.5
+
+    def test_views_are_zero_copy(self, tmp_path):
+        """window / column / frame share the store's memory"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        store = FeatureStore(csv)
+        assert np.shares_memory(store.window(168), store.matrix)
+        assert np.shares_memory(store.column('solar_power_kw_lag24'), store.matrix)
+        frame = store.frame(24)
+        assert len(frame) == 24
+        assert np.shares_memory(frame['hour_of_day'].to_numpy(), store.matrix)
+
+    def test_ingest_extends_store(self, tmp_path):
+        """Ingesting a reading appends one feature row"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        assert not feature_store_exists(csv)
+        store = get_feature_store(csv)
+        rows = len(store)
+        append_new_reading(str(csv), "2026-01-17 16:00", 3.5, 6.0)
+        assert len(store) == rows + 1
+        assert store.matrix[-1, FEATURE_COLUMNS.index('solar_power_kw')] == 3.5
+
+
+class TestRegressionForecast:
+    """Tests for the feature-based forecast member"""
+
+    def test_uses_store_view(self, tmp_path):
+        """Training features for a loaded window come from the store"""
+        csv = tmp_path / "site.csv"
+        write_history(csv)
+        df = load_solar_csv(str(csv))
+        view = features_for(df, extra_rows=168)
+        assert np.shares_memory(view, get_feature_store(csv).matrix)
+        assert len(view) == len(df) + 168
+
+    def test_forecast(self, sunny_data):
+        """Hourly forecast with the diurnal shape"""
+        assert "regression" in FORECAST_METHODS
+        pred = regression_forecast(sunny_data, 48)
+        assert len(pred) == 48
+        assert not pred.isna().any()
+        assert pred.index[0] == sunny_data.index[-1] + pd.Timedelta(hours=1)
+        assert pred.max() > 1.0
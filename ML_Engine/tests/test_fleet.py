@@ -0,0 +1,84 @@
+# tests/test_fleet.py
+"""
+Fleet Mode Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.config import ForecastConfig
+from src.fleet import compare_with_per_site, diurnal_signatures, fleet_forecast, kmeans, medoids
+from src.metrics import FIT_TOTAL
+from src.model_registry import load_params
+
+# Small orders keep the per-cluster / per-site fits fast
+FAST = ForecastConfig.from_config(arima_order=(1, 0, 0), arima_seasonal=(0, 0, 0, 0))
+
+
+class TestSignatures:
+    """Tests for the diurnal signature and clustering"""
+
+    def test_load_fleet_csv(self, fleet_history):
+        """One hourly column per site"""
+        assert fleet_history.shape == (8 * 24, 10)
+        assert (np.diff(fleet_history.index) == pd.Timedelta("1h")).all()
+
+    def test_signatures_scale_free(self):
+        """Same shape at any capacity gives the same signature"""
+        shape = np.clip(np.sin((np.arange(48) % 24 - 6) / 12 * np.pi), 0, None)
+        values = np.column_stack([3 * shape, 30 * shape])
+        signatures = diurnal_signatures(values)
+        assert signatures.shape == (2, 24)
+        np.testing.assert_allclose(signatures[0], signatures[1])
+        assert signatures.max() == 1
+
+    def test_kmeans_separates_groups(self):
+        """Two well separated groups get two labels and medoids from each"""
+        rng = np.random.default_rng(0)
+        points = np.vstack([rng.normal(0, 0.01, (5, 3)), rng.normal(1, 0.01, (5, 3))])
+        labels, centroids = kmeans(points, 2)
+        assert len(set(labels[:5])) == 1 and len(set(labels[5:])) == 1
+        assert labels[0] != labels[5]
+        centres = medoids(points, labels, centroids)
+        assert sorted(labels[centres].tolist()) == [0, 1]
+
+    def test_more_clusters_than_sites(self):
+        """k is capped at the number of points"""
+        labels, centroids = kmeans(np.eye(3), 10)
+        assert len(centroids) == 3
+
+
+class TestFleetForecast:
+    """Tests for shared parameters per cluster"""
+
+    def test_one_fit_per_cluster(self, fleet_history):
+        """Fits scale with clusters, filter passes with sites"""
+        fits, filters = FIT_TOTAL.value(mode="fit"), FIT_TOTAL.value(mode="filter")
+        forecast, info = fleet_forecast(fleet_history, 24, clusters=2, config=FAST)
+        assert FIT_TOTAL.value(mode="fit") - fits == info["clusters"] <= 2
+        assert FIT_TOTAL.value(mode="filter") - filters == 10
+        assert forecast.shape == (24, 10)
+        assert (forecast >= 0).all().all()
+        assert forecast.index[0] == fleet_history.index[-1] + pd.Timedelta(hours=1)
+
+    def test_cluster_params_in_registry(self, fleet_history):
+        """Cluster parameters are stored with their members"""
+        _, info = fleet_forecast(fleet_history, 24, clusters=2, fleet="fleet-test", config=FAST)
+        entry = load_params("fleet-test", "cluster-0")
+        assert entry["medoid"] in entry["members"]
+        assert entry["medoid"] == info["medoids"][0]
+
+    def test_fit_window_and_budget(self, fleet_history):
+        """Cluster fits use the newest fit_window_days and stop at the fit budget"""
+        config = FAST.replace(fit_window_days=3, fit_budget_s=1e-9)
+        fleet_forecast(fleet_history, 24, clusters=1, fleet="fleet-bounded", config=config)
+        entry = load_params("fleet-bounded", "cluster-0")
+        assert entry["nobs"] == 3 * 24
+        assert entry["budget_exceeded"] and entry["converged"] is False
+
+    def test_compare_report(self, fleet_history):
+        """Backtest reports both RMSEs and their difference"""
+        report = compare_with_per_site(fleet_history, 24, clusters=2, sample=3, config=FAST)
+        assert report["sampled_sites"] == 3
+        assert report["rmse_diff_kw"] == pytest.approx(
+            report["rmse_cluster_kw"] - report["rmse_per_site_kw"], abs=1e-3)
@@ -4,7 +4,7 @@ Solar Forecast Unit Tests
 Run: pytest tests/ -v
 """
 import pytest
-from src.forecast_solar import forecast_solar
+from src.forecast_solar import forecast_solar, forecast_multi
 from src.config import CONFIG
 
 
@@ -74,6 +74,57 @@ class TestWeatherScenarios:
         assert cloudy_forecast.mean() <= sunny_forecast.mean() * 1.2
 
 
+class TestAllScenarios:
+    """Tests for multi-scenario forecasting in one process"""
+    
+    def test_discovers_data_files(self):
+        """Every solar_data_<name>.csv is a scenario"""
+        from conftest import ML_ENGINE_ROOT
+        from src.scenarios import discover_scenarios
+        scenarios = discover_scenarios(ML_ENGINE_ROOT / "data")
+        assert {"sunny", "cloudy"} <= set(scenarios)
+    
+    def test_matches_single_scenario(self, sunny_data):
+        """Concurrent results equal a single-scenario forecast"""
+        from conftest import ML_ENGINE_ROOT
+        from src.scenarios import discover_scenarios, forecast_scenarios
+        scenarios = discover_scenarios(ML_ENGINE_ROOT / "data")
+        results = forecast_scenarios(scenarios, method="persistence", horizon=24)
+        assert list(results) == list(scenarios)
+        forecast, info = results["sunny"]
+        assert forecast.equals(forecast_solar(sunny_data, method="persistence", horizon=24))
+        assert "data_range" in info
+    
+    def test_scenario_bands(self, sunny_data):
+        """With quantiles every scenario carries its bands (--weather all --bands)"""
+        from conftest import ML_ENGINE_ROOT
+        from src.scenarios import discover_scenarios, iter_scenario_forecasts
+        scenarios = discover_scenarios(ML_ENGINE_ROOT / "data")
+        quantiles = CONFIG["forecast_quantiles"]
+        results = {name: forecast for name, forecast, _ in iter_scenario_forecasts(
+            scenarios, method="persistence", horizon=24, quantiles=quantiles)}
+        assert set(results) == set(scenarios)
+        expected = forecast_solar(sunny_data, method="persistence", horizon=24, quantiles=quantiles)
+        assert results["sunny"].equals(expected)
+        assert list(expected.columns) == ["forecast", "p10", "p50", "p90"]
+    
+    def test_scenario_refit(self):
+        """refit reaches each scenario's fit (--weather all --refit)"""
+        import json
+        from conftest import ML_ENGINE_ROOT
+        from src.model_registry import load_params, model_key_for, registry_dir
+        from src.scenarios import _forecast_scenario
+        path = ML_ENGINE_ROOT / "data" / "solar_data_sunny.csv"
+        key = model_key_for(path)
+        _forecast_scenario(path, "arima", 24, "1h", "kw", None)
+        stored = registry_dir() / key[0] / key[1] / "solar_power_kw-v1.json"
+        stored.write_text(json.dumps({**json.loads(stored.read_text()), "converged": True}))
+        _forecast_scenario(path, "arima", 24, "1h", "kw", None)
+        assert load_params(*key)["version"] == 1
+        _forecast_scenario(path, "arima", 24, "1h", "kw", None, refit=True)
+        assert load_params(*key)["version"] == 2
+
+
 class TestHorizon:
     """Tests for different forecast horizons"""
     
@@ -86,4 +137,21 @@ class TestHorizon:
         assert len(forecast_48h) == 48
 
 
+class TestJointForecast:
+    """Tests for joint solar + load forecasting"""
+    
+    def test_aligned_columns(self, sunny_data):
+        """Solar, load and net share one index"""
+        frame = forecast_multi(sunny_data, method="persistence", horizon=24)
+        assert list(frame.columns) == ["solar", "load", "net"]
+        assert len(frame) == 24
+        assert (frame["net"] == frame["solar"] - frame["load"]).all()
+    
+    def test_solar_matches_single_forecast(self, sunny_data):
+        """Joint solar column equals the single-column forecast"""
+        frame = forecast_multi(sunny_data, method="persistence", interval="15min", unit="wh")
+        single = forecast_solar(sunny_data, method="persistence", interval="15min", unit="wh")
+        assert frame["solar"].equals(single)
+
+
 # Run: pytest tests/ -v --tb=short
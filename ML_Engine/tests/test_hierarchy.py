@@ -0,0 +1,104 @@
+# tests/test_hierarchy.py
+"""
+Portfolio Forecast Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.config import ForecastConfig
+from src.hierarchy import group_name, portfolio_forecast, reconcile, site_groups, summing_matrix
+from src.model_registry import load_params
+
+# Fast, deterministic aggregate fits
+FAST = ForecastConfig.from_config(forecast_method="profile", blend_ratio=1.0)
+
+
+class TestReconcile:
+    """Tests for the summing matrix and the projection"""
+
+    def test_summing_matrix(self):
+        """Total row, then one row per group"""
+        A = summing_matrix(4, [0, 1, 1, 0])
+        assert A.tolist() == [[1, 1, 1, 1], [1, 0, 0, 1], [0, 1, 1, 0]]
+        assert summing_matrix(3).tolist() == [[1, 1, 1]]
+
+    def test_coherent_and_matches_dense_gls(self):
+        """Closed form equals the explicit GLS projection, per step"""
+        rng = np.random.default_rng(0)
+        A = summing_matrix(5, [0, 0, 1, 1, 1])
+        aggregate, bottom = rng.uniform(0, 10, (3, 3)), rng.uniform(0, 3, (3, 5))
+        var_a, var_b = rng.uniform(0.5, 2, (3, 3)), rng.uniform(0.5, 2, (3, 5))
+        got = reconcile(aggregate, bottom, A, var_a, var_b)
+        S = np.vstack([A, np.eye(5)])
+        for t in range(3):
+            W = np.diag(1 / np.concatenate([var_a[t], var_b[t]]))
+            y = np.concatenate([aggregate[t], bottom[t]])
+            expected = np.linalg.solve(S.T @ W @ S, S.T @ W @ y)
+            np.testing.assert_allclose(got[t], expected, rtol=1e-9)
+
+    def test_coherent_input_unchanged(self):
+        """Base forecasts that already add up are kept"""
+        A = summing_matrix(3, [0, 0, 1])
+        bottom = np.array([[1.0, 2.0, 3.0]])
+        got = reconcile(bottom @ A.T, bottom, A, np.ones((1, 3)), np.ones((1, 3)))
+        np.testing.assert_allclose(got, bottom)
+
+    def test_gap_goes_to_uncertain_sites(self):
+        """The aggregate's correction lands on the high-variance site"""
+        A = summing_matrix(2)
+        got = reconcile(np.array([[4.0]]), np.array([[1.0, 1.0]]), A,
+                        np.array([[1e-9]]), np.array([[1e-3, 1.0]]))
+        assert got.sum() == pytest.approx(4.0, abs=1e-3)
+        assert got[0, 0] == pytest.approx(1.0, abs=0.01)
+
+
+class TestPortfolioForecast:
+    """Tests for end-to-end portfolio forecasts"""
+
+    def test_levels_add_up(self, fleet_history):
+        """Total = sum of groups = sum of sites"""
+        levels, sites, info = portfolio_forecast(fleet_history, 24, groups=3, config=FAST)
+        assert list(levels.columns) == ["total"] + info["groups"]
+        assert sites.shape == (24, 10) and (sites.to_numpy() >= 0).all()
+        np.testing.assert_allclose(levels["total"], sites.sum(axis=1), atol=1e-9)
+        np.testing.assert_allclose(levels["total"], levels[info["groups"]].sum(axis=1), atol=1e-9)
+        assert info["fits"] == 1 + len(info["groups"])
+
+    def test_aggregate_models_in_registry(self, fleet_history):
+        """Aggregate fits are stored under (portfolio, node)"""
+        config = FAST.replace(forecast_method="arima", arima_order=(1, 0, 0),
+                              arima_seasonal=(0, 0, 0, 0))
+        portfolio_forecast(fleet_history, 24, groups=0, portfolio="pf", config=config)
+        assert load_params("pf", "total", "solar_power_kw") is not None
+
+    def test_named_groups(self, fleet_history):
+        """A site -> group mapping defines the groups"""
+        mapping = {site: "east" if i < 4 else "west" for i, site in enumerate(fleet_history.columns)}
+        levels, _, info = portfolio_forecast(fleet_history, 24, groups=mapping, config=FAST)
+        assert info["groups"] == ["east", "west"]
+        with pytest.raises(ValueError):
+            site_groups(fleet_history, dict(list(mapping.items())[:3]))
+
+    def test_group_names_follow_members(self, fleet_history):
+        """Clustered groups are named by their sites, not the k-means numbering"""
+        labels, names = site_groups(fleet_history, 3)
+        for g, name in enumerate(names):
+            assert name == group_name(fleet_history.columns[labels == g])
+        assert group_name(["b", "a"]) == group_name(["a", "b"]) != group_name(["a", "c"])
+
+    def test_supplied_site_forecasts(self, fleet_history):
+        """Caller-supplied site base forecasts are reconciled"""
+        index = pd.date_range(fleet_history.index[-1] + pd.Timedelta(hours=1), periods=24, freq="h")
+        supplied = pd.DataFrame(1.0, index=index, columns=fleet_history.columns)
+        levels, sites, _ = portfolio_forecast(fleet_history, 24, groups=0, site_forecasts=supplied,
+                                              weights="ols", config=FAST)
+        # Equal weights: every site moves by the same share of the gap
+        shift = sites.to_numpy() - 1.0
+        positive = (sites.to_numpy() > 0).all(axis=1)
+        np.testing.assert_allclose(shift[positive], shift[positive][:, :1].repeat(10, axis=1))
+
+    def test_bad_weights(self, fleet_history):
+        """Unknown weighting schemes are rejected"""
+        with pytest.raises(ValueError):
+            portfolio_forecast(fleet_history, 24, weights="magic", config=FAST)
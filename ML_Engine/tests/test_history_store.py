@@ -0,0 +1,94 @@
+# tests/test_history_store.py
+"""
+History Store Unit Tests
+Run: pytest tests/ -v
+"""
+import pandas as pd
+from src.history_store import HistoryStore
+from src.data_utils import load_regular_history
+
+
+def write_history(path, hours=48):
+    ts = pd.date_range("2026-01-01", periods=hours, freq="h")
+    pd.DataFrame({"timestamp": ts, "solar_power_kw": 1.0, "load_total_kw": 5.0}).to_csv(path, index=False)
+
+
+class TestUpsert:
+    """Tests for in-place upserts into the sorted CSV"""
+
+    def test_append_insert_update(self, tmp_path):
+        """New, late and repeated readings take the right path"""
+        csv = tmp_path / "history.csv"
+        write_history(csv)
+        store = HistoryStore(csv, retention=720, slack=720)
+        assert len(store) == 48
+        assert store.upsert("2026-01-03 00:00", 2.0, 6.0) == "appended"
+        assert store.upsert("2026-01-01 05:00", 3.0, 6.0) == "updated"
+        assert store.upsert("2026-01-03 05:00", 4.0, 6.0) == "appended"
+        assert store.upsert("2026-01-03 02:00", 5.0, 6.0) == "inserted"
+        assert store.upsert("2025-12-31 23:00", 6.0, 6.0) == "inserted"
+
+        frame = store.frame()
+        assert frame.index.is_monotonic_increasing
+        assert len(frame) == 52
+        assert frame.loc["2026-01-01 05:00", "solar_power_kw"] == 3.0
+        assert frame.loc["2026-01-03 02:00", "solar_power_kw"] == 5.0
+        assert frame.index[0] == pd.Timestamp("2025-12-31 23:00")
+
+    def test_csv_stays_canonical(self, tmp_path):
+        """The CSV on disk is sorted with one row per timestamp after any upserts"""
+        csv = tmp_path / "history.csv"
+        write_history(csv)
+        store = HistoryStore(csv)
+        for stamp in ["2026-01-01 05:00", "2026-01-03 01:00", "2026-01-03 00:00",
+                      "2026-01-03 01:00", "2026-01-02 23:00"]:
+            store.upsert(stamp, 3.0, 6.0)
+
+        raw = pd.read_csv(csv, parse_dates=["timestamp"])
+        assert raw["timestamp"].is_monotonic_increasing
+        assert not raw["timestamp"].duplicated().any()
+        assert len(raw) == 50
+        regular, stats = load_regular_history(str(csv))
+        assert stats["duplicates"] == stats["out_of_order"] == 0
+        assert regular[["solar_power_kw", "load_total_kw"]].equals(store.frame())
+
+    def test_file_without_trailing_newline(self, tmp_path):
+        """A hand-edited file missing its last newline still upserts cleanly"""
+        csv = tmp_path / "history.csv"
+        write_history(csv, hours=3)
+        csv.write_text(csv.read_text().rstrip("\n"))
+        store = HistoryStore(csv)
+        assert store.upsert("2026-01-01 01:00", 9.0, 6.0) == "updated"
+        assert store.upsert("2026-01-01 03:00", 9.0, 6.0) == "appended"
+        assert len(pd.read_csv(csv)) == 4
+
+    def test_new_file(self, tmp_path):
+        """The first reading creates the file with its header"""
+        csv = tmp_path / "history.csv"
+        store = HistoryStore(csv)
+        assert store.upsert("2026-01-01 00:00", 1.0, 5.0) == "appended"
+        assert store.upsert("2026-01-01 01:00", 1.0, 5.0) == "appended"
+        assert list(pd.read_csv(csv).columns) == ["timestamp", "solar_power_kw", "load_total_kw"]
+
+    def test_retention_trim_and_compaction(self, tmp_path):
+        """The head is trimmed to the retention window once the file outgrows it"""
+        csv = tmp_path / "history.csv"
+        write_history(csv, hours=24)
+        store = HistoryStore(csv, retention=24, slack=6)
+        for hour in range(24, 40):
+            store.upsert(pd.Timestamp("2026-01-01") + pd.Timedelta(hours=hour), 1.0, 5.0)
+        assert len(store) == 24
+        assert store.frame().index[0] == pd.Timestamp("2026-01-01") + pd.Timedelta(hours=16)
+        assert len(pd.read_csv(csv)) < 24 + 6 + 1
+
+    def test_compaction_counts_rows_not_last_line(self, tmp_path):
+        """A short reading after long rows does not trigger an early trim"""
+        csv = tmp_path / "history.csv"
+        store = HistoryStore(csv, retention=10, slack=5)
+        for hour in range(13):
+            store.upsert(pd.Timestamp("2026-01-01") + pd.Timedelta(hours=hour), 1.234567891, 5.123456789)
+        store.upsert("2026-01-01 13:00", 0.0, 5.0)
+        assert len(pd.read_csv(csv)) == 14
+        store.upsert("2026-01-01 14:00", 0.0, 5.0)
+        store.upsert("2026-01-01 15:00", 0.0, 5.0)
+        assert len(pd.read_csv(csv)) == 10
@@ -0,0 +1,93 @@
+# tests/test_intervals.py
+"""
+Prediction Interval Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import ForecastConfig
+from src.ensemble import combine
+from src.forecast_solar import (arima_forecast, forecast_multi, forecast_solar, quantile_bands,
+                                quantile_label, seasonal_naive_std)
+
+QUANTILES = (0.1, 0.5, 0.9)
+# Fast, deterministic fits
+CONFIG = ForecastConfig.from_config(forecast_method="profile", blend_ratio=1.0)
+
+
+class TestQuantileBands:
+    """Tests for band construction from the forecast std"""
+
+    def test_labels(self):
+        """Quantiles map to pNN column names"""
+        assert [quantile_label(q) for q in (0.1, 0.5, 0.9, 0.025)] == ["p10", "p50", "p90", "p2.5"]
+
+    def test_bands_ordered_and_non_negative(self, sunny_data):
+        """p10 <= p50 <= p90, all >= 0"""
+        bands = forecast_solar(sunny_data, config=CONFIG, quantiles=QUANTILES)
+        assert list(bands.columns) == ["forecast", "p10", "p50", "p90"]
+        assert (bands["p10"] <= bands["p50"]).all() and (bands["p50"] <= bands["p90"]).all()
+        assert (bands.to_numpy() >= 0).all()
+
+    def test_p50_is_point_forecast(self, sunny_data):
+        """The median band and "forecast" equal the plain forecast"""
+        plain = forecast_solar(sunny_data, config=CONFIG)
+        bands = forecast_solar(sunny_data, config=CONFIG, quantiles=QUANTILES)
+        assert np.allclose(bands["forecast"], plain)
+        assert np.allclose(bands["p50"], plain)
+
+    def test_width_from_std(self):
+        """Band half-width is z * std"""
+        pred = pd.Series([5.0, 5.0], index=pd.date_range("2026-01-01", periods=2, freq="h"))
+        pred.attrs["std"] = np.array([1.0, 2.0])
+        bands = quantile_bands(pred, QUANTILES)
+        assert np.allclose(bands["p90"] - bands["p50"], [1.2816, 2.5631], atol=1e-3)
+
+
+class TestPropagation:
+    """Tests for bands through interpolation, units and the blend"""
+
+    def test_wh_conversion_scales_bands(self, sunny_data):
+        """Hourly Wh bands are kW bands x 1000"""
+        kw = forecast_solar(sunny_data, config=CONFIG, quantiles=QUANTILES)
+        wh = forecast_solar(sunny_data, unit="wh", config=CONFIG, quantiles=QUANTILES)
+        assert np.allclose(wh.to_numpy(), kw.to_numpy() * 1000)
+
+    def test_15min_bands_interpolate(self, sunny_data):
+        """15-minute bands keep the hourly values on the hour"""
+        hourly = forecast_solar(sunny_data, config=CONFIG, quantiles=QUANTILES)
+        quarter = forecast_solar(sunny_data, interval="15min", config=CONFIG, quantiles=QUANTILES)
+        assert len(quarter) > 3 * len(hourly)
+        on_hour = quarter.loc[hourly.index]
+        assert np.allclose(on_hour["p90"], hourly["p90"])
+
+    def test_blend_std_weighted_sum(self):
+        """Ensemble std is the weighted sum of member stds"""
+        index = pd.date_range("2026-01-01", periods=2, freq="h")
+        a, b = pd.Series([1.0, 1.0], index=index), pd.Series([3.0, 3.0], index=index)
+        a.attrs["std"], b.attrs["std"] = np.array([1.0, 1.0]), np.array([3.0, 5.0])
+        blend = combine({"a": a, "b": b}, {"a": np.array([0.75, 0.5]), "b": np.array([0.25, 0.5])})
+        assert np.allclose(blend.attrs["std"], [1.5, 3.0])
+
+    def test_forecast_multi_bands(self, sunny_data):
+        """Joint mode adds per-target band columns, none for net"""
+        frame = forecast_multi(sunny_data, config=CONFIG, quantiles=QUANTILES)
+        assert {"solar_p10", "load_p90"} <= set(frame.columns)
+        assert not any(c.startswith("net_") for c in frame.columns)
+
+
+class TestForecastStd:
+    """Tests for per-method forecast error std"""
+
+    def test_seasonal_naive_std_grows_by_day(self, sunny_data):
+        """Day two's std is sqrt(2) x day one's"""
+        std = seasonal_naive_std(sunny_data, 48)
+        assert np.allclose(std[24:], std[:24] * np.sqrt(2))
+
+    def test_arima_std_from_state_space(self, sunny_data):
+        """ARIMA std is positive and widens with lead time"""
+        std = arima_forecast(sunny_data, horizon=48).attrs["std"]
+        assert len(std) == 48 and (std > 0).all()
+        assert std[24:].mean() > std[:24].mean()
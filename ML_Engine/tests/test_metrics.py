@@ -0,0 +1,72 @@
+# tests/test_metrics.py
+"""
+Metrics Unit Tests
+Run: pytest tests/ -v
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from src.forecast_solar import forecast_solar
+from src.metrics import FORECAST_SECONDS, MetricsRegistry, REGISTRY, merge_text, write_metrics
+
+
+@pytest.fixture
+def registry():
+    reg = MetricsRegistry(prefix="test_")
+    reg.counter("fits_total", "Fits").inc(mode="fit")
+    reg.counter("fits_total").inc(2, mode="filter")
+    reg.gauge("rows", "Rows").set(168, source="sunny")
+    reg.histogram("fit_seconds", "Fit time", buckets=(0.1, 1.0)).observe(0.5)
+    return reg
+
+
+def _write_runs(path, runs):
+    """One short-lived CLI run per iteration: a fresh registry merged into the file"""
+    for _ in range(runs):
+        reg = MetricsRegistry(prefix="test_")
+        reg.counter("runs_total", "Runs").inc()
+        write_metrics(path, reg)
+
+
+class TestMetrics:
+    """Tests for the registry and Prometheus text export"""
+
+    def test_render(self, registry):
+        """Counters, gauges and cumulative histogram buckets in text format"""
+        text = registry.render()
+        assert "# TYPE test_fits_total counter" in text
+        assert 'test_fits_total{mode="filter"} 2' in text
+        assert 'test_rows{source="sunny"} 168' in text
+        assert 'test_fit_seconds_bucket{le="0.1"} 0' in text
+        assert 'test_fit_seconds_bucket{le="1"} 1' in text
+        assert 'test_fit_seconds_bucket{le="+Inf"} 1' in text
+        assert "test_fit_seconds_count 1" in text
+
+    def test_type_conflict(self, registry):
+        """A name keeps its metric type"""
+        with pytest.raises(ValueError):
+            registry.gauge("fits_total")
+
+    def test_file_merge(self, registry, tmp_path):
+        """Counters and histograms accumulate across runs, gauges are replaced"""
+        path = tmp_path / "engine.prom"
+        write_metrics(path, registry)
+        registry.gauge("rows").set(24, source="sunny")
+        text = merge_text(path.read_text(), registry)
+        assert 'test_fits_total{mode="fit"} 2' in text
+        assert 'test_fit_seconds_bucket{le="+Inf"} 2' in text
+        assert 'test_rows{source="sunny"} 24' in text
+
+    def test_concurrent_writers_keep_increments(self, tmp_path):
+        """Processes writing the same file at once do not lose counts"""
+        path = tmp_path / "engine.prom"
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_write_runs, [path] * 4, [10] * 4))
+        assert "test_runs_total 40" in path.read_text()
+
+    def test_forecast_instrumented(self, sunny_data):
+        """forecast_solar records its latency in the engine registry"""
+        before = FORECAST_SECONDS.count(method="persistence")
+        forecast_solar(sunny_data, method="persistence", horizon=24)
+        assert FORECAST_SECONDS.count(method="persistence") == before + 1
+        assert "solar_ml_forecast_seconds_bucket" in REGISTRY.render()
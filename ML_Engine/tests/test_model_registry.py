@@ -0,0 +1,145 @@
+# tests/test_model_registry.py
+"""
+Model Registry Unit Tests
+Run: pytest tests/ -v
+"""
+import importlib
+import json
+import time
+
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.config import CONFIG, ForecastConfig
+from src.forecast_solar import arima_forecast
+from src.metrics import WARM_START_FALLBACKS
+from src.model_registry import load_params, model_key_for, registry_dir, warm_start_params
+
+# The module (src re-exports the forecast_solar function under the same name)
+forecast_module = importlib.import_module("src.forecast_solar")
+
+
+@pytest.fixture
+def registry_fit(sunny_data):
+    """One registry-backed ARIMA forecast for the sunny scenario"""
+    key = ("site-1", "sunny")
+    forecast = arima_forecast(sunny_data, 24, model_key=key)
+    return key, forecast
+
+
+class TestModelRegistry:
+    """Tests for parameter reuse and scheduled re-estimation"""
+
+    def test_model_key_for(self):
+        """Scenario comes from the data file stem"""
+        assert model_key_for("data/solar_data_sunny.csv") == (CONFIG["site_id"], "sunny")
+        assert model_key_for("/tmp/site9.csv", site="s9") == ("s9", "site9")
+
+    def test_fit_is_stored(self, registry_fit):
+        """First forecast fits and stores version 1 as plain JSON"""
+        key, _ = registry_fit
+        entry = load_params(*key)
+        assert entry["version"] == 1
+        assert entry["order"] == list(CONFIG["arima_order"])
+        assert len(entry["params"]) == len(entry["param_names"])
+        path = registry_dir() / "site-1" / "sunny" / "solar_power_kw-v1.json"
+        assert json.loads(path.read_text())["params"] == entry["params"]
+
+    def test_stored_params_reproduce_forecast(self, sunny_data, registry_fit):
+        """Filtering with stored converged params matches the fitted forecast, no new version"""
+        key, fitted_forecast = registry_fit
+        path = registry_dir() / "site-1" / "sunny" / "solar_power_kw-v1.json"
+        path.write_text(json.dumps({**json.loads(path.read_text()), "converged": True}))
+        reused = arima_forecast(sunny_data, 24, model_key=key)
+        assert reused.to_numpy() == pytest.approx(fitted_forecast.to_numpy(), abs=1e-6)
+        assert load_params(*key)["version"] == 1
+
+    def test_stale_entry_is_refitted(self, sunny_data, registry_fit, monkeypatch):
+        """Entries older than registry_refit_days trigger re-estimation"""
+        key, _ = registry_fit
+        later = time.time() + (CONFIG["registry_refit_days"] + 1) * 86400
+        monkeypatch.setattr(time, "time", lambda: later)
+        arima_forecast(sunny_data, 24, model_key=key)
+        assert load_params(*key)["version"] == 2
+
+    def test_unconverged_entry_is_refitted(self, sunny_data, registry_fit):
+        """A fresh but unconverged entry is re-estimated, warm-started, not reused"""
+        key, _ = registry_fit
+        path = registry_dir() / "site-1" / "sunny" / "solar_power_kw-v1.json"
+        path.write_text(json.dumps({**json.loads(path.read_text()), "converged": False}))
+        arima_forecast(sunny_data, 24, model_key=key)
+        entry = load_params(*key)
+        assert entry["version"] == 2 and entry["start"] == "warm"
+
+    def test_refit_and_pruning(self, sunny_data, registry_fit, monkeypatch):
+        """refit=True always re-estimates; only registry_keep versions remain"""
+        key, _ = registry_fit
+        monkeypatch.setitem(CONFIG, "registry_keep", 2)
+        arima_forecast(sunny_data, 24, model_key=key, refit=True)
+        arima_forecast(sunny_data, 24, model_key=key, refit=True)
+        files = sorted(p.name for p in (registry_dir() / "site-1" / "sunny").iterdir())
+        assert files == ["solar_power_kw-v2.json", "solar_power_kw-v3.json"]
+
+
+class TestWarmStart:
+    """Tests for refits seeded from the previous parameters"""
+
+    def test_refit_is_warm_started(self, sunny_data, registry_fit):
+        """A refit starts from the stored parameters and records it"""
+        key, _ = registry_fit
+        assert load_params(*key)["start"] == "cold"
+        arima_forecast(sunny_data, 24, model_key=key, refit=True)
+        entry = load_params(*key)
+        assert entry["start"] == "warm" and entry["converged"]
+        assert entry["iterations"] <= CONFIG["warm_start_maxiter"]
+
+    def test_failed_warm_start_falls_back_cold(self, sunny_data, registry_fit, monkeypatch):
+        """A warm start that hits the iteration cap is refitted cold"""
+        key, _ = registry_fit
+        monkeypatch.setitem(CONFIG, "warm_start_maxiter", 1)
+        # Start away from the optimum so one iteration cannot converge
+        start = [0.5 * p for p in load_params(*key)["params"]]
+        monkeypatch.setattr(forecast_module, "warm_start_params", lambda *args: start)
+        fallbacks = WARM_START_FALLBACKS.value()
+        arima_forecast(sunny_data, 24, model_key=key, refit=True)
+        entry = load_params(*key)
+        assert entry["start"] == "cold" and entry["warm_iterations"] == 1
+        assert WARM_START_FALLBACKS.value() == fallbacks + 1
+
+    def test_unusable_start_falls_back_cold(self, sunny_data, registry_fit, monkeypatch):
+        """Start values the optimiser rejects are refitted cold"""
+        key, _ = registry_fit
+
+        def bad_fit(*args, **kwargs):
+            raise np.linalg.LinAlgError("LU decomposition error.")
+
+        original = forecast_module._timed_fit
+        monkeypatch.setattr(forecast_module, "_timed_fit",
+                            lambda model, mode, *args, **kw: bad_fit() if mode == "warm"
+                            else original(model, mode, *args, **kw))
+        arima_forecast(sunny_data, 24, model_key=key, refit=True)
+        entry = load_params(*key)
+        assert entry["start"] == "cold" and entry["warm_iterations"] is None
+
+    def test_prefers_converged_entry(self, sunny_data, registry_fit):
+        """warm_start_params skips newer unconverged and mismatched entries"""
+        key, _ = registry_fit
+        folder = registry_dir() / "site-1" / "sunny"
+        v1 = json.loads((folder / "solar_power_kw-v1.json").read_text())
+        v1["converged"] = True
+        (folder / "solar_power_kw-v1.json").write_text(json.dumps(v1))
+        (folder / "solar_power_kw-v2.json").write_text(json.dumps(
+            {**v1, "version": 2, "converged": False, "params": [0.0] * len(v1["params"])}))
+        (folder / "solar_power_kw-v3.json").write_text(json.dumps(
+            {**v1, "version": 3, "order": [1, 0, 0]}))
+        model = ARIMA(sunny_data["solar_power_kw"], order=CONFIG["arima_order"],
+                      seasonal_order=CONFIG["arima_seasonal"])
+        assert warm_start_params(*key, "solar_power_kw", model) == v1["params"]
+
+    def test_disabled(self, sunny_data, registry_fit):
+        """warm_start=False in the request's config always starts cold"""
+        key, _ = registry_fit
+        config = ForecastConfig.from_config().replace(warm_start=False)
+        arima_forecast(sunny_data, 24, model_key=key, refit=True, config=config)
+        assert load_params(*key)["start"] == "cold"
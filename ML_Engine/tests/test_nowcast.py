@@ -0,0 +1,57 @@
+# tests/test_nowcast.py
+"""
+Nowcast Correction Unit Tests
+Run: pytest tests/ -v
+"""
+import pandas as pd
+import pytest
+from src.config import CONFIG
+from src.forecast_cache import store_forecast
+from src.nowcast import apply_nowcast, fresh_state, save_state, update_nowcast, load_state
+
+
+@pytest.fixture
+def cached_forecast(tmp_path):
+    """Flat 4 kW hourly forecast cached for a temporary data file"""
+    csv = tmp_path / "solar_data_test.csv"
+    index = pd.date_range("2026-02-01 08:00", periods=12, freq="h")
+    forecast = pd.Series(4.0, index=index)
+    meta = store_forecast(csv, "arima-12", forecast)
+    save_state(csv, fresh_state(meta["key"]))
+    return csv, forecast
+
+
+class TestNowcast:
+    """Tests for the decaying ratio / bias correction"""
+
+    def test_update_tracks_observations(self, cached_forecast):
+        """Readings below forecast pull the ratio and bias down"""
+        csv, _ = cached_forecast
+        update_nowcast(csv, "2026-02-01 09:00", 2.0)
+        state = update_nowcast(csv, "2026-02-01 10:00", 2.0)
+        assert state["observations"] == 2
+        assert state["ratio"] < 1.0 and state["bias"] < 0.0
+        assert load_state(csv) == state
+
+    def test_reading_outside_window_ignored(self, cached_forecast):
+        """Readings far from the cached forecast do not change the state"""
+        csv, _ = cached_forecast
+        state = update_nowcast(csv, "2026-03-01 09:00", 0.0)
+        assert state["observations"] == 0
+
+    def test_correction_decays(self, cached_forecast):
+        """Correction is strongest right after the last reading"""
+        csv, forecast = cached_forecast
+        state = update_nowcast(csv, "2026-02-01 09:00", 2.0)
+        corrected = apply_nowcast(forecast, state)
+        gap = (forecast - corrected).iloc[1:]
+        assert gap.iloc[0] > 0
+        assert gap.is_monotonic_decreasing
+
+    def test_bias_mode(self, cached_forecast, monkeypatch):
+        """Bias mode shifts by the decayed kW error"""
+        csv, forecast = cached_forecast
+        monkeypatch.setitem(CONFIG, "nowcast_mode", "bias")
+        state = update_nowcast(csv, "2026-02-01 09:00", 2.0)
+        corrected = apply_nowcast(forecast, state)
+        assert corrected.loc["2026-02-01 09:00"] == pytest.approx(4.0 + state["bias"])
@@ -0,0 +1,51 @@
+# tests/test_output_formats.py
+"""
+Output Format Unit Tests
+Run: pytest tests/ -v
+"""
+import json
+import pandas as pd
+import pytest
+from src.output_formats import encode_forecast, unpack_binary
+
+
+def make_forecast():
+    index = pd.date_range("2026-02-01 00:00", periods=8, freq="15min")
+    return pd.Series([0.0, 1.25, 2.5, 3.75, 5.0, 4.0, 3.0, 2.0], index=index)
+
+
+class TestStreamFormats:
+    """Tests for ndjson, csv and binary encoders"""
+
+    def test_ndjson_header_then_steps(self):
+        """First line is the header, then one record per step"""
+        lines = encode_forecast(make_forecast(), {"unit": "kW"}, "ndjson", "kw", "15min").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert records[0] == {"record": "header", "unit": "kW"}
+        assert len(records) == 9
+        assert records[2] == {"record": "step", "datetime": "2026-02-01T00:15:00", "value_kw": 1.25}
+
+    def test_ndjson_nan_is_null(self):
+        """NaN steps and header fields are written as strict-JSON null"""
+        forecast = make_forecast()
+        forecast.iloc[1] = float("nan")
+        text = encode_forecast(forecast, {"gap": float("nan")}, "ndjson", "kw", "15min")
+        records = [json.loads(line, parse_constant=pytest.fail) for line in text.splitlines()]
+        assert records[0]["gap"] is None
+        assert records[2]["value_kw"] is None
+
+    def test_csv_rows(self):
+        """CSV has a header row and one row per step"""
+        lines = encode_forecast(make_forecast(), {}, "csv", "wh", "15min").splitlines()
+        assert lines[0] == "datetime,value_wh"
+        assert lines[-1] == "2026-02-01T01:45:00,2.0"
+
+    def test_binary_round_trip(self):
+        """Binary payload decodes back to the same series"""
+        forecast = make_forecast()
+        payload = encode_forecast(forecast, {}, "binary", "wh", "15min")
+        assert len(payload) == 20 + 4 * len(forecast)
+        decoded, unit = unpack_binary(payload)
+        assert unit == "wh"
+        assert (decoded.index == forecast.index).all()
+        assert (decoded.to_numpy() == forecast.to_numpy()).all()
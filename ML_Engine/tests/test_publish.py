@@ -0,0 +1,91 @@
+# tests/test_publish.py
+"""
+Forecast Publication Unit Tests
+Run: pytest tests/ -v
+"""
+import json
+
+import pytest
+from src.publish import content_hash, publish_forecast, read_published, version_path
+
+
+def payload(steps, avg=None, generated_at="01-02-2026 10:00:00"):
+    return {"avgKw1h": steps[0] if avg is None else avg, "confidence": 0.87,
+            "generatedAt": generated_at, "unit": "kw", "interval": "hourly", "steps": steps}
+
+
+@pytest.fixture
+def target(tmp_path):
+    return tmp_path / "ml_forecast.json"
+
+
+class TestPublishForecast:
+    """Tests for change-aware, versioned publication"""
+
+    def test_first_publication_is_version_1(self, target):
+        """A missing file is written with version 1 and its content hash"""
+        outcome, published = publish_forecast(target, payload([1.0, 2.0]))
+        assert outcome == "written"
+        on_disk = json.loads(target.read_text())
+        assert on_disk == published
+        assert on_disk["version"] == 1
+        assert on_disk["contentHash"] == content_hash(payload([1.0, 2.0]))
+
+    def test_same_content_is_not_rewritten(self, target):
+        """Only the timestamp differs: same hash, file untouched"""
+        publish_forecast(target, payload([1.0, 2.0]))
+        before = target.stat().st_mtime_ns
+        outcome, published = publish_forecast(target, payload([1.0, 2.0], generated_at="later"))
+        assert outcome == "unchanged"
+        assert published["version"] == 1
+        assert published["generatedAt"] == "01-02-2026 10:00:00"
+        assert target.stat().st_mtime_ns == before
+
+    def test_tolerance(self, target):
+        """Steps moving by at most the tolerance are not republished"""
+        publish_forecast(target, payload([1.0, 2.0]))
+        outcome, _ = publish_forecast(target, payload([1.005, 1.995]), tolerance=0.01)
+        assert outcome == "within_tolerance"
+        outcome, published = publish_forecast(target, payload([1.05, 2.0]), tolerance=0.01)
+        assert outcome == "written"
+        assert published["version"] == 2
+
+    def test_drift_is_measured_from_last_publication(self, target):
+        """Small changes accumulate until they exceed the tolerance"""
+        publish_forecast(target, payload([1.0]))
+        outcomes = [publish_forecast(target, payload([1.0 + 0.006 * i]), tolerance=0.01)[0]
+                    for i in (1, 2)]
+        assert outcomes == ["within_tolerance", "written"]
+
+    def test_shape_change_is_material(self, target):
+        """A different horizon or unit is always republished"""
+        publish_forecast(target, payload([1.0, 2.0]))
+        outcome, _ = publish_forecast(target, payload([1.0, 2.0, 3.0]), tolerance=10)
+        assert outcome == "written"
+        outcome, _ = publish_forecast(target, {**payload([1.0, 2.0, 3.0]), "unit": "wh"},
+                                      tolerance=10)
+        assert outcome == "written"
+
+    def test_version_is_monotonic(self, target):
+        """Every write bumps the version; legacy files without one start over at 1"""
+        target.write_text(json.dumps({"avgKw1h": 2, "confidence": 0.87, "generatedAt": "x"}))
+        versions = [publish_forecast(target, payload([float(v)]))[1]["version"] for v in range(3)]
+        assert versions == [1, 2, 3]
+        assert not list(target.parent.glob("*.tmp"))
+
+    def test_existing_version_continues(self, target):
+        """A file published before the sidecar existed keeps counting"""
+        target.write_text(json.dumps({**payload([2.0]), "version": 7}))
+        assert publish_forecast(target, payload([1.0]))[1]["version"] == 8
+
+    def test_unreadable_file_is_replaced(self, target):
+        """A corrupt file does not block publication nor reset the version"""
+        publish_forecast(target, payload([1.0]))
+        publish_forecast(target, payload([2.0]))
+        target.write_text("{not json")
+        assert read_published(target) is None
+        outcome, published = publish_forecast(target, payload([3.0]))
+        assert outcome == "written"
+        assert published["version"] == 3
+        assert read_published(target)["steps"] == [3.0]
+        assert open(version_path(target)).read().strip() == "3"
@@ -0,0 +1,79 @@
+# tests/test_ring_buffer.py
+"""
+Ring Buffer Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+from src.config import CONFIG
+from src.data_utils import append_new_reading
+from src.ring_buffer import RingBuffer, open_ring_buffer
+
+
+class TestRingBuffer:
+    """Tests for the memory-mapped history window"""
+
+    def test_window_is_zero_copy_view(self, tmp_path):
+        """Window values share memory with the mapped file"""
+        ring = RingBuffer.create(tmp_path / "h.ring", capacity=48)
+        index = pd.date_range("2026-01-01", periods=30, freq="h")
+        ring.write_many(index, np.column_stack([np.arange(30.0), np.full(30, 5.0)]))
+        window = ring.window(24)
+        assert len(window) == 24
+        assert window.index[-1] == index[-1]
+        assert np.shares_memory(window.to_numpy(), ring._values)
+
+    def test_wraparound_keeps_order(self, tmp_path):
+        """After wrapping, the window is still contiguous and ordered"""
+        ring = RingBuffer.create(tmp_path / "h.ring", capacity=24)
+        start = pd.Timestamp("2026-01-01")
+        for hour in range(60):
+            ring.write(start + pd.Timedelta(hours=hour), float(hour), 5.0)
+        window = ring.window(24)
+        assert window.index.is_monotonic_increasing
+        assert window["solar_power_kw"].tolist() == [float(h) for h in range(36, 60)]
+
+    def test_late_gap_and_stale_writes(self, tmp_path):
+        """Late readings land in their slot, skipped slots are NaN, stale ones are dropped"""
+        ring = RingBuffer.create(tmp_path / "h.ring", capacity=24)
+        start = pd.Timestamp("2026-01-01")
+        ring.write(start, 1.0, 5.0)
+        ring.write(start + pd.Timedelta(hours=3), 4.0, 5.0)
+        ring.write(start + pd.Timedelta(hours=1), 2.0, 5.0)
+        assert not ring.write(start - pd.Timedelta(hours=30), 9.0, 5.0)
+
+        window = RingBuffer(tmp_path / "h.ring").window(4)
+        assert window["solar_power_kw"].iloc[[0, 1, 3]].tolist() == [1.0, 2.0, 4.0]
+        assert np.isnan(window["solar_power_kw"].iloc[2])
+
+
+class TestRingBackend:
+    """Tests for ring mode alongside the CSV"""
+
+    def _history(self, path, hours=48):
+        index = pd.date_range("2026-01-01", periods=hours, freq="h")
+        pd.DataFrame({"timestamp": index, "solar_power_kw": 1.0,
+                      "load_total_kw": 5.0}).to_csv(path, index=False)
+
+    def test_ingest_updates_ring_and_csv(self, monkeypatch, tmp_path):
+        """CSV readers (15-minute path, queries, backend chart) see ring-mode readings"""
+        monkeypatch.setitem(CONFIG, "history_backend", "ring")
+        csv = tmp_path / "solar_data_ring.csv"
+        self._history(csv)
+        append_new_reading(str(csv), "2026-01-03 00:00", 7.0, 5.0)
+        assert open_ring_buffer(csv).window(1)["solar_power_kw"].iloc[-1] == 7.0
+        raw = pd.read_csv(csv, parse_dates=["timestamp"])
+        assert raw["timestamp"].iloc[-1] == pd.Timestamp("2026-01-03")
+        assert raw["solar_power_kw"].iloc[-1] == 7.0
+
+    def test_capacity_change_reseeds(self, monkeypatch, tmp_path):
+        """A longer retention re-seeds an existing ring file from the CSV"""
+        csv = tmp_path / "solar_data_ring.csv"
+        self._history(csv, hours=96)
+        monkeypatch.setitem(CONFIG, "retention_hours", 24)
+        monkeypatch.setitem(CONFIG, "train_days", 1)
+        assert open_ring_buffer(csv).capacity == 24
+        monkeypatch.setitem(CONFIG, "retention_hours", 72)
+        ring = open_ring_buffer(csv)
+        assert ring.capacity == 72
+        assert ring.window().notna().all().all()
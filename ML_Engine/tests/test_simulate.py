@@ -0,0 +1,123 @@
+# tests/test_simulate.py
+"""
+Sizing Simulator Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ML_ENGINE_ROOT
+from src.simulate import (DEFAULT_DEVICES, DEFAULT_REFERENCE_KW, config_grid, load_replay,
+                          shared_reference_kw, simulate)
+
+
+def reference_replay(solar_kw, battery_wh, panel_kw, efficiency, devices, reference_kw, dt=0.25):
+    """Step-by-step port of scheduleDevices() + updateBattery() for one configuration"""
+    battery, unmet, curtailed = battery_wh, 0.0, 0.0
+    for kw in solar_kw:
+        solar = kw / reference_kw * panel_kw * efficiency * 1000 * dt
+        available = battery + solar
+        load = 0.0
+        for kind in ("CRITICAL", "FLEXIBLE", "OPTIONAL"):
+            for device in devices:
+                if device["type"] != kind:
+                    continue
+                required = device["powerW"] * dt
+                if kind == "CRITICAL" or available >= required:
+                    available -= required
+                    load += required
+        critical = sum(d["powerW"] * dt for d in devices if d["type"] == "CRITICAL")
+        unmet += max(0.0, critical - (battery + solar))
+        raw = battery + solar - load
+        curtailed += max(0.0, raw - battery_wh)
+        battery = min(max(raw, 0.0), battery_wh)
+    return unmet, curtailed, battery
+
+
+class TestSimulate:
+    """Tests for the vectorised replay"""
+
+    def test_matches_scalar_scheduler(self):
+        """Every combination equals a step-by-step run of the backend logic"""
+        rng = np.random.default_rng(0)
+        day = np.clip(np.sin(np.linspace(-np.pi / 2, 3 * np.pi / 2, 96)), 0, None)
+        solar_kw = np.tile(day, 3) * rng.uniform(0.3, 1.0, 288) * 4
+        configs = config_grid([0, 2500, 5000, 12000], [1, 3, 6], [0.7, 0.85])
+        result = simulate(solar_kw, configs, reference_kw=4)
+        for row in result.itertuples():
+            unmet, curtailed, battery = reference_replay(
+                solar_kw, row.battery_wh, row.panel_kw, row.efficiency, DEFAULT_DEVICES, 4)
+            assert row.unmet_critical_wh == pytest.approx(unmet)
+            assert row.curtailed_wh == pytest.approx(curtailed)
+            assert row.final_battery_wh == pytest.approx(battery)
+
+    def test_no_sun_no_battery_misses_all_critical_load(self):
+        """Zero capacity and zero solar: every CRITICAL Wh is unmet, nothing else runs"""
+        result = simulate(np.zeros(8), config_grid(0, 3, 0.85)).iloc[0]
+        assert result.unmet_critical_wh == pytest.approx(8 * 250 * 0.25)
+        assert result.unmet_critical_steps == 8
+        assert result.flexible_served_pct == 0
+        assert result.optional_served_pct == 0
+
+    def test_full_battery_curtails_surplus(self):
+        """A full battery loses whatever solar the devices do not use"""
+        devices = [{"name": "Fridge", "powerW": 200, "type": "CRITICAL"}]
+        result = simulate(np.ones(4), config_grid(1000, 2, 1.0), devices=devices,
+                          reference_kw=1).iloc[0]
+        # 500 Wh solar - 50 Wh load per step, battery already full
+        assert result.curtailed_wh == pytest.approx(4 * 450)
+        assert result.curtailed_pct == pytest.approx(90)
+        assert result.final_battery_wh == pytest.approx(1000)
+
+    def test_flexible_before_optional(self):
+        """With room for one device, the FLEXIBLE one is served"""
+        devices = [{"name": "Pump", "powerW": 400, "type": "OPTIONAL"},
+                   {"name": "Washer", "powerW": 400, "type": "FLEXIBLE"}]
+        result = simulate(np.zeros(1), config_grid(100, 1, 1.0), devices=devices).iloc[0]
+        assert result.flexible_served_pct == 100
+        assert result.optional_served_pct == 0
+
+    def test_more_storage_never_hurts(self):
+        """Unmet critical load does not increase with battery size"""
+        solar_kw = load_replay(ML_ENGINE_ROOT / "data" / "solar_data_cloudy.csv")
+        result = simulate(solar_kw, config_grid(np.linspace(0, 20000, 11), 3, 0.85))
+        assert np.all(np.diff(result["unmet_critical_wh"]) <= 1e-9)
+
+    def test_shared_reference_keeps_scenarios_apart(self):
+        """A dimmer history yields less energy: it is not scaled to its own peak"""
+        sunny = np.array([0.0, 2.0, 4.0, 2.0])
+        cloudy = sunny / 2
+        reference_kw = shared_reference_kw([sunny, cloudy])
+        assert reference_kw == 4.0
+        # No devices, no battery: every solar Wh is curtailed
+        grid = config_grid(0, 3, 1.0)
+        bright = simulate(sunny, grid, devices=[], reference_kw=reference_kw).iloc[0]
+        dim = simulate(cloudy, grid, devices=[], reference_kw=reference_kw).iloc[0]
+        assert dim.curtailed_wh == pytest.approx(bright.curtailed_wh / 2)
+        assert shared_reference_kw([np.zeros(3)]) == DEFAULT_REFERENCE_KW
+        with pytest.raises(ValueError):
+            simulate(sunny, grid, reference_kw=0)
+
+    def test_unknown_device_type(self):
+        """Device types are validated"""
+        with pytest.raises(ValueError):
+            simulate(np.zeros(1), config_grid(0, 1, 1.0),
+                     devices=[{"name": "X", "powerW": 1, "type": "ESSENTIAL"}])
+
+
+class TestInputs:
+    """Tests for the grid and replay loader"""
+
+    def test_config_grid_is_cartesian(self):
+        """Every combination once, battery-major"""
+        grid = config_grid([0, 5000], [1, 2, 3], [0.8, 0.9])
+        assert len(grid) == 12
+        assert list(grid.columns) == ["battery_wh", "panel_kw", "efficiency"]
+        assert not grid.duplicated().any()
+
+    def test_load_replay_is_15_minute(self):
+        """Hourly history becomes the scheduler's 15-minute tick"""
+        solar_kw = load_replay(ML_ENGINE_ROOT / "data" / "solar_data_sunny.csv")
+        assert isinstance(solar_kw, pd.Series)
+        assert (solar_kw.index[1] - solar_kw.index[0]) == pd.Timedelta(minutes=15)
+        assert solar_kw.notna().all() and (solar_kw >= 0).all()
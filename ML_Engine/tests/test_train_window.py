@@ -0,0 +1,102 @@
+# tests/test_train_window.py
+"""
+Training Window Unit Tests
+Run: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.config import CONFIG, ForecastConfig, retention_hours
+from src.data_utils import load_solar_csv
+from src.forecast_cache import cached_hourly_forecast
+from src.forecast_solar import arima_forecast, estimate_arima, profile_forecast
+from src.history_store import HistoryStore
+from src.model_registry import load_params
+from conftest import ML_ENGINE_ROOT
+
+SUNNY = str(ML_ENGINE_ROOT / "data" / "solar_data_sunny.csv")
+
+
+def long_history(days):
+    """Hourly diurnal history of `days` days"""
+    index = pd.date_range("2026-01-01", periods=24 * days, freq="h")
+    solar = np.clip(np.sin((index.hour - 6) / 12 * np.pi), 0, None) * 5
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"solar_power_kw": solar * rng.uniform(0.7, 1, len(index)),
+                         "load_total_kw": 6.0}, index=index)
+
+
+class TestWindow:
+    """Tests for CONFIG["train_days"]"""
+
+    def test_default_is_train_days(self, monkeypatch):
+        """load_solar_csv returns train_days days of hourly rows"""
+        assert len(load_solar_csv(SUNNY)) == 24 * CONFIG["train_days"]
+        monkeypatch.setitem(CONFIG, "train_days", 3)
+        assert len(load_solar_csv(SUNNY)) == 72
+
+    def test_days_argument(self):
+        """An explicit window overrides the config"""
+        df = load_solar_csv(SUNNY, days=14)
+        assert len(df) == 14 * 24
+        assert df.index[-1] == load_solar_csv(SUNNY).index[-1]
+
+    def test_request_config_window(self):
+        """A request's ForecastConfig.train_days sets the window it is fitted on"""
+        config = ForecastConfig.from_config(train_days=3)
+        _, meta, _ = cached_hourly_forecast(SUNNY, method="persistence", config=config)
+        assert meta["data_points"] == 72
+
+    def test_retention_covers_window(self, monkeypatch, tmp_path):
+        """Ingestion keeps at least train_days of history"""
+        monkeypatch.setitem(CONFIG, "train_days", 90)
+        assert retention_hours() == 90 * 24
+        assert HistoryStore(tmp_path / "h.csv").retention == 90 * 24
+
+
+class TestBoundedFit:
+    """Tests for the fit window and fit-time budget"""
+
+    def test_fit_window_caps_model_length(self):
+        """SARIMA sees at most fit_window_days of a long window"""
+        config = ForecastConfig.from_config(fit_window_days=5, arima_order=(1, 0, 0),
+                                            arima_seasonal=(0, 0, 0, 0))
+        history = long_history(30)
+        arima_forecast(history, 24, model_key=("s", "long"), config=config)
+        assert load_params("s", "long")["nobs"] == 5 * 24
+
+    def test_budget_stops_fit(self, sunny_data, monkeypatch):
+        """A spent budget keeps the optimiser's latest parameters"""
+        model = ARIMA(sunny_data["solar_power_kw"], order=CONFIG["arima_order"],
+                      seasonal_order=CONFIG["arima_seasonal"])
+        fitted, info = estimate_arima(model, budget_s=1e-9)
+        assert info["budget_exceeded"] and not info["converged"]
+        assert np.isfinite(np.asarray(fitted.forecast(24))).all()
+
+    def test_budget_recorded_in_registry(self, sunny_data, monkeypatch):
+        """Budget-stopped fits are stored as not converged"""
+        monkeypatch.setitem(CONFIG, "fit_budget_s", 1e-9)
+        arima_forecast(sunny_data, 24, model_key=("s", "budget"))
+        entry = load_params("s", "budget")
+        assert entry["budget_exceeded"] and entry["converged"] is False
+
+
+class TestProfileSummary:
+    """Tests for the whole-window profile member"""
+
+    def test_equal_weights_over_window(self):
+        """Default: plain mean of every whole day in the window"""
+        history = long_history(20)
+        pred = profile_forecast(history, 24)
+        expected = history["solar_power_kw"].to_numpy().reshape(-1, 24).mean(axis=0)
+        np.testing.assert_allclose(pred.to_numpy(), expected)
+
+    def test_halflife_favours_recent_days(self):
+        """With a half-life the newest days dominate"""
+        history = long_history(20)
+        history.iloc[-24:, 0] += 10  # a much brighter last day
+        flat = profile_forecast(history, 24).to_numpy()
+        recent = profile_forecast(history, 24, halflife_days=1).to_numpy()
+        assert recent.mean() > flat.mean()